@@ -0,0 +1,73 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+
+from zaqarclient.common import cache
+from zaqarclient.common import concurrency
+from zaqarclient.tests import base
+
+
+class TestTTLCache(base.TestBase):
+
+    def setUp(self):
+        super(TestTTLCache, self).setUp()
+        self.now = 0
+
+        patcher = mock.patch.object(concurrency, 'monotonic',
+                                    side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_expiry(self):
+        values = cache.TTLCache(ttl=10)
+        values.set('fizbit', {'a': 1}, etag='"1"')
+        self.assertEqual({'a': 1}, values.get('fizbit'))
+
+        self.now = 10
+        self.assertIsNone(values.get('fizbit'))
+        # NOTE: Expired values are kept to be revalidated.
+        self.assertEqual('"1"', values.etag('fizbit'))
+        self.assertEqual({'a': 1}, values.revalidate('fizbit'))
+        self.assertEqual({'a': 1}, values.get('fizbit'))
+        self.assertEqual({'hits': 2, 'misses': 1, 'revalidated': 1,
+                          'evictions': 0}, values.stats)
+
+    def test_least_recently_used_evicted(self):
+        values = cache.TTLCache(maxsize=2)
+        values.set('a', 1)
+        values.set('b', 2)
+        values.get('a')
+        values.set('c', 3)
+
+        self.assertEqual(2, len(values))
+        self.assertIsNone(values.get('b'))
+        self.assertEqual(1, values.get('a'))
+        self.assertEqual(3, values.get('c'))
+        self.assertEqual(1, values.stats['evictions'])
+
+    def test_invalidate(self):
+        values = cache.TTLCache()
+        values.set('a', 1)
+        values.set('b', 2)
+        values.invalidate('a')
+        self.assertIsNone(values.get('a'))
+        self.assertIsNone(values.revalidate('a'))
+
+        values.clear()
+        self.assertEqual(0, len(values))
+
+    def test_disabled(self):
+        values = cache.TTLCache(ttl=0)
+        values.set('a', 1)
+        self.assertIsNone(values.get('a'))
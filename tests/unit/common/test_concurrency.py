@@ -0,0 +1,175 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import threading
+
+import mock
+import requests
+
+from zaqarclient.common import concurrency
+from zaqarclient.tests import base
+from zaqarclient.transport import errors
+
+
+class TestImap(base.TestBase):
+
+    def test_ordered_results(self):
+        results = concurrency.imap(lambda item: item * 2, range(100),
+                                   max_workers=8)
+        self.assertEqual([item * 2 for item in range(100)], list(results))
+
+    def test_consumes_iterable_lazily(self):
+        consumed = []
+
+        def items():
+            for item in itertools.count():
+                consumed.append(item)
+                yield item
+
+        results = concurrency.imap(lambda item: item, items(),
+                                   max_workers=2)
+        self.assertEqual(0, next(results))
+        self.assertEqual(4, len(consumed))
+        results.close()
+
+    def test_bounded_concurrency(self):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+        barrier = threading.Event()
+
+        def function(item):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            barrier.wait(0.01)
+            with lock:
+                running[0] -= 1
+            return item
+
+        list(concurrency.imap(function, range(50), max_workers=3))
+        self.assertLessEqual(peak[0], 3)
+
+    def test_error_raised_in_order(self):
+        def function(item):
+            if item == 3:
+                raise ValueError(item)
+            return item
+
+        results = concurrency.imap(function, range(10), max_workers=2)
+        self.assertEqual([0, 1, 2], [next(results) for _ in range(3)])
+        self.assertRaises(ValueError, next, results)
+
+
+class TestAdaptiveLimiter(base.TestBase):
+
+    def setUp(self):
+        super(TestAdaptiveLimiter, self).setUp()
+        self.now = 0
+
+        patcher = mock.patch.object(concurrency, 'monotonic',
+                                    side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, limiter, latency=0, error=None):
+        with limiter.slot():
+            self.now += latency
+            if error is not None:
+                raise error
+
+    def test_additive_increase(self):
+        limiter = concurrency.AdaptiveLimiter(initial_limit=4,
+                                              target_latency=1)
+        for _ in range(4):
+            self._run(limiter, latency=0.5)
+        self.assertEqual(5, limiter.limit)
+
+    def test_no_increase_over_target(self):
+        limiter = concurrency.AdaptiveLimiter(initial_limit=4,
+                                              target_latency=1)
+        for _ in range(10):
+            self._run(limiter, latency=2)
+        self.assertEqual(4, limiter.limit)
+
+    def test_multiplicative_decrease(self):
+        limiter = concurrency.AdaptiveLimiter(initial_limit=20)
+        for error in (errors.ServiceUnavailableError(),
+                      requests.exceptions.Timeout()):
+            self.now += 1
+            self.assertRaises(type(error), self._run, limiter, error=error)
+        self.assertEqual(5, limiter.limit)
+        self.assertEqual(0, limiter.in_flight)
+
+    def test_decrease_once_per_burst(self):
+        limiter = concurrency.AdaptiveLimiter(initial_limit=20)
+        started = [limiter.acquire() for _ in range(5)]
+        self.now += 1
+        for start in started:
+            limiter.release(start, overloaded=True)
+        self.assertEqual(10, limiter.limit)
+
+    def test_other_errors_ignored(self):
+        limiter = concurrency.AdaptiveLimiter(initial_limit=4)
+        self.assertRaises(errors.ResourceNotFound, self._run, limiter,
+                          error=errors.ResourceNotFound())
+        self.assertEqual(4, limiter.limit)
+        self.assertEqual(0, limiter.in_flight)
+
+    def test_bounds(self):
+        limiter = concurrency.AdaptiveLimiter(initial_limit=2, min_limit=2,
+                                              max_limit=3)
+        self.assertRaises(errors.ServiceUnavailableError, self._run,
+                          limiter, error=errors.ServiceUnavailableError())
+        self.assertEqual(2, limiter.limit)
+
+        for _ in range(20):
+            self._run(limiter)
+        self.assertEqual(3, limiter.limit)
+
+    def test_history(self):
+        limiter = concurrency.AdaptiveLimiter(initial_limit=1,
+                                              history_size=3)
+        for _ in range(10):
+            self._run(limiter)
+        self.assertEqual([3, 4, 5],
+                         [limit for _, limit in limiter.history])
+
+    def test_waits_for_slot(self):
+        limiter = concurrency.AdaptiveLimiter(initial_limit=1)
+        started = limiter.acquire()
+        acquired = threading.Event()
+
+        def acquire():
+            limiter.release(limiter.acquire(), adapt=False)
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+
+        limiter.release(started, adapt=False)
+        self.assertTrue(acquired.wait(5))
+        thread.join()
+
+    def test_from_conf(self):
+        self.assertIsNone(concurrency.AdaptiveLimiter.from_conf({}))
+
+        limiter = concurrency.AdaptiveLimiter.from_conf(
+            {'adaptive_concurrency': {'initial_limit': 3}})
+        self.assertEqual(3, limiter.limit)
+
+        limiter = concurrency.AdaptiveLimiter.from_conf(
+            {'adaptive_concurrency': True})
+        self.assertEqual(concurrency.DEFAULT_MAX_WORKERS, limiter.limit)
@@ -0,0 +1,51 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import mock
+
+from zaqarclient.common import concurrency
+from zaqarclient.tests.queues import base
+
+
+class FakeServerTestBase(base.QueuesTestBase):
+    """Answers the requests of the client with `_send`
+
+    With `fake_clock`, the client's clock, `concurrency.monotonic`,
+    returns `now` rather than the time. Tests that don't set `version`
+    run against the v2 API, so they live in tests/unit/queues/v2.
+    """
+
+    version = 2
+    fake_clock = False
+
+    def setUp(self):
+        super(FakeServerTestBase, self).setUp()
+        self.now = 0
+        self.lock = threading.Lock()
+
+        if self.fake_clock:
+            now_patcher = mock.patch.object(concurrency, 'monotonic',
+                                            side_effect=lambda: self.now)
+            now_patcher.start()
+            self.addCleanup(now_patcher.stop)
+
+        patcher = mock.patch.object(self.transport, 'send',
+                                    side_effect=self._send)
+        self.send_method = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _send(self, request):
+        raise NotImplementedError('%s must answer the requests of the '
+                                  'client with _send' % type(self).__name__)
@@ -0,0 +1,237 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import json
+import threading
+import time
+
+import mock
+
+from zaqarclient.queues.v1 import iterator as iterate
+from zaqarclient.tests import base
+from zaqarclient.transport import errors
+
+
+def _page(start, stop, next_href=None):
+    links = []
+    if next_href:
+        links.append({'rel': 'next', 'href': next_href})
+    return {'links': links,
+            'items': [{'id': i} for i in range(start, stop)]}
+
+
+class TestIterator(base.TestBase):
+
+    def setUp(self):
+        super(TestIterator, self).setUp()
+        self.client = mock.Mock()
+
+    def _iterator(self, listing):
+        return iterate._Iterator(self.client, listing, 'items',
+                                 lambda args: args['id'])
+
+    def test_large_page(self):
+        iterator = self._iterator(_page(0, 10000))
+        self.assertEqual(list(range(10000)), list(iterator))
+
+    def test_list_listing(self):
+        iterator = self._iterator([{'id': 1}, {'id': 2}])
+        self.assertEqual([1, 2], list(iterator))
+
+    def test_empty_listing(self):
+        self.assertEqual([], list(self._iterator(None)))
+
+    def test_consumed_items_are_released(self):
+        iterator = self._iterator(_page(0, 5))
+        next(iterator)
+        next(iterator)
+        self.assertEqual(3, len(iterator._listing_response))
+        self.assertEqual([{'id': 2}, {'id': 3}, {'id': 4}],
+                         list(iterator._listing_response))
+
+    def test_stream_follows_pages_in_order(self):
+        self.client.follow.side_effect = [_page(2, 4, 'page3'),
+                                          _page(4, 5),
+                                          None]
+        iterator = self._iterator(_page(0, 2, 'page2')).stream()
+        self.assertEqual([0, 1, 2, 3, 4], list(iterator))
+        self.client.follow.assert_has_calls([mock.call('page2'),
+                                             mock.call('page3')])
+
+    def test_stream_skips_empty_pages(self):
+        self.client.follow.side_effect = [_page(0, 0, 'page3'),
+                                          _page(0, 1)]
+        iterator = self._iterator(_page(0, 0, 'page2')).stream()
+        self.assertEqual([0], list(iterator))
+
+    def test_no_stream_stops_at_page_boundary(self):
+        iterator = self._iterator(_page(0, 2, 'page2'))
+        self.assertEqual([0, 1], list(iterator))
+        self.assertFalse(self.client.follow.called)
+
+
+class TestIteratorPrefetch(base.TestBase):
+
+    def setUp(self):
+        super(TestIteratorPrefetch, self).setUp()
+        self.client = mock.Mock()
+
+    def _iterator(self, listing):
+        return iterate._Iterator(self.client, listing, 'items',
+                                 lambda args: args['id'])
+
+    def _endless(self, href):
+        start = int(href) * 2
+        return _page(start, start + 2, str(int(href) + 1))
+
+    def test_prefetch_follows_pages_in_order(self):
+        self.client.follow.side_effect = [_page(2, 4, 'page3'),
+                                          _page(4, 5),
+                                          None]
+        iterator = self._iterator(_page(0, 2, 'page2')).stream(prefetch=2)
+        self.assertEqual([0, 1, 2, 3, 4], list(iterator))
+        self.assertIsNone(iterator._prefetcher)
+        self.assertRaises(StopIteration, next, iterator)
+
+    def test_prefetch_ahead_of_consumer(self):
+        fetched = threading.Event()
+
+        def follow(href):
+            fetched.set()
+            return _page(2, 4)
+
+        self.client.follow.side_effect = follow
+        iterator = self._iterator(_page(0, 2, 'page2')).stream(prefetch=1)
+
+        # NOTE: The next page is requested before the
+        # current one has been consumed.
+        self.assertTrue(fetched.wait(5))
+        self.assertEqual(0, next(iterator))
+        self.assertEqual([1, 2, 3], list(iterator))
+
+    def test_prefetch_depth_caps_buffered_pages(self):
+        self.client.follow.side_effect = self._endless
+        iterator = self._iterator(_page(0, 2, '1')).stream(prefetch=2)
+        prefetcher = iterator._prefetcher
+
+        # NOTE: 2 pages buffered plus 1 blocked on the full queue.
+        for _ in range(50):
+            if self.client.follow.call_count >= 3:
+                break
+            time.sleep(0.01)
+        time.sleep(0.2)
+        self.assertEqual(3, self.client.follow.call_count)
+        self.assertEqual(2, prefetcher._pages.qsize())
+
+        iterator.close()
+        prefetcher._thread.join(5)
+        self.assertFalse(prefetcher._thread.is_alive())
+
+    def test_abandoned_iterator_stops_prefetching(self):
+        self.client.follow.side_effect = self._endless
+        iterator = self._iterator(_page(0, 2, '1')).stream(prefetch=1)
+        self.assertEqual(0, next(iterator))
+        thread = iterator._prefetcher._thread
+
+        del iterator
+        gc.collect()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+
+    def test_prefetch_error_raised_at_page_boundary(self):
+        self.client.follow.side_effect = [errors.ServiceUnavailableError(),
+                                          _page(2, 3)]
+        iterator = self._iterator(_page(0, 2, 'page2')).stream(prefetch=1)
+        self.assertEqual([0, 1], [next(iterator), next(iterator)])
+        self.assertRaises(errors.ServiceUnavailableError, next, iterator)
+
+        # NOTE: Resuming requests the failed page again.
+        self.assertEqual([2], list(iterator))
+        self.client.follow.assert_called_with('page2')
+
+    def test_stream_disabled_stops_prefetching(self):
+        self.client.follow.side_effect = self._endless
+        iterator = self._iterator(_page(0, 2, '1')).stream(prefetch=1)
+        prefetcher = iterator._prefetcher
+
+        iterator.stream(False)
+        self.assertIsNone(iterator._prefetcher)
+        prefetcher._thread.join(5)
+        self.assertFalse(prefetcher._thread.is_alive())
+        self.assertEqual([0, 1], list(iterator))
+
+
+class TestIteratorCheckpoint(base.TestBase):
+
+    def setUp(self):
+        super(TestIteratorCheckpoint, self).setUp()
+        self.client = mock.Mock()
+        self.pages = {'page2': _page(3, 6, 'page3'),
+                      'page3': _page(6, 8)}
+        self.client.follow.side_effect = self.pages.get
+
+    def _iterator(self):
+        return iterate._Iterator(self.client, _page(0, 3, 'page2'),
+                                 'items', lambda args: args['id'])
+
+    def _resume(self, checkpoint):
+        checkpoint = json.loads(json.dumps(checkpoint))
+        return iterate._Iterator.resume(self.client, checkpoint, 'items',
+                                        lambda args: args['id'],
+                                        lambda: _page(0, 3, 'page2'))
+
+    def test_checkpoint_first_page(self):
+        iterator = self._iterator().stream()
+        self.assertEqual({'href': None, 'offset': 0}, iterator.checkpoint())
+        next(iterator)
+        next(iterator)
+        self.assertEqual({'href': None, 'offset': 2}, iterator.checkpoint())
+
+        resumed = self._resume(iterator.checkpoint()).stream()
+        self.assertEqual([2, 3, 4, 5, 6, 7], list(resumed))
+
+    def test_checkpoint_next_pages(self):
+        iterator = self._iterator().stream()
+        consumed = [next(iterator) for _ in range(4)]
+        self.assertEqual([0, 1, 2, 3], consumed)
+        self.assertEqual({'href': 'page2', 'offset': 1},
+                         iterator.checkpoint())
+
+        first_page = mock.Mock()
+        resumed = iterate._Iterator.resume(self.client, iterator.checkpoint(),
+                                           'items', lambda args: args['id'],
+                                           first_page)
+        self.assertEqual([4, 5, 6, 7], list(resumed.stream()))
+        self.assertFalse(first_page.called)
+
+    def test_checkpoint_page_boundary(self):
+        iterator = self._iterator().stream()
+        for _ in range(6):
+            next(iterator)
+        self.assertEqual({'href': 'page2', 'offset': 3},
+                         iterator.checkpoint())
+        self.assertEqual([6, 7], list(self._resume(iterator.checkpoint())
+                                      .stream()))
+
+    def test_checkpoint_with_prefetch(self):
+        iterator = self._iterator().stream(prefetch=2)
+        consumed = [next(iterator) for _ in range(7)]
+        self.assertEqual(list(range(7)), consumed)
+        self.assertEqual({'href': 'page3', 'offset': 1},
+                         iterator.checkpoint())
+        self.assertEqual([7], list(self._resume(iterator.checkpoint())))
+
+    def test_resume_gone_page(self):
+        resumed = self._resume({'href': 'expired', 'offset': 2})
+        self.assertEqual([], list(resumed.stream()))
@@ -0,0 +1,165 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+
+from tests.unit.queues import base
+from zaqarclient.common import concurrency
+from zaqarclient import errors
+from zaqarclient.transport import response
+
+
+class TestProducer(base.FakeServerTestBase):
+
+    version = 1.1
+
+    def setUp(self):
+        super(TestProducer, self).setUp()
+        self.posts = []
+        self.sizes = []
+        self.fail = set()
+
+    def _send(self, request):
+        queue_name = request.params['queue_name']
+        bodies = [msg['body'] for msg in
+                  json.loads(request.content)['messages']]
+        self.posts.append((queue_name, bodies))
+        self.sizes.append(len(request.content))
+        if queue_name in self.fail:
+            raise errors.ZaqarError('Failed')
+
+        return response.Response(None, json.dumps({
+            'resources': ['/v1.1/queues/%s/messages/%s' % (queue_name, body)
+                          for body in bodies]}))
+
+    def _producer(self, **kwargs):
+        producer = self.client.producer(**kwargs)
+        self.addCleanup(producer.close)
+        return producer
+
+    def test_batch_size(self):
+        producer = self._producer(batch_size=3, linger=60)
+        sent = [producer.send('fizbit', {'ttl': 60, 'body': i})
+                for i in range(6)]
+
+        self.assertEqual(['/v1.1/queues/fizbit/messages/%d' % i
+                          for i in range(6)],
+                         [future.result(5) for future in sent])
+        self.assertEqual([('fizbit', [0, 1, 2]), ('fizbit', [3, 4, 5])],
+                         sorted(self.posts))
+
+    def test_batch_bytes(self):
+        # NOTE: Every message takes 24 bytes, separator included,
+        # and the document wrapping them 14 bytes.
+        producer = self._producer(batch_bytes=62, linger=60)
+        sent = [producer.send('fizbit', {'ttl': 60, 'body': i})
+                for i in range(3)]
+
+        sent[0].result(5)
+        self.assertEqual([('fizbit', [0, 1])], self.posts)
+        self.assertFalse(sent[2].done())
+
+    def test_post_size(self):
+        self.client.conf['max_messages_post_size'] = 200
+        producer = self._producer(batch_size=100, linger=60)
+        sent = [producer.send('fizbit', {'ttl': 60, 'body': i})
+                for i in range(20)]
+        producer.flush(5)
+
+        self.assertEqual(20, len([future.result(5) for future in sent]))
+        self.assertLessEqual(max(self.sizes), 200)
+
+    def test_linger(self):
+        producer = self._producer(linger=0.01)
+        future = producer.send('fizbit', {'ttl': 60, 'body': 1})
+        self.assertEqual('/v1.1/queues/fizbit/messages/1', future.result(5))
+
+    def test_batches_per_queue(self):
+        producer = self._producer(linger=60)
+        producer.send('fizbit', {'ttl': 60, 'body': 1})
+        producer.send('buzz', {'ttl': 60, 'body': 2})
+        producer.send('fizbit', {'ttl': 60, 'body': 3})
+
+        self.assertTrue(producer.flush(5))
+        self.assertEqual([('buzz', [2]), ('fizbit', [1, 3])],
+                         sorted(self.posts))
+
+    def test_post_error(self):
+        self.fail.add('buzz')
+        producer = self._producer(linger=60)
+        posted = producer.send('fizbit', {'ttl': 60, 'body': 1})
+        failed = producer.send('buzz', {'ttl': 60, 'body': 2})
+
+        self.assertTrue(producer.flush(5))
+        self.assertIsNone(posted.exception())
+        self.assertIsInstance(failed.exception(), errors.ZaqarError)
+
+    def test_cancelled_message(self):
+        producer = self._producer(linger=60)
+        cancelled = producer.send('fizbit', {'ttl': 60, 'body': 1})
+        producer.send('fizbit', {'ttl': 60, 'body': 2})
+        self.assertTrue(cancelled.cancel())
+
+        self.assertTrue(producer.flush(5))
+        self.assertEqual([('fizbit', [2])], self.posts)
+
+    def test_buffer_full_drop(self):
+        producer = self._producer(linger=60, max_buffer_bytes=60,
+                                  block=False)
+        producer.send('fizbit', {'ttl': 60, 'body': 1})
+        producer.send('fizbit', {'ttl': 60, 'body': 2})
+        dropped = producer.send('fizbit', {'ttl': 60, 'body': 3})
+
+        self.assertIsInstance(dropped.exception(0), errors.ZaqarError)
+        self.assertTrue(producer.flush(5))
+        self.assertEqual([('fizbit', [1, 2])], self.posts)
+
+    def test_buffer_full_block(self):
+        producer = self._producer(linger=60, max_buffer_bytes=60)
+        producer.send('fizbit', {'ttl': 60, 'body': 1})
+        producer.send('fizbit', {'ttl': 60, 'body': 2})
+
+        sent = []
+        sender = threading.Thread(target=lambda: sent.append(
+            producer.send('fizbit', {'ttl': 60, 'body': 3})))
+        sender.start()
+        sender.join(0.1)
+        self.assertTrue(sender.is_alive())
+
+        # NOTE: Flushing frees the buffer, the third message
+        # is buffered, then posted by the next flush.
+        self.assertTrue(producer.flush(5))
+        sender.join(5)
+        self.assertTrue(producer.flush(5))
+        self.assertEqual('/v1.1/queues/fizbit/messages/3', sent[0].result(5))
+
+    def test_close(self):
+        producer = self.client.producer(linger=60)
+        future = producer.send('fizbit', {'ttl': 60, 'body': 1})
+
+        self.assertTrue(producer.close(5))
+        self.assertTrue(future.done())
+        self.assertRaises(errors.ZaqarError, producer.send, 'fizbit',
+                          {'ttl': 60, 'body': 2})
+
+    def test_adaptive_concurrency(self):
+        self.client.concurrency_limiter = concurrency.AdaptiveLimiter(
+            initial_limit=1)
+        producer = self._producer(batch_size=1, linger=60)
+        sent = [producer.send('fizbit', {'ttl': 60, 'body': i})
+                for i in range(3)]
+
+        self.assertTrue(producer.flush(5))
+        self.assertEqual(3, len([future.result() for future in sent]))
+        self.assertEqual(3, self.client.concurrency_limiter.limit)
@@ -0,0 +1,47 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from tests.unit.queues import base
+from zaqarclient.transport import errors
+from zaqarclient.transport import response
+
+
+class TestKnownQueues(base.FakeServerTestBase):
+
+    version = 1
+
+    def setUp(self):
+        super(TestKnownQueues, self).setUp()
+        self.sent = []
+        self.existing = set()
+
+    def _send(self, request):
+        self.sent.append(request.operation)
+        if (request.operation == 'queue_exists' and
+                request.params['queue_name'] not in self.existing):
+            raise errors.ResourceNotFound()
+        return response.Response(request, None)
+
+    def test_found_queue_known(self):
+        self.existing.add('fizbit')
+        queue = self.client.queue('fizbit', auto_create=False)
+        self.assertTrue(queue.exists())
+        queue.ensure_exists()
+        self.assertEqual(['queue_exists'], self.sent)
+
+    def test_missing_queue_forgotten(self):
+        queue = self.client.queue('fizbit')
+        self.assertFalse(queue.exists())
+        queue.ensure_exists()
+        self.assertEqual(['queue_create', 'queue_exists', 'queue_create'],
+                         self.sent)
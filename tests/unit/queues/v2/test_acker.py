@@ -0,0 +1,94 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+from tests.unit.queues import base
+from zaqarclient.transport import errors
+from zaqarclient.transport import response
+
+
+class TestAcker(base.FakeServerTestBase):
+
+    def setUp(self):
+        super(TestAcker, self).setUp()
+        self.deletes = []
+        self.fail = set()
+
+    def _send(self, request):
+        queue_name = request.params['queue_name']
+        with self.lock:
+            self.deletes.append((queue_name,
+                                 sorted(request.params['ids']),
+                                 sorted(request.params.get('claim_ids', []))))
+        if queue_name in self.fail:
+            raise errors.ServiceUnavailableError()
+        return response.Response(None, None)
+
+    def _message(self, queue_name, message_id, claim_id='c'):
+        queue = self.client.queue(queue_name)
+        return queue.message_module.Message(
+            queue, 60, 0, None,
+            href='/v2/queues/%s/messages/%s?claim_id=%s' % (
+                queue_name, message_id, claim_id))
+
+    def _acker(self, **kwargs):
+        acker = self.client.acker(**kwargs)
+        self.addCleanup(acker.close)
+        return acker
+
+    def test_batch_size(self):
+        acker = self._acker(batch_size=3, linger=60)
+        acked = [acker.ack(self._message('fizbit', str(i)))
+                 for i in range(6)]
+
+        self.assertEqual([True] * 6, [future.result(5) for future in acked])
+        self.assertEqual([('fizbit', ['0', '1', '2'], ['c']),
+                          ('fizbit', ['3', '4', '5'], ['c'])],
+                         sorted(self.deletes))
+
+    def test_concurrent_acks(self):
+        acker = self._acker(linger=60)
+        messages = [self._message('fizbit', str(i), claim_id=str(i % 2))
+                    for i in range(40)]
+
+        acked = []
+        threads = [threading.Thread(target=lambda msg=msg: acked.append(
+            acker.ack(msg))) for msg in messages]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertTrue(acker.flush(5))
+        self.assertTrue(all(future.result() for future in acked))
+        self.assertEqual(2, len(self.deletes))
+        self.assertEqual(sorted(str(i) for i in range(40)),
+                         sorted(msg_id for _, ids, _ in self.deletes
+                                for msg_id in ids))
+
+    def test_per_queue_outcome(self):
+        self.fail.add('buzz')
+        acker = self._acker(linger=60)
+        deleted = acker.ack(self._message('fizbit', '1'))
+        failed = acker.ack(self._message('buzz', '2'))
+
+        self.assertTrue(acker.flush(5))
+        self.assertTrue(deleted.result())
+        self.assertIsInstance(failed.exception(),
+                              errors.ServiceUnavailableError)
+
+    def test_linger(self):
+        acker = self._acker(linger=0.01)
+        self.assertTrue(acker.ack(self._message('fizbit', '1')).result(5))
+        self.assertEqual([('fizbit', ['1'], ['c'])], self.deletes)
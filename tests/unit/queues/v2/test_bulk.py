@@ -0,0 +1,102 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import mock
+
+from tests.unit.queues import base
+from zaqarclient.transport import errors
+from zaqarclient.transport import response
+
+
+class TestBulk(base.FakeServerTestBase):
+
+    def setUp(self):
+        super(TestBulk, self).setUp()
+        self.sent = []
+        self.failures = {}
+        self.names = ['tenant-1', 'tenant-2', 'zeta']
+
+        sleep_patcher = mock.patch('time.sleep')
+        self.sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def _send(self, request):
+        if request.operation == 'queue_list':
+            queues = [] if request.params.get('marker') else [
+                {'name': name} for name in self.names]
+            return response.Response(request, json.dumps(
+                {'queues': queues, 'links': []}))
+
+        name = request.params['queue_name']
+        with self.lock:
+            self.sent.append((request.operation, name, request.content))
+            errors_left = self.failures.get(name)
+            if errors_left:
+                raise errors_left.pop(0)
+        return response.Response(request, None)
+
+    def test_create_queues(self):
+        self.client.known_queues.add('tenant-1')
+        self.failures['tenant-2'] = [errors.ServiceUnavailableError()]
+        self.failures['tenant-3'] = [errors.ForbiddenError()]
+
+        with mock.patch.object(self.client, '_request_and_transport',
+                               wraps=self.client._request_and_transport
+                               ) as request_and_transport:
+            result = self.client.create_queues(
+                ['tenant-1', 'tenant-2', 'tenant-3'],
+                metadata={'tenant': True})
+
+        self.assertEqual(1, request_and_transport.call_count)
+        self.assertEqual(['tenant-1', 'tenant-2', 'tenant-3'],
+                         sorted(result))
+        self.assertIsNone(result['tenant-1'])
+        self.assertIsNone(result['tenant-2'])
+        self.assertIsInstance(result['tenant-3'], errors.ForbiddenError)
+
+        # NOTE: Queues are created even if known to exist, and
+        # the failure of tenant-2 is retried.
+        self.assertEqual(4, len(self.sent))
+        self.assertEqual({json.dumps({'tenant': True})},
+                         set(content for _, _, content in self.sent))
+        self.assertEqual(1, self.sleep.call_count)
+        self.assertIn('tenant-2', self.client.known_queues)
+        self.assertNotIn('tenant-3', self.client.known_queues)
+
+    def test_retries_exhausted(self):
+        self.failures['tenant-1'] = [errors.ServiceUnavailableError()
+                                     for _ in range(3)]
+        result = self.client.create_queues(['tenant-1'], retries=2)
+        self.assertIsInstance(result['tenant-1'],
+                              errors.ServiceUnavailableError)
+        self.assertEqual(3, len(self.sent))
+        self.assertEqual([mock.call(0.1), mock.call(0.2)],
+                         self.sleep.call_args_list)
+
+    def test_delete_queues_prefix(self):
+        self.client.known_queues.add('tenant-1')
+        self.failures['tenant-2'] = [errors.ResourceNotFound()]
+
+        result = self.client.delete_queues(prefix='tenant-')
+        self.assertEqual({'tenant-1': None, 'tenant-2': None}, result)
+        self.assertEqual([('queue_delete', 'tenant-1', None),
+                          ('queue_delete', 'tenant-2', None)],
+                         sorted(self.sent))
+        self.assertNotIn('tenant-1', self.client.known_queues)
+
+    def test_delete_queues_names(self):
+        result = self.client.delete_queues(names=['zeta'])
+        self.assertEqual({'zeta': None}, result)
+        self.assertRaises(ValueError, self.client.delete_queues)
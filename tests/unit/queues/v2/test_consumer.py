@@ -0,0 +1,246 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+import time
+
+import mock
+
+from tests.unit.queues import base
+from zaqarclient import errors
+from zaqarclient.transport import response
+
+
+class TestConsumer(base.FakeServerTestBase):
+
+    def setUp(self):
+        super(TestConsumer, self).setUp()
+        self.queue = self.client.queue('fizbit')
+        self.available = list(range(10))
+        self.claims = []
+        self.deleted = []
+        self.released = []
+
+    def _send(self, request):
+        with self.lock:
+            if request.operation == 'claim_create':
+                return self._claim_create(request)
+
+            if request.operation == 'message_delete_many':
+                self.deleted.append((sorted(request.params['ids']),
+                                     request.params.get('claim_ids')))
+            if request.operation == 'claim_delete':
+                self.released.append(request.params['claim_id'])
+            return response.Response(None, None)
+
+    def _claim_create(self, request):
+        limit = request.params['limit']
+        messages, self.available = (self.available[:limit],
+                                    self.available[limit:])
+        if not messages:
+            return response.Response(None, None)
+
+        claim_id = 'claim-%d' % len(self.claims)
+        self.claims.append(messages)
+        return response.Response(None, json.dumps({'messages': [{
+            'href': '/v2/queues/fizbit/messages/%d?claim_id=%s' % (
+                body, claim_id),
+            'ttl': 60,
+            'age': 0,
+            'body': body} for body in messages]}))
+
+    def _wait_for(self, predicate):
+        for _ in range(500):
+            if predicate():
+                return
+            time.sleep(0.01)
+        self.fail('Timed out')
+
+    def _consume(self, handler, deletes, **kwargs):
+        kwargs.setdefault('min_poll_interval', 0.01)
+        consumer = self.queue.consumer(handler, **kwargs)
+        self.addCleanup(consumer.stop, 5)
+
+        consumer.start()
+        self._wait_for(lambda: len(self.deleted) >= deletes)
+        self.assertTrue(consumer.stop(5))
+
+    def test_consume(self):
+        handled = []
+        self._consume(handled.append, 3, limit=4)
+
+        self.assertEqual(list(range(10)),
+                         sorted(msg.body for msg in handled))
+        self.assertEqual([[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]],
+                         self.claims)
+        self.assertEqual([([str(i) for i in msgs], ['claim-%d' % index])
+                          for index, msgs in enumerate(self.claims)],
+                         sorted(self.deleted))
+
+    def test_failed_messages_not_deleted(self):
+        def handler(msg):
+            if msg.body % 2:
+                raise errors.ZaqarError('Failed')
+
+        self._consume(handler, 1, limit=10)
+        self.assertEqual([(['0', '2', '4', '6', '8'], ['claim-0'])],
+                         self.deleted)
+
+    def test_renew(self):
+        self._consume(lambda msg: None, 3, limit=4, renew=True)
+        self._wait_for(lambda: len(self.released) == 3)
+        self.assertEqual(['claim-0', 'claim-1', 'claim-2'],
+                         sorted(self.released))
+
+    def test_max_in_flight(self):
+        release = threading.Event()
+        in_flight = []
+
+        def handler(msg):
+            in_flight.append(msg.body)
+            release.wait(5)
+
+        consumer = self.queue.consumer(handler, limit=2, max_in_flight=4,
+                                       min_poll_interval=0.01)
+        self.addCleanup(consumer.stop, 5)
+        consumer.start()
+
+        self._wait_for(lambda: len(in_flight) == 4)
+
+        self.assertEqual(4, consumer.in_flight)
+        self.assertEqual(2, len(self.claims))
+
+        release.set()
+        self.assertTrue(consumer.stop(5))
+        self.assertEqual(0, consumer.in_flight)
+
+    def test_empty_queue_backoff(self):
+        self.available = []
+        consumer = self.queue.consumer(lambda msg: None,
+                                       min_poll_interval=0.01,
+                                       max_poll_interval=0.04)
+
+        with mock.patch.object(consumer._stopped, 'wait') as wait:
+            wait.side_effect = lambda interval: (
+                wait.call_count >= 5 and consumer._stopped.set())
+            consumer._run()
+
+        self.assertEqual([0.01, 0.02, 0.04, 0.04, 0.04],
+                         [call[0][0] for call in wait.call_args_list])
+
+
+class TestMultiQueueConsumer(base.FakeServerTestBase):
+
+    def setUp(self):
+        super(TestMultiQueueConsumer, self).setUp()
+        self.available = {'high': [], 'normal': [], 'low': []}
+        self.claimed = []
+        self.free = {}
+
+    def _send(self, request):
+        name = request.params.get('queue_name')
+        with self.lock:
+            if request.operation == 'queue_get_stats':
+                return response.Response(None, json.dumps(
+                    {'messages': {'free': self.free.get(name, 0)}}))
+            if request.operation != 'claim_create':
+                return response.Response(None, None)
+
+            self.claimed.append(name)
+            limit = request.params['limit']
+            messages = self.available[name][:limit]
+            self.available[name] = self.available[name][limit:]
+
+        if not messages:
+            return response.Response(None, None)
+        return response.Response(None, json.dumps({'messages': [{
+            'href': '/v2/queues/%s/messages/%s?claim_id=c' % (name, body),
+            'ttl': 60,
+            'age': 0,
+            'body': body} for body in messages]}))
+
+    def _consumer(self, handler=None, **kwargs):
+        consumer = self.client.consumer(['high', 'normal', 'low'],
+                                        handler or (lambda msg: None),
+                                        **kwargs)
+        self.addCleanup(consumer.stop, 5)
+        return consumer
+
+    def _schedule(self, consumer, count, now=0):
+        return [consumer._next(now).queue.name for _ in range(count)]
+
+    def test_weights(self):
+        consumer = self._consumer(weights=[3, 2, 1])
+        order = self._schedule(consumer, 6)
+        self.assertEqual({'high': 3, 'normal': 2, 'low': 1},
+                         dict((name, order.count(name))
+                              for name in set(order)))
+        # NOTE: The same queue isn't picked in bursts.
+        self.assertEqual(['high', 'normal', 'high', 'low', 'normal',
+                          'high'], order)
+
+    def test_strict_priority(self):
+        consumer = self._consumer(strict=True, min_poll_interval=1)
+        self.assertEqual(['high'] * 3, self._schedule(consumer, 3))
+
+        consumer._claimed(consumer._scheduled[0], False, 0)
+        self.assertEqual(['normal'] * 2, self._schedule(consumer, 2))
+        self.assertEqual(['high'], self._schedule(consumer, 1, now=1))
+
+    def test_empty_queue_backoff(self):
+        consumer = self._consumer(min_poll_interval=1, max_poll_interval=3)
+        high = consumer._scheduled[0]
+        for backoff in (1, 2, 3, 3):
+            consumer._claimed(high, False, 10)
+            self.assertEqual(backoff, high.backoff)
+        self.assertEqual(13, high.idle_until)
+        self.assertNotIn('high', self._schedule(consumer, 4, now=12))
+
+        consumer._claimed(high, True, 12)
+        self.assertIn('high', self._schedule(consumer, 4, now=12))
+
+        for scheduled in consumer._scheduled:
+            consumer._claimed(scheduled, False, 20)
+        self.assertIsNone(consumer._next(20))
+
+    def test_stats_wake_queues(self):
+        consumer = self._consumer(min_poll_interval=60)
+        for scheduled in consumer._scheduled:
+            consumer._claimed(scheduled, False, 0)
+
+        self.free['normal'] = 5
+        consumer._check_stats(0)
+        self.assertEqual(['normal'], self._schedule(consumer, 1))
+
+    def test_consume(self):
+        self.available = {'high': [1, 2], 'normal': [3], 'low': [4, 5, 6]}
+        handled = []
+        consumer = self._consumer(handled.append, limit=2,
+                                  min_poll_interval=0.01)
+        consumer.start()
+        for _ in range(500):
+            if len(handled) == 6:
+                break
+            time.sleep(0.01)
+        self.assertTrue(consumer.stop(5))
+
+        self.assertEqual([1, 2, 3, 4, 5, 6],
+                         sorted(msg.body for msg in handled))
+        self.assertEqual({'high', 'normal', 'low'}, set(self.claimed))
+
+    def test_invalid_weights(self):
+        self.assertRaises(ValueError, self._consumer, weights=[1, 2])
+        self.assertRaises(ValueError, self._consumer, weights=[1, 0, 1])
+        self.assertRaises(ValueError, self.client.consumer, [],
+                          lambda msg: None)
@@ -13,8 +13,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import mock
+
 from tests.unit.queues.v1 import test_core
+from zaqarclient.queues.v2 import core
+from zaqarclient.transport import request
+from zaqarclient.transport import response
 
 
 class TestV2Core(test_core.TestV1Core):
-    pass
+
+    def test_message_delete_many_claim_ids(self):
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+            resp = response.Response(None, None)
+            send_method.return_value = resp
+
+            req = request.Request()
+            core.message_delete_many(self.transport, req, 'test',
+                                     ids=['a', 'b'], claim_ids=['c'])
+
+            self.assertEqual(['a', 'b'], req.params['ids'])
+            self.assertEqual(['c'], req.params['claim_ids'])
@@ -0,0 +1,99 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+import time
+
+from tests.unit.queues import base
+from zaqarclient.queues.v1 import claim
+from zaqarclient.queues.v1 import lease
+from zaqarclient.transport import errors
+from zaqarclient.transport import response
+
+
+class TestLeaseKeeper(base.FakeServerTestBase):
+
+    def setUp(self):
+        super(TestLeaseKeeper, self).setUp()
+        self.requests = []
+        self.ttls = {}
+        self.expired = set()
+        self.renewed = threading.Event()
+
+        self.keeper = lease.LeaseKeeper(margin=0.15)
+        self.addCleanup(self.keeper.close)
+
+    def _send(self, request):
+        claim_id = request.params['claim_id']
+        if request.operation == 'claim_get':
+            return response.Response(None, json.dumps({
+                'age': 0, 'ttl': self.ttls[claim_id], 'messages': []}))
+
+        body = json.loads(request.content) if request.content else None
+        self.requests.append((request.operation, claim_id, body))
+
+        if claim_id in self.expired:
+            raise errors.ResourceNotFound()
+        if request.operation == 'claim_update':
+            self.renewed.set()
+        return response.Response(None, None)
+
+    def _claim(self, claim_id, ttl=0.2):
+        self.ttls[claim_id] = ttl
+        return claim.Claim(self.queue, id=claim_id, grace=60)
+
+    def test_renew_before_expiry(self):
+        cl = self._claim('a')
+        self.keeper.keep(cl)
+
+        self.assertTrue(self.renewed.wait(5))
+        self.assertEqual(('claim_update', 'a', {'ttl': 0.2}),
+                         self.requests[0])
+        self.assertEqual(1, len(self.keeper))
+
+    def test_release(self):
+        cl = self._claim('a', ttl=60)
+        with self.keeper.lease(cl):
+            self.assertEqual(1, len(self.keeper))
+
+        self.assertEqual(0, len(self.keeper))
+        self.assertEqual([('claim_delete', 'a', None)], self.requests)
+
+    def test_release_without_delete(self):
+        cl = self._claim('a', ttl=60)
+        self.keeper.keep(cl)
+        self.keeper.release(cl, delete=False)
+
+        self.assertEqual(0, len(self.keeper))
+        self.assertEqual([], self.requests)
+
+    def test_failed_renewal_stops(self):
+        self.expired.add('a')
+        self.keeper.keep(self._claim('a', ttl=0.16))
+
+        for _ in range(500):
+            if not len(self.keeper):
+                break
+            time.sleep(0.01)
+
+        self.assertEqual(0, len(self.keeper))
+        self.assertEqual([('claim_update', 'a', {'ttl': 0.16})],
+                         self.requests)
+
+    def test_close_stops_renewals(self):
+        self.keeper.keep(self._claim('a', ttl=60))
+        self.keeper.close()
+
+        self.assertEqual(0, len(self.keeper))
+        self.assertEqual([], self.requests)
@@ -0,0 +1,176 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from tests.unit.queues import base
+from zaqarclient.common import cache
+from zaqarclient.queues.v2 import queues
+from zaqarclient.transport import errors
+from zaqarclient.transport import response
+
+
+class TestMetadataCache(base.FakeServerTestBase):
+
+    fake_clock = True
+
+    def setUp(self):
+        super(TestMetadataCache, self).setUp()
+        self.metadata = {'type': 'Bank Accounts'}
+        self.etag = None
+        self.sent = []
+        self.patches = []
+
+    def _send(self, request):
+        self.sent.append(request.operation)
+        if request.operation == 'queue_update':
+            self.patches.append(json.loads(request.content))
+        headers = {'ETag': self.etag} if self.etag else {}
+        if (request.operation == 'queue_get' and self.etag and
+                request.headers.get('If-None-Match') == self.etag):
+            return response.Response(request, '', headers=headers,
+                                     status_code=304)
+        if request.operation == 'queue_update':
+            for change in json.loads(request.content):
+                key = change['path'].split('/')[-1]
+                if change['op'] == 'remove':
+                    self.metadata.pop(key)
+                else:
+                    self.metadata[key] = change['value']
+        return response.Response(request, json.dumps(self.metadata),
+                                 headers=headers, status_code=200)
+
+    def test_shared_by_queues(self):
+        self.assertEqual(self.metadata, self.queue.metadata())
+        other = self.client.queue(1, auto_create=False)
+        self.assertEqual(self.metadata, other.metadata())
+        self.assertEqual(['queue_get'], self.sent)
+
+    def test_copies_returned(self):
+        self.queue.metadata()['type'] = 'Savings'
+        other = self.client.queue(1, auto_create=False)
+        self.assertEqual(self.metadata, other.metadata())
+        self.assertEqual(['queue_get'], self.sent)
+
+    def test_listed_metadata_kept(self):
+        self.client.metadata_cache = cache.TTLCache(ttl=0)
+        listed = [queues.Queue(self.client, 'q%d' % index,
+                               metadata={'index': index}, auto_create=False)
+                  for index in range(5)]
+        self.assertEqual([{'index': index} for index in range(5)],
+                         [queue.metadata_dict for queue in listed])
+        self.assertEqual([], self.sent)
+
+        self.assertEqual(self.metadata,
+                         listed[0].metadata(force_reload=True))
+        self.assertEqual(['queue_get'], self.sent)
+
+    def test_disabled_kept_on_queue(self):
+        self.client.metadata_cache = cache.TTLCache(ttl=0)
+        for _ in range(3):
+            self.assertEqual(self.metadata, self.queue.metadata())
+        self.assertEqual(['queue_get'], self.sent)
+
+        self.queue.metadata(force_reload=True)
+        self.assertEqual(['queue_get'] * 2, self.sent)
+
+    def test_expires(self):
+        self.queue.metadata()
+        self.now = 59
+        self.queue.metadata()
+        self.assertEqual(['queue_get'], self.sent)
+
+        self.now = 60
+        self.queue.metadata()
+        self.assertEqual(['queue_get'] * 2, self.sent)
+
+    def test_force_reload(self):
+        self.queue.metadata()
+        self.queue.metadata(force_reload=True)
+        self.assertEqual(['queue_get'] * 2, self.sent)
+
+    def test_revalidated_with_etag(self):
+        self.etag = '"1"'
+        metadata = self.queue.metadata()
+
+        self.now = 60
+        self.assertEqual(metadata, self.queue.metadata())
+        self.assertEqual(1, self.client.metadata_cache.stats['revalidated'])
+
+        # NOTE: Fresh again after the revalidation.
+        self.now = 119
+        self.queue.metadata()
+        self.assertEqual(['queue_get'] * 2, self.sent)
+
+    def test_update_uses_cache(self):
+        self.queue.metadata()
+        new_meta = {'type': 'Savings'}
+        self.assertEqual(new_meta, self.queue.metadata(new_meta=new_meta))
+        self.assertEqual(new_meta, self.queue.metadata())
+        self.assertEqual(['queue_get', 'queue_update'], self.sent)
+
+    def test_delete_invalidates(self):
+        self.queue.metadata()
+        self.queue.delete()
+        self.queue.metadata()
+        self.assertEqual(['queue_get', 'queue_delete', 'queue_get'],
+                         self.sent)
+
+    def test_lru_eviction(self):
+        self.client.metadata_cache = cache.TTLCache(maxsize=1)
+        first = self.client.queue('first', auto_create=False)
+        second = self.client.queue('second', auto_create=False)
+
+        first.metadata()
+        second.metadata()
+        first.metadata()
+        self.assertEqual(['queue_get'] * 3, self.sent)
+
+    def test_unchanged_update_not_sent(self):
+        self.queue.metadata()
+        self.queue.metadata(new_meta=dict(self.metadata))
+        self.assertEqual(['queue_get'], self.sent)
+
+    def test_minimal_patch(self):
+        self.metadata.update({'count': 0, 'flag': False, 'big': 'x' * 100})
+        self.queue.metadata(new_meta={'type': 'Bank Accounts', 'count': 1,
+                                      'big': 'x' * 100, 'new': None})
+        self.assertEqual([[
+            {'op': 'replace', 'path': '/metadata/count', 'value': 1},
+            {'op': 'add', 'path': '/metadata/new', 'value': None},
+            {'op': 'remove', 'path': '/metadata/flag'},
+        ]], self.patches)
+
+    def test_stale_cache_retried(self):
+        self.queue.metadata()
+        self.metadata.pop('type')
+        conflicts = [errors.ConflictError()]
+
+        def send(request):
+            if request.operation == 'queue_update' and conflicts:
+                raise conflicts.pop()
+            return self._send(request)
+
+        self.transport.send.side_effect = send
+        new_meta = {'type': 'Savings'}
+        self.assertEqual(new_meta, self.queue.metadata(new_meta=new_meta))
+        self.assertEqual(['queue_get', 'queue_get', 'queue_update'],
+                         self.sent)
+        self.assertEqual([[{'op': 'add', 'path': '/metadata/type',
+                            'value': 'Savings'}]], self.patches)
+
+    def test_metadata_changes(self):
+        self.assertEqual([], queues._metadata_changes({'a': 0}, {'a': 0}))
+        self.assertEqual(
+            [{'op': 'replace', 'path': '/metadata/a', 'value': 1}],
+            queues._metadata_changes({'a': 0}, {'a': 1}))
@@ -0,0 +1,118 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from tests.unit.queues import base
+from zaqarclient.transport import response
+
+
+class TestPartitionedQueue(base.FakeServerTestBase):
+
+    fake_clock = True
+
+    def setUp(self):
+        super(TestPartitionedQueue, self).setUp()
+        self.posts = []
+        self.claims = []
+        self.available = {}
+
+        self.queue = self.client.partitioned_queue('jobs', 3)
+
+    def _send(self, request):
+        name = request.params['queue_name']
+        operation = request.operation
+        with self.lock:
+            if operation == 'message_post':
+                self.posts.append(name)
+                return response.Response(request, json.dumps(
+                    {'resources': ['/v2/queues/%s/messages/1' % name]}))
+
+            if operation == 'claim_create':
+                limit = request.params.get('limit')
+                self.claims.append((name, limit))
+                count = min(self.available.get(name, 0), limit)
+                if not count:
+                    return response.Response(request, None)
+                self.available[name] -= count
+                return response.Response(request, json.dumps({'messages': [
+                    {'href': '/v2/queues/%s/messages/%d?claim_id=c-%s' % (
+                        name, index, name),
+                     'ttl': 60, 'age': 0, 'body': index}
+                    for index in range(count)]}))
+
+            if operation == 'queue_get_stats':
+                index = int(name.split('-')[-1])
+                return response.Response(request, json.dumps({'messages': {
+                    'free': index, 'claimed': 1, 'total': index + 1,
+                    'oldest': {'age': 10 * index},
+                    'newest': {'age': index}}}))
+
+        return response.Response(request, None)
+
+    def test_partition_names(self):
+        self.assertEqual(['jobs-0', 'jobs-1', 'jobs-2'],
+                         [queue.name for queue in self.queue.queues])
+        self.assertRaises(ValueError, self.client.partitioned_queue,
+                          'jobs', 0)
+
+    def test_post_round_robin(self):
+        for _ in range(4):
+            self.queue.post({'ttl': 60, 'body': 'Post It!'})
+        self.assertEqual(['jobs-0', 'jobs-1', 'jobs-2', 'jobs-0'],
+                         self.posts)
+
+    def test_post_by_key(self):
+        for _ in range(3):
+            self.queue.post({'ttl': 60, 'body': 'Post It!'}, key='tenant')
+        self.queue.post({'ttl': 60, 'body': 'Post It!'}, key=b'tenant')
+        self.assertEqual(1, len(set(self.posts)))
+        self.assertEqual(self.posts[0], self.queue.partition('tenant').name)
+
+    def test_claim_rotates(self):
+        self.available = {'jobs-0': 10, 'jobs-1': 10, 'jobs-2': 10}
+        claims = self.queue.claim(limit=4)
+        self.assertEqual(4, sum(len(claim.batch()) for claim in claims))
+        self.assertEqual([('jobs-0', 2), ('jobs-1', 1), ('jobs-2', 1)],
+                         sorted(self.claims))
+
+        del self.claims[:]
+        self.queue.claim(limit=2)
+        self.assertEqual([('jobs-1', 1), ('jobs-2', 1)], sorted(self.claims))
+
+    def test_empty_partition_backoff(self):
+        self.available = {'jobs-1': 10}
+        claims = self.queue.claim(limit=3)
+        self.assertEqual(['jobs-1'], [claim._queue.name for claim in claims])
+
+        del self.claims[:]
+        self.queue.claim(limit=3)
+        self.assertEqual([('jobs-1', 3)], self.claims)
+
+        self.now = 0.1
+        del self.claims[:]
+        self.queue.claim(limit=3)
+        self.assertEqual(['jobs-0', 'jobs-1', 'jobs-2'],
+                         sorted(name for name, _ in self.claims))
+
+        # NOTE: Still empty, the backoff doubles.
+        self.now = 0.25
+        del self.claims[:]
+        self.queue.claim(limit=3)
+        self.assertEqual([('jobs-1', 3)], self.claims)
+
+    def test_stats(self):
+        self.assertEqual({'messages': {
+            'free': 3, 'claimed': 3, 'total': 6,
+            'oldest': {'age': 20}, 'newest': {'age': 0}}},
+            self.queue.stats)
@@ -0,0 +1,68 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from tests.unit.queues import base
+from zaqarclient.queues.v1 import registry
+from zaqarclient.transport import errors
+from zaqarclient.transport import response
+
+
+class TestKnownQueues(base.FakeServerTestBase):
+
+    fake_clock = True
+
+    def setUp(self):
+        super(TestKnownQueues, self).setUp()
+        self.sent = []
+        self.missing = set()
+
+    def _send(self, request):
+        self.sent.append(request.operation)
+        if request.params.get('queue_name') in self.missing:
+            raise errors.ResourceNotFound()
+        return response.Response(request, None)
+
+    def test_created_once(self):
+        self.client.queue('fizbit', force_create=True)
+        self.client.queue('fizbit', force_create=True)
+        self.client.queue('fizbit', force_create=True)
+        self.assertEqual(['queue_create'], self.sent)
+
+    def test_forgotten_after_ttl(self):
+        self.client.queue('fizbit', force_create=True)
+        self.now = 60
+        self.client.queue('fizbit', force_create=True)
+        self.assertEqual(['queue_create'] * 2, self.sent)
+
+    def test_forgotten_when_not_found(self):
+        queue = self.client.queue('fizbit', force_create=True)
+        self.missing.add('fizbit')
+        self.assertRaises(errors.ResourceNotFound, queue.post,
+                          {'ttl': 60, 'body': 'Post It!'})
+
+        self.missing.clear()
+        self.client.queue('fizbit', force_create=True)
+        self.assertEqual(['queue_create', 'message_post', 'queue_create'],
+                         self.sent)
+
+    def test_forgotten_when_deleted(self):
+        self.client.queue('fizbit', force_create=True).delete()
+        self.client.queue('fizbit', force_create=True)
+        self.assertEqual(['queue_create', 'queue_delete', 'queue_create'],
+                         self.sent)
+
+    def test_disabled(self):
+        self.client.known_queues = registry.KnownQueues(ttl=0)
+        self.client.queue('fizbit', force_create=True)
+        self.client.queue('fizbit', force_create=True)
+        self.assertEqual(['queue_create'] * 2, self.sent)
@@ -0,0 +1,161 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+
+import mock
+
+from tests.unit.queues import base
+from zaqarclient.queues.v1 import stats
+from zaqarclient.tests import base as tests_base
+from zaqarclient.transport import errors
+from zaqarclient.transport import response
+
+
+class TestStatsCollector(base.FakeServerTestBase):
+
+    fake_clock = True
+
+    def setUp(self):
+        super(TestStatsCollector, self).setUp()
+        self.names = ['alpha-1', 'alpha-2', 'beta-1', 'gamma-1']
+        self.missing = set()
+        self.requested = []
+
+    def _send(self, request):
+        if request.operation == 'queue_list':
+            if request.params.get('marker'):
+                return response.Response(request, json.dumps(
+                    {'queues': [], 'links': []}))
+            return response.Response(request, json.dumps({
+                'queues': [{'name': name} for name in self.names],
+                'links': [{'rel': 'next',
+                           'href': '/v2/queues?marker=gamma-1'}]}))
+
+        name = request.params['queue_name']
+        with self.lock:
+            self.requested.append(name)
+        if name in self.missing:
+            raise errors.ResourceNotFound()
+        return response.Response(request, json.dumps(
+            {'messages': {'total': len(name)}}))
+
+    def test_names(self):
+        self.missing.add('beta-1')
+        snapshot = self.client.stats_many(
+            names=['alpha-1', 'beta-1']).snapshot()
+
+        self.assertEqual({'alpha-1': {'messages': {'total': 7}}},
+                         snapshot.stats)
+        self.assertIsInstance(snapshot.errors['beta-1'],
+                              errors.ResourceNotFound)
+        self.assertEqual({'alpha-1', 'beta-1'}, set(snapshot.timestamps))
+        self.assertLessEqual(snapshot.started_at, snapshot.finished_at)
+
+    def test_prefix(self):
+        snapshot = self.client.stats_many(prefix='alpha-').snapshot()
+        self.assertEqual(['alpha-1', 'alpha-2'], sorted(snapshot.stats))
+        self.assertEqual(['alpha-1', 'alpha-2'], sorted(self.requested))
+
+    def test_snapshot_cached(self):
+        collector = self.client.stats_many(names=['alpha-1'], ttl=10)
+        first = collector.snapshot()
+        self.now = 9
+        self.assertIs(first, collector.snapshot())
+
+        self.now = 10
+        self.assertIsNot(first, collector.snapshot())
+        self.assertIsNot(first, collector.snapshot(force_reload=True))
+        self.assertEqual(3, len(self.requested))
+
+    def test_sampler(self):
+        collector = self.client.stats_many(names=['alpha-1'])
+        collected = threading.Event()
+        collect = collector.collect
+
+        def notify():
+            snapshot = collect()
+            collected.set()
+            return snapshot
+
+        with mock.patch.object(collector, 'collect', side_effect=notify):
+            with collector.start(interval=60):
+                self.assertTrue(collected.wait(5))
+
+        self.assertEqual(['alpha-1'], self.requested)
+        self.assertIn('alpha-1', collector.snapshot())
+
+    def test_names_or_prefix(self):
+        self.assertRaises(ValueError, self.client.stats_many)
+        self.assertRaises(ValueError, self.client.stats_many,
+                          names=['alpha-1'], prefix='alpha-')
+
+    def test_history(self):
+        collector = self.client.stats_many(names=['alpha-1', 'beta-1'],
+                                           ttl=0, history_size=3)
+        for _ in range(4):
+            collector.snapshot()
+
+        history = collector.history
+        self.assertEqual(['alpha-1', 'beta-1'], sorted(history))
+        self.assertEqual([7.0] * 3, history['alpha-1'].samples('total'))
+
+        # NOTE: Queues whose stats can't be gotten keep their history.
+        self.missing.add('beta-1')
+        collector.snapshot()
+        self.assertEqual(3, len(collector.history['beta-1']))
+
+
+class TestStatsHistory(tests_base.TestBase):
+
+    def _history(self, totals, size=10):
+        history = stats.StatsHistory(size)
+        for timestamp, total in enumerate(totals):
+            history.record({'messages': {'total': total, 'free': total,
+                                         'claimed': 0}},
+                           timestamp=timestamp * 10)
+        return history
+
+    def test_ring_buffer(self):
+        history = self._history(range(5), size=3)
+        self.assertEqual(3, len(history))
+        self.assertEqual([2, 3, 4], history.samples('total'))
+        self.assertEqual([20, 30, 40], history.samples('timestamp'))
+        self.assertEqual([4], history.samples('total', window=5))
+
+    def test_trend(self):
+        history = self._history([100, 90, 80, 70])
+        self.assertEqual(-1, history.trend())
+        self.assertEqual(70, history.time_to_drain())
+
+        self.assertIsNone(self._history([1, 2]).time_to_drain())
+        self.assertEqual(0, self._history([1, 0]).time_to_drain())
+        self.assertIsNone(self._history([1]).trend())
+
+    def test_rates(self):
+        history = self._history([0, 20, 10, 30])
+        self.assertEqual(40 / 30.0, history.ingress_rate())
+        self.assertEqual(10 / 30.0, history.egress_rate())
+        self.assertEqual(2, history.ingress_rate(window=10))
+        self.assertIsNone(self._history([5]).egress_rate())
+
+    def test_fields(self):
+        history = stats.StatsHistory(2)
+        history.record({'messages': {'total': 3, 'free': 1, 'claimed': 2,
+                                     'oldest': {'age': 30},
+                                     'newest': {'age': 5}}})
+        self.assertEqual([30], history.samples('oldest_age'))
+        self.assertEqual([5], history.samples('newest_age'))
+        self.assertEqual([2], history.samples('claimed'))
+        self.assertRaises(ValueError, stats.StatsHistory, 1)
@@ -0,0 +1,100 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+
+from zaqarclient.tests import base
+
+# NOTE: Modules that must not be imported unless the feature that needs
+# them is actually used.
+HEAVY_MODULES = ('jsonschema', 'keystoneauth1', 'pkg_resources', 'requests',
+                 'stevedore')
+
+
+class TestImportTime(base.TestBase):
+
+    def setUp(self):
+        super(TestImportTime, self).setUp()
+        if sys.version_info < (3, 7):
+            self.skipTest('-X importtime requires Python >= 3.7')
+
+    def _imported_modules(self, code):
+        """Runs `code` in a new interpreter and returns what it imported
+
+        :returns: A dict mapping module names to their cumulative import
+            time in microseconds, as reported by `-X importtime`.
+        """
+        proc = subprocess.Popen([sys.executable, '-X', 'importtime',
+                                 '-c', code],
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                universal_newlines=True)
+        _, stderr = proc.communicate()
+        self.assertEqual(0, proc.returncode, stderr)
+
+        modules = {}
+        for line in stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                modules[name.strip()] = int(cumulative)
+        return modules
+
+    def _assert_not_imported(self, modules, *names):
+        for name in names:
+            loaded = [mod for mod in modules
+                      if mod == name or mod.startswith(name + '.')]
+            self.assertEqual([], loaded,
+                             '%s should be imported lazily' % name)
+
+    def test_import_client(self):
+        modules = self._imported_modules('import zaqarclient.queues.client')
+        self.assertIn('zaqarclient.queues.client', modules)
+        self._assert_not_imported(modules, *HEAVY_MODULES)
+
+    def test_import_client_old_pbr(self):
+        # NOTE: Older pbr releases get the version from pkg_resources.
+        code = ('import pbr.version\n'
+                'def version_string(self):\n'
+                '    import pkg_resources\n'
+                '    return "0"\n'
+                'pbr.version.VersionInfo.version_string = version_string\n'
+                'import zaqarclient.queues.client\n')
+        modules = self._imported_modules(code)
+        self._assert_not_imported(modules, *HEAVY_MODULES)
+
+    def test_import_cli_plugin(self):
+        modules = self._imported_modules('import zaqarclient.queues.cli')
+        self.assertIn('zaqarclient.queues.cli', modules)
+        self._assert_not_imported(modules, 'osc_lib', 'oslo_log',
+                                  *HEAVY_MODULES)
+
+    def test_noauth_request(self):
+        code = ('from zaqarclient.queues import client\n'
+                'cli = client.Client("http://127.0.0.1:8888", version=2,\n'
+                '                    conf={"auth_opts": '
+                '{"backend": "noauth"}})\n'
+                'req, trans = cli._request_and_transport()\n'
+                'req.api\n')
+        modules = self._imported_modules(code)
+        self.assertIn('stevedore', modules)
+        self._assert_not_imported(modules, 'jsonschema', 'keystoneauth1')
+
+    def test_keystone_backend(self):
+        code = ('from zaqarclient import auth\n'
+                'auth.get_backend("keystone")\n')
+        modules = self._imported_modules(code)
+        self.assertIn('keystoneauth1', modules)
@@ -0,0 +1,126 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+
+import mock
+
+from zaqarclient.queues import client
+from zaqarclient.tests import base
+from zaqarclient.tests.transport import dummy
+from zaqarclient.transport import coalesce
+from zaqarclient.transport import errors
+from zaqarclient.transport import response
+
+
+class TestCoalescer(base.TestBase):
+
+    def setUp(self):
+        super(TestCoalescer, self).setUp()
+        conf = dict(self.conf, coalesce_requests=True)
+        self.client = client.Client('http://127.0.0.1:8888', version=2,
+                                    conf=conf)
+        self.transport = dummy.DummyTransport(conf)
+        self.client._get_transport = mock.Mock(return_value=self.transport)
+
+        self.release = threading.Event()
+        self.sent = []
+        self.error = None
+
+        patcher = mock.patch.object(self.transport, 'send',
+                                    side_effect=self._send)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _send(self, request):
+        self.sent.append(request.operation)
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return response.Response(request, json.dumps(
+            {'messages': {'total': len(self.sent)}}))
+
+    def _concurrently(self, function, count=5):
+        results = [None] * count
+        errors_raised = [None] * count
+
+        def call(index):
+            try:
+                results[index] = function()
+            except Exception as ex:
+                errors_raised[index] = ex
+
+        threads = [threading.Thread(target=call, args=(index,))
+                   for index in range(count)]
+        for thread in threads:
+            thread.start()
+
+        # NOTE: Waits for the callers to wait for the first request.
+        while self.client.coalescer.stats['requests'] < count:
+            threading.Event().wait(0.001)
+        self.release.set()
+
+        for thread in threads:
+            thread.join()
+        return results, errors_raised
+
+    def test_identical_gets_coalesced(self):
+        queue = self.client.queue('fizbit', auto_create=False)
+        results, _ = self._concurrently(lambda: queue.stats)
+
+        self.assertEqual(['queue_get_stats'], self.sent)
+        self.assertEqual([{'total': 1}] * 5,
+                         [stats['messages'] for stats in results])
+        # NOTE: Callers don't share the deserialized content.
+        self.assertEqual(5, len(set(id(stats) for stats in results)))
+        self.assertEqual({'requests': 5, 'coalesced': 4},
+                         self.client.coalescer.stats)
+
+    def test_different_params_not_coalesced(self):
+        self.release.set()
+        names = iter(['fizbit', 'buzbit'])
+        lock = threading.Lock()
+
+        def stats():
+            with lock:
+                name = next(names)
+            return self.client.queue(name, auto_create=False).stats
+
+        self._concurrently(stats, count=2)
+        self.assertEqual(2, len(self.sent))
+
+    def test_error_shared(self):
+        self.error = errors.ServiceUnavailableError()
+        queue = self.client.queue('fizbit', auto_create=False)
+        _, raised = self._concurrently(lambda: queue.stats, count=3)
+
+        self.assertEqual(1, len(self.sent))
+        self.assertEqual([self.error] * 3, raised)
+
+    def test_writes_not_coalesced(self):
+        self.release.set()
+        queue = self.client.queue('fizbit', auto_create=False)
+        self.transport.send.side_effect = None
+        self.transport.send.return_value = response.Response(None, None)
+
+        queue.delete()
+        queue.delete()
+        self.assertEqual(2, self.transport.send.call_count)
+        self.assertEqual({'requests': 0, 'coalesced': 0},
+                         self.client.coalescer.stats)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(coalesce.Coalescer.from_conf({}))
+        cli = client.Client('http://127.0.0.1:8888', version=2, conf={})
+        self.assertIsNone(cli.coalescer)
@@ -0,0 +1,169 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import mock
+
+from zaqarclient.common import concurrency
+from zaqarclient import errors
+from zaqarclient.queues import client
+from zaqarclient.tests import base
+from zaqarclient.tests.transport import dummy
+from zaqarclient.transport import ratelimit
+from zaqarclient.transport import request
+from zaqarclient.transport import response
+
+
+class TestTokenBucket(base.TestBase):
+
+    def test_burst_then_rate(self):
+        with mock.patch.object(concurrency, 'monotonic', return_value=0):
+            bucket = ratelimit.TokenBucket(2, capacity=4)
+
+        self.assertEqual(0, bucket.reserve(4, 0))
+        self.assertEqual(0.5, bucket.reserve(1, 0))
+        self.assertFalse(bucket.available(1, 0.5))
+        self.assertTrue(bucket.available(1, 1))
+        # NOTE: The bucket never holds more than its capacity.
+        self.assertEqual(0, bucket.reserve(4, 100))
+        self.assertEqual(0.5, bucket.reserve(1, 100))
+
+
+class TestRateLimiter(base.TestBase):
+
+    def setUp(self):
+        super(TestRateLimiter, self).setUp()
+        self.now = 0
+
+        now_patcher = mock.patch.object(concurrency, 'monotonic',
+                                        side_effect=lambda: self.now)
+        now_patcher.start()
+        self.addCleanup(now_patcher.stop)
+
+        sleep_patcher = mock.patch('time.sleep')
+        self.sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def _request(self, operation='message_post', queue_name='fizbit',
+                 content=None):
+        req = request.Request(operation=operation,
+                              params={'queue_name': queue_name})
+        req.content = content
+        return req
+
+    def test_requests_per_second(self):
+        limiter = ratelimit.RateLimiter(requests_per_second=2)
+
+        self.assertEqual(0, limiter.acquire(self._request()))
+        self.assertEqual(0, limiter.acquire(self._request()))
+        self.assertEqual(0.5, limiter.acquire(self._request()))
+        self.sleep.assert_called_once_with(0.5)
+
+        stats = limiter.stats
+        self.assertEqual(3, stats['requests'])
+        self.assertEqual(1, stats['delayed'])
+        self.assertEqual(0.5, stats['wait_time'])
+
+    def test_bytes_per_second(self):
+        limiter = ratelimit.RateLimiter(bytes_per_second=100)
+
+        self.assertEqual(0, limiter.acquire(self._request(content='a' * 100)))
+        self.assertEqual(0.5, limiter.acquire(self._request(content='a' * 50)))
+
+    def test_fail_fast(self):
+        limiter = ratelimit.RateLimiter(requests_per_second=1, block=False)
+
+        limiter.acquire(self._request())
+        self.assertRaises(errors.RateLimitExceeded, limiter.acquire,
+                          self._request())
+        self.assertEqual(1, limiter.stats['rejected'])
+
+        self.now = 1
+        self.assertEqual(0, limiter.acquire(self._request()))
+
+    def test_bytes_encoded(self):
+        limiter = ratelimit.RateLimiter(bytes_per_second=100)
+
+        self.assertEqual(0, limiter.acquire(self._request(
+            content=u'\u00e9' * 50)))
+        self.assertEqual(0.5, limiter.acquire(self._request(
+            content=b'a' * 50)))
+
+    def test_fail_fast_larger_than_burst(self):
+        limiter = ratelimit.RateLimiter(bytes_per_second=100, block=False)
+
+        self.assertRaises(errors.RateLimitExceeded, limiter.acquire,
+                          self._request(content='a' * 101))
+        self.sleep.assert_not_called()
+        self.assertEqual(0, limiter.acquire(self._request(
+            content='a' * 100)))
+
+    def test_queue_and_operation_limits(self):
+        limiter = ratelimit.RateLimiter(
+            requests_per_second=100,
+            queues={'fizbit': {'requests_per_second': 1}},
+            operations={'claim_create': {'requests_per_second': 1}})
+
+        self.assertEqual(0, limiter.acquire(self._request()))
+        self.assertEqual(1, limiter.acquire(self._request()))
+        self.assertEqual(0, limiter.acquire(self._request(queue_name='buzz')))
+        self.assertEqual(0, limiter.acquire(self._request(
+            operation='claim_create', queue_name='buzz')))
+        self.assertEqual(1, limiter.acquire(self._request(
+            operation='claim_create', queue_name='buzz')))
+
+    def test_queue_limit_overrides_global(self):
+        limiter = ratelimit.RateLimiter(
+            requests_per_second=1,
+            queues={'hot': {'requests_per_second': 10}})
+
+        for _ in range(10):
+            self.assertEqual(0, limiter.acquire(self._request(
+                queue_name='hot')))
+        # NOTE: Requests about other queues are still within the
+        # client-wide limit, untouched by those about `hot`.
+        self.assertEqual(0, limiter.acquire(self._request()))
+        self.assertEqual(1, limiter.acquire(self._request()))
+
+    def test_override_per_kind(self):
+        limiter = ratelimit.RateLimiter(
+            requests_per_second=1, bytes_per_second=100,
+            operations={'message_post': {'requests_per_second': 10}})
+
+        self.assertEqual(0, limiter.acquire(self._request(content='a' * 100)))
+        self.assertEqual(0.5, limiter.acquire(self._request(
+            content='a' * 50)))
+
+    def test_client_send_path(self):
+        conf = dict(self.conf, rate_limit={'requests_per_second': 1})
+        cli = client.Client('http://127.0.0.1:8888', version=2, conf=conf)
+        transport = dummy.DummyTransport(conf)
+        cli._get_transport = mock.Mock(return_value=transport)
+
+        with mock.patch.object(transport, 'send',
+                               autospec=True) as send_method:
+            send_method.return_value = response.Response(
+                None, json.dumps({'messages': {'total': 0}}))
+
+            cli.queue('fizbit').stats
+            cli.queue('fizbit').stats
+            self.assertEqual(2, send_method.call_count)
+
+        self.assertEqual(1, cli.rate_limiter.stats['delayed'])
+        self.sleep.assert_called_once_with(1)
+
+    def test_no_limits(self):
+        self.assertIsNone(ratelimit.RateLimiter.from_conf({}))
+        cli = client.Client('http://127.0.0.1:8888', version=2, conf={})
+        self.assertIsNone(cli.rate_limiter)
@@ -0,0 +1,82 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measures the listing throughput of `_Iterator` for large pages.
+
+`_Iterator` is compared with an iterator consuming pages through
+`list.pop(0)`, which is what it used to do. No server is needed, the
+pages are built in memory::
+
+    python tools/bench_iterator.py --pages 10 1000 10000
+"""
+
+from __future__ import print_function
+
+import argparse
+import timeit
+
+from zaqarclient.queues.v1 import iterator
+
+
+class _PopFrontIterator(iterator._Iterator):
+    """`_Iterator` consuming its page with `list.pop(0)`"""
+
+    def _set_page(self, items):
+        self._listing_response = list(items or [])
+
+    def __next__(self):
+        try:
+            args = self._listing_response.pop(0)
+        except IndexError:
+            raise StopIteration
+        return self._create_function(args)
+
+    next = __next__
+
+
+def _listing(size):
+    return {'links': [],
+            'messages': [{'href': '/v2/queues/q/messages/%d' % i,
+                          'ttl': 300, 'age': 1, 'body': i}
+                         for i in range(size)]}
+
+
+def _throughput(iterator_cls, size, pages):
+    elapsed = 0.0
+    for _ in range(pages):
+        listing = _listing(size)
+        start = timeit.default_timer()
+        for _ in iterator_cls(None, listing, 'messages', lambda args: args):
+            pass
+        elapsed += timeit.default_timer() - start
+    return size * pages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('page_sizes', metavar='PAGE_SIZE', type=int,
+                        nargs='*', default=[100, 1000, 10000])
+    parser.add_argument('--pages', type=int, default=10,
+                        help='Pages to consume per page size')
+    args = parser.parse_args()
+
+    print('{0:>10} {1:>18} {2:>18}'.format('page size', 'pop(0) items/s',
+                                           'deque items/s'))
+    for size in args.page_sizes:
+        print('{0:>10} {1:>18,.0f} {2:>18,.0f}'.format(
+            size,
+            _throughput(_PopFrontIterator, size, args.pages),
+            _throughput(iterator._Iterator, size, args.pages)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compares the cost of building `Message` objects.
+
+The slotted `Message` is compared with a `__dict__` based copy of
+the class as it used to be, which parsed the message id out of the
+href on creation. The slotted `Message` parses them on first access
+instead and caches them, hence the ids are read twice::
+
+    python tools/bench_resources.py --count 100000
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+
+from zaqarclient.queues.v2 import message
+
+
+class _DictMessage(object):
+    """`__dict__` based message, parsing its id eagerly"""
+
+    def __init__(self, queue, ttl, age, body, href=None, id=None,
+                 claim_id=None):
+        self.queue = queue
+        self.href = href
+        self.ttl = ttl
+        self.age = age
+        self.body = body
+
+        if id is None:
+            self.id = href.split('/')[-1]
+            if '?' in self.id:
+                self.id = self.id.split('?')[0]
+        else:
+            self.id = id
+
+    @property
+    def claim_id(self):
+        if '=' in self.href:
+            return self.href.split('=')[-1]
+
+
+def _messages(count):
+    return [{'href': '/v2/queues/q/messages/%024x?claim_id=%024x' % (i, i),
+             'ttl': 300, 'age': 1, 'body': {'index': i}}
+            for i in range(count)]
+
+
+def _build(message_cls, listing):
+    return [message_cls(None, **args) for args in listing]
+
+
+def _measure(message_cls, listing):
+    gc.collect()
+    start = timeit.default_timer()
+    built = _build(message_cls, listing)
+    build_time = timeit.default_timer() - start
+
+    access_times = []
+    for _ in range(2):
+        start = timeit.default_timer()
+        for msg in built:
+            msg.id
+            msg.claim_id
+        access_times.append(timeit.default_timer() - start)
+    del built
+
+    gc.collect()
+    tracemalloc.start()
+    built = _build(message_cls, listing)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del built
+    return build_time, access_times, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000,
+                        help='Number of messages to build')
+    args = parser.parse_args()
+
+    listing = _messages(args.count)
+    print('{0:<10} {1:>14} {2:>16} {3:>16} {4:>12}'.format(
+        'class', 'build msgs/s', 'id+claim_id /s', 'again /s',
+        'memory MiB'))
+    for name, message_cls in (('__dict__', _DictMessage),
+                              ('__slots__', message.Message)):
+        build_time, access_times, memory = _measure(message_cls, listing)
+        print('{0:<10} {1:>14,.0f} {2:>16,.0f} {3:>16,.0f} {4:>12.1f}'.format(
+            name, args.count / build_time, args.count / access_times[0],
+            args.count / access_times[1], memory / 1024.0 / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -13,15 +13,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from oslo_utils import importutils
 
-from zaqarclient.auth import base
-from zaqarclient.auth import keystone
-from zaqarclient.auth import signed_url
-
+# NOTE: Backends are referenced by path and imported the first time they're
+# requested. This keeps keystoneauth1 out of `noauth` and `signed-url`
+# clients.
 _BACKENDS = {
-    'noauth': base.NoAuth,
-    'keystone': keystone.KeystoneAuth,
-    'signed-url': signed_url.SignedURLAuth,
+    'noauth': 'zaqarclient.auth.base.NoAuth',
+    'keystone': 'zaqarclient.auth.keystone.KeystoneAuth',
+    'signed-url': 'zaqarclient.auth.signed_url.SignedURLAuth',
 }
 
 
@@ -38,5 +38,6 @@ def get_backend(backend='keystone', options=None):
     if options is None:
         options = {}
 
-    backend = _BACKENDS[backend](options)
+    backend_cls = importutils.import_class(_BACKENDS[backend])
+    backend = backend_cls(options)
     return backend
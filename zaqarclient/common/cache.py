@@ -0,0 +1,123 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Caches values for a while, evicting the least recently used."""
+
+import collections
+import threading
+
+from zaqarclient.common import concurrency
+
+
+class _Entry(object):
+    """A cached value and the ETag it was gotten with, if any"""
+
+    __slots__ = ('value', 'etag', 'expires')
+
+    def __init__(self, value, etag, expires):
+        self.value = value
+        self.etag = etag
+        self.expires = expires
+
+
+class TTLCache(object):
+    """Keeps up to `maxsize` values for `ttl` seconds
+
+    Expired values are kept, along with their ETag, until they're
+    evicted so they can be revalidated rather than gotten again.
+    Once `maxsize` values are cached, the least recently used one
+    is evicted for a new one.
+
+    :param maxsize: (Default 1024) Maximum number of values.
+    :type maxsize: int
+    :param ttl: (Default 60) Number of seconds values are fresh for,
+        0 not to cache them.
+    :type ttl: float
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'revalidated': 0,
+                       'evictions': 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def enabled(self):
+        """Whether values are cached at all"""
+        return bool(self.ttl and self.maxsize)
+
+    @property
+    def stats(self):
+        """Number of hits, misses, revalidations and evictions"""
+        with self._lock:
+            return dict(self._stats)
+
+    def get(self, key):
+        """Returns the fresh value of `key`, `None` if there's none"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires <= concurrency.monotonic():
+                self._stats['misses'] += 1
+                return None
+
+            self._entries[key] = self._entries.pop(key)
+            self._stats['hits'] += 1
+            return entry.value
+
+    def etag(self, key):
+        """Returns the ETag of the value of `key`, even if it expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.etag if entry is not None else None
+
+    def set(self, key, value, etag=None):
+        """Caches `value` for `key`, replacing the current one"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+            expires = concurrency.monotonic() + self.ttl
+            self._entries[key] = _Entry(value, etag, expires)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def revalidate(self, key):
+        """Makes the value of `key` fresh again
+
+        :returns: The value, `None` if it was evicted meanwhile.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            entry.expires = concurrency.monotonic() + self.ttl
+            self._entries[key] = self._entries.pop(key)
+            self._stats['revalidated'] += 1
+            return entry.value
+
+    def invalidate(self, key):
+        """Forgets the value of `key`"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Forgets all the values"""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,239 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Helpers to run client operations concurrently."""
+
+import collections
+import contextlib
+import threading
+import time
+
+from concurrent import futures
+
+from zaqarclient.transport import errors
+
+DEFAULT_MAX_WORKERS = 10
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+def monotonic():
+    """Returns the time of a clock that doesn't go back, in seconds
+
+    It's the clock durations are measured with by all the modules of
+    the client, `time.monotonic` when there's one.
+    """
+    return _clock()
+
+
+def overload_errors():
+    """Returns the errors meaning the server is overloaded
+
+    Timeouts are raised by requests as they are.
+    """
+    # NOTE: requests is imported here rather than at module level so
+    # that importing the client doesn't pay for it, see `common.http`.
+    import requests
+    return (errors.ServiceUnavailableError, requests.exceptions.Timeout)
+
+
+def imap(function, iterable, max_workers=DEFAULT_MAX_WORKERS):
+    """Lazily maps `function` over `iterable` using a pool of threads
+
+    Unlike `Executor.map`, `iterable` is consumed as results are
+    requested so it can be a stream of any length. At most twice
+    `max_workers` calls are pending at any time. Results are
+    returned in the order of `iterable`.
+
+    The first exception raised by `function` is re-raised when its
+    result is reached, calls that haven't started yet are cancelled.
+    They're also cancelled if the caller stops iterating.
+
+    :param function: Callable taking one item of `iterable`.
+    :param iterable: Items to map `function` over.
+    :param max_workers: (Default 10) Number of threads to use.
+    :type max_workers: int
+    """
+    pending = collections.deque()
+    executor = futures.ThreadPoolExecutor(max_workers)
+    try:
+        for item in iterable:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= max_workers * 2:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+class AdaptiveLimiter(object):
+    """Adapts the number of concurrent operations to the server's load
+
+    The limit is raised additively, by `increase` once a whole limit's
+    worth of operations completed within `target_latency` seconds. It's
+    multiplied by `decrease` when an operation fails because the server
+    is overloaded or doesn't answer in time. Operations that started
+    before the limit was last decreased don't decrease it again, a
+    burst of failures only cuts the limit once.
+
+    Operations take a slot with `slot`, waiting while the limit
+    is reached. A limiter is meant to be shared by all the concurrent
+    operations of a client, see the `adaptive_concurrency` option.
+
+    :param initial_limit: (Default 10) Limit to start from.
+    :type initial_limit: int
+    :param min_limit: (Default 1) Lowest limit.
+    :type min_limit: int
+    :param max_limit: (Default 100) Highest limit.
+    :type max_limit: int
+    :param target_latency: (Default 1) Number of seconds operations
+        should take at most.
+    :type target_latency: float
+    :param increase: (Default 1) Number the limit is raised by.
+    :type increase: float
+    :param decrease: (Default 0.5) Factor the limit is cut by.
+    :type decrease: float
+    :param history_size: (Default 100) Number of changes of the
+        limit to remember.
+    :type history_size: int
+    """
+
+    def __init__(self, initial_limit=DEFAULT_MAX_WORKERS, min_limit=1,
+                 max_limit=100, target_latency=1.0, increase=1,
+                 decrease=0.5, history_size=100):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self._increase = increase
+        self._decrease = decrease
+
+        self._cond = threading.Condition()
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._fast = 0
+        self._decreased_at = None
+        self._history = collections.deque(maxlen=history_size)
+        self._history.append((time.time(), self.limit))
+
+    @classmethod
+    def from_conf(cls, conf):
+        """Creates a limiter from a client's options
+
+        :returns: The limiter or `None` if the option isn't set.
+        """
+        options = conf.get('adaptive_concurrency')
+        if not options:
+            return None
+        if options is True:
+            options = {}
+        return cls(**options)
+
+    @property
+    def limit(self):
+        """Current maximum number of concurrent operations"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        """Number of operations holding a slot"""
+        return self._in_flight
+
+    @property
+    def history(self):
+        """Changes of the limit, as a list of `(timestamp, limit)`"""
+        with self._cond:
+            return list(self._history)
+
+    def _set_limit(self, limit):
+        limit = min(max(limit, self.min_limit), self.max_limit)
+        changed = int(limit) != self.limit
+        self._limit = limit
+        if changed:
+            self._history.append((time.time(), self.limit))
+            self._cond.notify_all()
+
+    def acquire(self):
+        """Waits for a slot
+
+        :returns: The time the slot was taken at, to pass to `release`.
+        """
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+            return monotonic()
+
+    def release(self, started, overloaded=False, adapt=True):
+        """Frees the slot taken at `started` and adapts the limit
+
+        :param started: The time returned by `acquire`.
+        :param overloaded: Whether the operation failed because the
+            server is overloaded.
+        :type overloaded: bool
+        :param adapt: (Default True) Whether the operation tells
+            anything about the server's load.
+        :type adapt: bool
+        """
+        now = monotonic()
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+            if not adapt:
+                return
+
+            if overloaded:
+                if (self._decreased_at is None or
+                        started >= self._decreased_at):
+                    self._decreased_at = now
+                    self._fast = 0
+                    self._set_limit(self._limit * self._decrease)
+            elif now - started <= self.target_latency:
+                # NOTE: Operations within the target since the
+                # limit was last raised, it's raised once there's
+                # been a whole limit's worth of them.
+                self._fast += 1
+                if self._fast >= self._limit:
+                    self._fast = 0
+                    self._set_limit(self._limit + self._increase)
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Holds a slot while the context is active
+
+        The latency of the context and the errors it raises adapt
+        the limit. Errors other than `overload_errors` leave it as is.
+        """
+        started = self.acquire()
+        try:
+            yield
+        except Exception as ex:
+            overloaded = isinstance(ex, overload_errors())
+            self.release(started, overloaded=overloaded, adapt=overloaded)
+            raise
+        else:
+            self.release(started)
+
+
+@contextlib.contextmanager
+def slot(limiter):
+    """Holds a slot of `limiter`, if it's not `None`"""
+    if limiter is None:
+        yield
+        return
+
+    with limiter.slot():
+        yield
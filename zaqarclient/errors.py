@@ -14,7 +14,8 @@
 
 from zaqarclient._i18n import _  # noqa
 
-__all__ = ['ZaqarError', 'DriverLoadFailure', 'InvalidOperation']
+__all__ = ['ZaqarError', 'DriverLoadFailure', 'InvalidOperation',
+           'PartialPostError', 'RateLimitExceeded']
 
 
 class ZaqarError(Exception):
@@ -38,3 +39,26 @@ class InvalidOperation(ZaqarError):
 
 class UnsupportedVersion(ZaqarError):
     """Raised if there is no endpoint which supports the requested version."""
+
+
+class PartialPostError(ZaqarError):
+    """Raised if some chunks of a message post couldn't be posted.
+
+    :param result: The aggregated result of the chunks that were posted.
+    :type result: `dict`
+    :param failures: `(offset, count, error)` tuples for every failed
+        chunk, `offset` being the index of its first message in the
+        posted messages.
+    :type failures: `list`
+    """
+
+    def __init__(self, result, failures):
+        msg = (_('Failed to post %(failed)d message chunk(s): %(error)s') %
+               {'failed': len(failures), 'error': failures[0][2]})
+        super(PartialPostError, self).__init__(msg)
+        self.result = result
+        self.failures = failures
+
+
+class RateLimitExceeded(ZaqarError):
+    """Raised if a request can't be sent without exceeding a rate limit."""
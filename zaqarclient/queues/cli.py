@@ -14,8 +14,11 @@
 
 """OpenStackClient plugin for Messaging service."""
 
-from osc_lib import utils
-from oslo_log import log as logging
+# NOTE: The plugin is imported by every openstack command, osc_lib.utils
+# is only imported once a messaging client is made, and oslo.log isn't
+# needed to log a debug message.
+import logging
+import os
 
 LOG = logging.getLogger(__name__)
 
@@ -34,6 +37,8 @@ _MESSAGING_ENDPOINT = None
 def make_client(instance):
     """Returns an queues service client."""
     global _MESSAGING_ENDPOINT
+    from osc_lib import utils
+
     version = instance._api_version[API_NAME]
     try:
         version = int(version)
@@ -78,9 +83,8 @@ def build_option_parser(parser):
     parser.add_argument(
         '--os-queues-api-version',
         metavar='<queues-api-version>',
-        default=utils.env(
-            'OS_QUEUES_API_VERSION',
-            default=DEFAULT_QUEUES_API_VERSION),
+        default=(os.environ.get('OS_QUEUES_API_VERSION') or
+                 DEFAULT_QUEUES_API_VERSION),
         help=('Queues API version, default=' +
               DEFAULT_QUEUES_API_VERSION +
               ' (Env: OS_QUEUES_API_VERSION)'))
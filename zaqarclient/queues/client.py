@@ -64,6 +64,18 @@ allows you to also access admin endpoints, for example::
                         auto_create=True)
     flavor.delete()
 
+Listings and claims wrap every item they get from the server in a
+resource object. When only a few fields are needed, the wrapping can be
+skipped by passing `raw=True` to `Client.queues`, `Queue.messages`,
+`Queue.pop` and `Queue.claim`. Items are then returned as the dicts
+decoded from the server's response::
+
+    for msg in queue.messages(raw=True):
+        route(msg['id'], msg['body'])
+
+Raw items are not validated nor bound to the client, they can't be
+used to delete or update the resources they describe.
+
 `Client` uses the lower-level API to access the server, which means
 anything you can do with this client instance can be done by accessing
 the underlying API, although not recommended.
@@ -0,0 +1,107 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Deletes acknowledged messages in bulk."""
+
+from zaqarclient.common import concurrency
+from zaqarclient.queues.v1 import batching
+
+# NOTE: Default maximum number of messages deleted per request,
+# as enforced by the server. It can be overridden with the
+# `max_messages_per_delete` client option.
+MAX_MESSAGES_PER_DELETE = 20
+
+
+class Acker(object):
+    """Deletes messages in batches, in the background
+
+    Messages passed to `ack` are grouped per queue and deleted with a
+    single request once `batch_size` of them are waiting, or once the
+    oldest of them has waited for `linger` seconds. The claim ids of
+    claimed messages are sent along with their ids when the API
+    supports it.
+
+    `ack` is thread safe, it's meant to be called by the threads
+    handling the messages. It returns a future to get the outcome of
+    the deletion from.
+
+    :param client: The client the messages were gotten with.
+    :param batch_size: Maximum number of messages per request. Defaults
+        to the `max_messages_per_delete` client option.
+    :type batch_size: int
+    :param linger: (Default 0.05) Maximum number of seconds a message
+        waits for its batch to fill up.
+    :type linger: float
+    :param max_workers: (Default 10) Maximum number of concurrent
+        requests. With the client's `adaptive_concurrency` option, the
+        number of concurrent requests adapts to the server's load instead.
+    :type max_workers: int
+    """
+
+    def __init__(self, client, batch_size=None, linger=0.05,
+                 max_workers=concurrency.DEFAULT_MAX_WORKERS):
+        self._client = client
+        self._batcher = batching.Batcher(
+            self._delete,
+            batch_size or client.conf.get('max_messages_per_delete',
+                                          MAX_MESSAGES_PER_DELETE),
+            linger=linger, max_workers=max_workers,
+            limiter=client.concurrency_limiter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def ack(self, message):
+        """Deletes `message` in the next batch of its queue
+
+        :param message: The message to delete.
+        :type message: `message.Message`
+
+        :returns: A future whose result is True once the message has
+            been deleted. It holds the error if the deletion failed.
+        :rtype: `concurrent.futures.Future`
+        """
+        return self._batcher.add(message.queue._name, message)
+
+    def flush(self, timeout=None):
+        """Deletes the pending messages and waits for them to be deleted
+
+        :param timeout: Maximum number of seconds to wait for.
+        :type timeout: float
+
+        :returns: Whether all the messages were deleted in time.
+        :rtype: bool
+        """
+        return self._batcher.flush(timeout)
+
+    def close(self, timeout=None):
+        """Flushes the acker and stops its threads
+
+        :param timeout: Maximum number of seconds to wait for the
+            pending messages to be deleted.
+        :type timeout: float
+
+        :returns: Whether all the messages were deleted in time.
+        :rtype: bool
+        """
+        return self._batcher.close(timeout)
+
+    def _delete(self, queue_name, messages):
+        queue = messages[0].queue
+        batch = queue.message_module.MessageBatch(
+            queue, [{'id': msg._id, 'href': msg.href,
+                     'claim_id': msg.claim_id} for msg in messages])
+        batch.delete()
+        return [True] * len(messages)
@@ -0,0 +1,264 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Groups items in batches sent from a background thread."""
+
+import collections
+import threading
+
+from concurrent import futures
+
+from zaqarclient._i18n import _  # noqa
+from zaqarclient.common import concurrency
+from zaqarclient import errors
+
+
+class _Batch(object):
+    """Items waiting to be sent with the same key"""
+
+    __slots__ = ('key', 'created', 'items', 'futures', 'size')
+
+    def __init__(self, key, created):
+        self.key = key
+        self.created = created
+        self.items = []
+        self.futures = []
+        self.size = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item, size, future):
+        self.items.append(item)
+        self.futures.append(future)
+        self.size += size
+
+
+class Batcher(object):
+    """Sends items in batches, in the background
+
+    Items are buffered per key and handed to `send_batch` once
+    `batch_size` items or `batch_bytes` bytes are buffered for a key,
+    or once the oldest of them has waited for `linger` seconds. Batches
+    are sent by a pool of threads, `add` returns a future to get the
+    outcome of an item from.
+
+    Once the items not yet sent take `max_buffer_bytes` bytes, `add`
+    waits for space to be freed or, if `block` is False, fails the item.
+
+    This class isn't meant to be used outside of this package.
+
+    :param send_batch: Callable taking a key and a list of items,
+        returning a list with the result of each item. The items
+        of the batch fail with the exception it raises, if any.
+    :param batch_size: Maximum number of items per batch, `None` for
+        no limit.
+    :type batch_size: int
+    :param batch_bytes: Maximum size of a batch, `None` for no limit.
+    :type batch_bytes: int
+    :param linger: Maximum number of seconds an item waits for its
+        batch to fill up.
+    :type linger: float
+    :param max_buffer_bytes: Maximum size of the items not yet sent,
+        `None` for no limit.
+    :type max_buffer_bytes: int
+    :param block: Whether `add` waits for space in the buffer or fails
+        the item when it's full.
+    :type block: bool
+    :param max_workers: Maximum number of batches sent at the same time.
+    :type max_workers: int
+    :param limiter: `concurrency.AdaptiveLimiter` adapting the number
+        of batches sent at the same time, up to its `max_limit` rather
+        than `max_workers`.
+    """
+
+    def __init__(self, send_batch, batch_size, batch_bytes=None,
+                 linger=0.05, max_buffer_bytes=None, block=True,
+                 max_workers=10, limiter=None):
+        self._send_batch = send_batch
+        self._batch_size = batch_size
+        self._batch_bytes = batch_bytes
+        self._linger = linger
+        self._max_buffer_bytes = max_buffer_bytes
+        self._block = block
+        self._limiter = limiter
+
+        self._cond = threading.Condition()
+        self._batches = collections.OrderedDict()
+        self._ready = []
+
+        # NOTE: Items and bytes added but not sent yet,
+        # whether they're still buffered or being sent.
+        self._pending = 0
+        self._pending_bytes = 0
+
+        self._flushing = 0
+        self._closed = False
+
+        if limiter is not None:
+            max_workers = limiter.max_limit
+        self._executor = futures.ThreadPoolExecutor(max_workers)
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _is_full(self, size):
+        # NOTE: An item bigger than the whole buffer
+        # is accepted once the buffer is empty.
+        return (self._max_buffer_bytes is not None and
+                self._pending_bytes and
+                self._pending_bytes + size > self._max_buffer_bytes)
+
+    def add(self, key, item, size=0):
+        """Buffers `item` to be sent in a batch of `key`
+
+        :returns: A future holding the result of the item.
+        :rtype: `concurrent.futures.Future`
+        """
+        future = futures.Future()
+
+        with self._cond:
+            self._check_open()
+
+            while self._is_full(size):
+                if not self._block:
+                    future.set_exception(errors.ZaqarError(
+                        _('The buffer is full')))
+                    return future
+                self._cond.wait()
+                self._check_open()
+
+            batch = self._batches.get(key)
+            if (batch is not None and self._batch_bytes is not None and
+                    batch.size + size > self._batch_bytes):
+                self._ready.append(self._batches.pop(key))
+                batch = None
+
+            if batch is None:
+                batch = _Batch(key, concurrency.monotonic())
+                self._batches[key] = batch
+
+            batch.add(item, size, future)
+            self._pending += 1
+            self._pending_bytes += size
+
+            if (self._batch_size is not None and
+                    len(batch) >= self._batch_size):
+                self._ready.append(self._batches.pop(key))
+            self._cond.notify_all()
+
+        return future
+
+    def flush(self, timeout=None):
+        """Sends the buffered items and waits for them to be sent
+
+        :param timeout: Maximum number of seconds to wait for.
+        :type timeout: float
+
+        :returns: Whether all the items were sent in time.
+        :rtype: bool
+        """
+        deadline = (None if timeout is None
+                    else concurrency.monotonic() + timeout)
+
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                while self._pending:
+                    if deadline is None:
+                        self._cond.wait()
+                        continue
+
+                    remaining = deadline - concurrency.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                self._flushing -= 1
+        return True
+
+    def close(self, timeout=None):
+        """Flushes the buffered items and stops the threads
+
+        Items can't be added once closed.
+
+        :param timeout: Maximum number of seconds to wait for the
+            buffered items to be sent.
+        :type timeout: float
+
+        :returns: Whether all the items were sent in time.
+        :rtype: bool
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        sent = self.flush(timeout)
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=False)
+        return sent
+
+    def _check_open(self):
+        if self._closed:
+            raise errors.ZaqarError(_('No more items can be added '
+                                      'once closed'))
+
+    def _run(self):
+        with self._cond:
+            while True:
+                now = concurrency.monotonic()
+                timeout = None
+                for key, batch in list(self._batches.items()):
+                    linger_end = batch.created + self._linger
+                    if self._flushing or self._closed or linger_end <= now:
+                        self._ready.append(self._batches.pop(key))
+                    elif timeout is None or linger_end - now < timeout:
+                        timeout = linger_end - now
+
+                if self._ready:
+                    ready, self._ready = self._ready, []
+                    for batch in ready:
+                        self._executor.submit(self._send, batch)
+                    continue
+
+                if self._closed and not self._batches:
+                    return
+
+                self._cond.wait(timeout)
+
+    def _send(self, batch):
+        items = []
+        sending = []
+        for item, future in zip(batch.items, batch.futures):
+            # NOTE: Cancelled items are not sent.
+            if future.set_running_or_notify_cancel():
+                items.append(item)
+                sending.append(future)
+
+        try:
+            results = []
+            if items:
+                with concurrency.slot(self._limiter):
+                    results = self._send_batch(batch.key, items)
+        except Exception as ex:
+            for future in sending:
+                future.set_exception(ex)
+        else:
+            for index, future in enumerate(sending):
+                future.set_result(results[index]
+                                  if index < len(results) else None)
+        finally:
+            with self._cond:
+                self._pending -= len(batch)
+                self._pending_bytes -= batch.size
+                self._cond.notify_all()
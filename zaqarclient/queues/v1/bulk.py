@@ -0,0 +1,115 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Creates and deletes many queues at once."""
+
+import copy
+import time
+
+from zaqarclient.common import concurrency
+from zaqarclient.queues.v1 import core
+from zaqarclient.transport import errors
+
+
+def retried_errors():
+    """Returns the errors after which a request can be sent again
+
+    Creating and deleting queues is idempotent, retrying is always safe.
+    """
+    # NOTE: See `concurrency.overload_errors`.
+    import requests
+    return concurrency.overload_errors() + (
+        errors.InternalServerError,
+        requests.exceptions.ConnectionError)
+
+
+class _Runner(object):
+    """Sends a request per queue, sharing a transport and its pool
+
+    The request is prepared, and authenticated, once and copied for
+    every queue. The transport, and so its connection pool, is shared
+    by all the requests.
+    """
+
+    def __init__(self, client, max_workers, retries, retry_delay):
+        self._client = client
+        self._template, self._transport = client._request_and_transport()
+        self._max_workers = max_workers
+        self._retries = retries
+        self._retry_delay = retry_delay
+
+    def _request(self):
+        req = copy.copy(self._template)
+        req.params = dict(self._template.params)
+        req.headers = dict(self._template.headers)
+        return req
+
+    def _call(self, function, name):
+        delay = self._retry_delay
+        for attempt in range(self._retries + 1):
+            try:
+                with concurrency.slot(self._client.concurrency_limiter):
+                    function(self._transport, self._request(), name)
+                return name, None
+            except Exception as ex:
+                if (attempt == self._retries or
+                        not isinstance(ex, retried_errors())):
+                    return name, ex
+                time.sleep(delay)
+                delay *= 2
+
+    def run(self, function, names):
+        """Calls `function` for every queue of `names`
+
+        :returns: The error each queue failed with, `None` for
+            those that succeeded, per name.
+        :rtype: `dict`
+        """
+        max_workers = self._max_workers
+        if self._client.concurrency_limiter is not None:
+            max_workers = self._client.concurrency_limiter.max_limit
+
+        return dict(concurrency.imap(lambda name: self._call(function, name),
+                                     names, max_workers=max_workers))
+
+
+def create_queues(client, names, metadata=None,
+                  max_workers=concurrency.DEFAULT_MAX_WORKERS, retries=2,
+                  retry_delay=0.1):
+    """Creates the queues of `names`, see `Client.create_queues`"""
+    known_queues = client.known_queues
+
+    def create(transport, request, name):
+        core.queue_create(transport, request, name, metadata=metadata)
+        known_queues.add(name)
+        client.metadata_cache.invalidate(name)
+
+    runner = _Runner(client, max_workers, retries, retry_delay)
+    return runner.run(create, names)
+
+
+def delete_queues(client, names, max_workers=concurrency.DEFAULT_MAX_WORKERS,
+                  retries=2, retry_delay=0.1):
+    """Deletes the queues of `names`, see `Client.delete_queues`"""
+    known_queues = client.known_queues
+
+    def delete(transport, request, name):
+        try:
+            core.queue_delete(transport, request, name)
+        except errors.ResourceNotFound:
+            # NOTE: Already deleted, i.e by a previous attempt.
+            pass
+        known_queues.discard(name)
+        client.metadata_cache.invalidate(name)
+
+    runner = _Runner(client, max_workers, retries, retry_delay)
+    return runner.run(delete, names)
@@ -13,44 +13,95 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 from zaqarclient.queues.v1 import core
 from zaqarclient.queues.v1 import iterator as iterate
 from zaqarclient.queues.v1 import message
 
 
 class Claim(object):
+
+    __slots__ = ('_queue', 'id', '_ttl', '_grace', '_age', '_limit',
+                 '_raw', '_message_iter', '_synced_at', 'staleness')
+
     def __init__(self, queue, id=None,
-                 ttl=None, grace=None, limit=None):
+                 ttl=None, grace=None, limit=None, raw=False,
+                 staleness=None):
+        """Initialize claim object
+
+        The age of the claim is tracked locally from the time it was
+        created, renewed or gotten from the server, so reading `age`,
+        `ttl` or `expires_at` doesn't send requests unless the claim
+        has never been gotten or is older than `staleness`.
+
+        :param queue: The queue to claim messages from.
+        :type queue: `queues.Queue`
+        :param id: Id of an existing claim. A new claim
+            is created if it's not passed.
+        :type id: `six.text_type`
+        :param raw: (Default False) Whether iterating the claim
+            returns the claimed messages as dicts rather than
+            `Message` instances.
+        :type raw: bool
+        :param staleness: Number of seconds after which the claim is
+            gotten again from the server when its state is read. By
+            default, it's only gotten again on `refresh`.
+        :type staleness: float
+        """
         self._queue = queue
         self.id = id
         self._ttl = ttl
         self._grace = grace
         self._age = None
         self._limit = limit
+        self._raw = raw
         self._message_iter = None
+        # NOTE: When `_age` was known to be right.
+        self._synced_at = None
+        self.staleness = staleness
         if id is None:
             self._create()
 
     def __repr__(self):
+        age = None
+        if self._synced_at is not None:
+            age = self._age + time.time() - self._synced_at
         return '<Claim id:{id} ttl:{ttl} age:{age}>'.format(id=self.id,
-                                                            ttl=self.ttl,
-                                                            age=self.age)
+                                                            ttl=self._ttl,
+                                                            age=age)
+
+    def _sync(self, age):
+        self._age = age
+        self._synced_at = time.time()
+
+    def _is_stale(self):
+        return (self._synced_at is None or
+                (self.staleness is not None and
+                 time.time() - self._synced_at > self.staleness))
+
+    def _create_function(self):
+        if self._raw:
+            return None
+        return message.create_object(self._queue)
 
     def _get(self):
         req, trans = self._queue.client._request_and_transport()
 
         claim_res = core.claim_get(trans, req, self._queue._name,
                                    self.id)
-        self._age = claim_res['age']
+        self._sync(claim_res['age'])
         self._ttl = claim_res['ttl']
         self._grace = claim_res.get('grace')
-        msgs = claim_res.get('messages', [])
-        self._message_iter = iterate._Iterator(self._queue.client,
-                                               msgs,
-                                               'messages',
-                                               message.create_object(
-                                                   self._queue
-                                               ))
+
+        # NOTE: Messages being iterated aren't
+        # returned again on refresh.
+        if self._message_iter is None:
+            msgs = claim_res.get('messages', [])
+            self._message_iter = iterate._Iterator(self._queue.client,
+                                                   msgs,
+                                                   'messages',
+                                                   self._create_function())
 
     def _create(self):
         req, trans = self._queue.client._request_and_transport()
@@ -60,6 +111,8 @@ class Claim(object):
                                  grace=self._grace,
                                  limit=self._limit)
 
+        self._sync(0)
+
         # extract the id from the first message
         if msgs is not None:
             if self._queue.client.api_version >= 1.1:
@@ -69,26 +122,51 @@ class Claim(object):
         self._message_iter = iterate._Iterator(self._queue.client,
                                                msgs or [],
                                                'messages',
-                                               message.create_object(
-                                                   self._queue
-                                               ))
+                                               self._create_function())
 
     def __iter__(self):
         if self._message_iter is None:
             self._get()
         return self._message_iter
 
+    def batch(self):
+        """Returns the claimed messages as a `MessageBatch`
+
+        Messages already returned by iterating the claim
+        aren't part of the batch.
+
+        :rtype: `message.MessageBatch`
+        """
+        return self._queue._batch(iter(self), claim_id=self.id)
+
+    def refresh(self):
+        """Gets the claim's age, ttl and grace from the server"""
+        self._get()
+
     @property
     def age(self):
-        self._get()
-        return self._age
+        """Seconds since the claim was created or last renewed"""
+        if self._is_stale():
+            self._get()
+        return self._age + time.time() - self._synced_at
 
     @property
     def ttl(self):
-        if self._ttl is None:
+        if self._ttl is None or self._is_stale():
             self._get()
         return self._ttl
 
+    @property
+    def expires_at(self):
+        """Time, in seconds since the epoch, the claim expires at"""
+        ttl = self.ttl
+        return self._synced_at - self._age + ttl
+
+    @property
+    def remaining(self):
+        """Seconds left before the claim expires, 0 once expired"""
+        return max(0, self.expires_at - time.time())
+
     def delete(self):
         req, trans = self._queue.client._request_and_transport()
         core.claim_delete(trans, req, self._queue._name, self.id)
@@ -104,7 +182,9 @@ class Claim(object):
                                 **kwargs)
         # if the update succeeds, update our attributes.
         if ttl is not None:
+            # NOTE: Updating the ttl renews the claim.
             self._ttl = ttl
+            self._sync(0)
         if grace is not None:
             self._grace = grace
         return res
@@ -15,14 +15,28 @@
 
 import uuid
 
+import six
+
+from zaqarclient._i18n import _  # noqa
+from zaqarclient.common import cache
+from zaqarclient.common import concurrency
 from zaqarclient.common import decorators
+from zaqarclient.queues.v1 import acker
+from zaqarclient.queues.v1 import bulk
+from zaqarclient.queues.v1 import consumer
 from zaqarclient.queues.v1 import core
 from zaqarclient.queues.v1 import flavor
 from zaqarclient.queues.v1 import iterator
+from zaqarclient.queues.v1 import partitioned
 from zaqarclient.queues.v1 import pool
+from zaqarclient.queues.v1 import producer
 from zaqarclient.queues.v1 import queues
+from zaqarclient.queues.v1 import registry
+from zaqarclient.queues.v1 import stats
 from zaqarclient import transport
+from zaqarclient.transport import coalesce
 from zaqarclient.transport import errors
+from zaqarclient.transport import ratelimit
 from zaqarclient.transport import request
 
 
@@ -36,6 +50,23 @@ class Client(object):
     :param options: Extra options:
         - client_uuid: Custom client uuid. A new one
         will be generated, if not passed.
+        - rate_limit: Limits of the rate requests are sent at,
+        see `zaqarclient.transport.ratelimit`.
+        - coalesce_requests: Whether to share the response of
+        identical concurrent GET and HEAD requests, see
+        `zaqarclient.transport.coalesce`.
+        - metadata_cache_ttl: Number of seconds the metadata of the
+        queues is cached for, 60 by default.
+        - metadata_cache_size: Maximum number of queues whose
+        metadata is cached, 1024 by default.
+        - known_queues_ttl: Number of seconds queues created, or
+        found with `Queue.exists`, aren't created again for, even
+        with `force_create`, 60 by default. 0 always creates them.
+        - known_queues_size: Maximum number of queues known to
+        exist, 1024 by default.
+        - adaptive_concurrency: Options of the limiter adapting the
+        number of concurrent posts, claims and deletes to the
+        server's load, see `concurrency.AdaptiveLimiter`.
         - auth_opts: Authentication options:
             - backend
             - options
@@ -55,6 +86,14 @@ class Client(object):
         self.client_uuid = self.conf.get('client_uuid',
                                          uuid.uuid4().hex)
         self.session = session
+        self.rate_limiter = ratelimit.RateLimiter.from_conf(self.conf)
+        self.coalescer = coalesce.Coalescer.from_conf(self.conf)
+        self.metadata_cache = cache.TTLCache(
+            maxsize=self.conf.get('metadata_cache_size', 1024),
+            ttl=self.conf.get('metadata_cache_ttl', 60))
+        self.known_queues = registry.KnownQueues.from_conf(self.conf)
+        self.concurrency_limiter = concurrency.AdaptiveLimiter.from_conf(
+            self.conf)
 
     def _get_transport(self, request):
         """Gets a transport and caches its instance
@@ -82,6 +121,14 @@ class Client(object):
         req.headers['Client-ID'] = self.client_uuid
 
         trans = self._get_transport(req)
+        if self.rate_limiter is not None:
+            trans = ratelimit.RateLimitedTransport(trans, self.rate_limiter)
+        if self.coalescer is not None:
+            # NOTE: Coalesced requests aren't sent, they don't
+            # count against the rate limits.
+            trans = coalesce.CoalescingTransport(trans, self.coalescer)
+        if self.known_queues.enabled:
+            trans = registry.KnownQueuesTransport(trans, self.known_queues)
         return req, trans
 
     def transport(self):
@@ -103,20 +150,227 @@ class Client(object):
         """
         return self.queues_module.Queue(self, ref, **kwargs)
 
-    def queues(self, **params):
+    def partitioned_queue(self, name, partitions, **kwargs):
+        """Returns a logical queue spread over `partitions` queues
+
+        :param name: Name of the logical queue.
+        :type name: `six.text_type`
+        :param partitions: Number of queues.
+        :type partitions: int
+        :param kwargs: Options of the queue, see
+            `partitioned.PartitionedQueue`.
+
+        :rtype: `partitioned.PartitionedQueue`
+        """
+        return partitioned.PartitionedQueue(self, name, partitions,
+                                            **kwargs)
+
+    def producer(self, **kwargs):
+        """Returns a producer posting messages in the background
+
+        :param kwargs: Options of the producer, see
+            `producer.Producer`.
+
+        :returns: A producer instance, to be closed once done with.
+        :rtype: `producer.Producer`
+        """
+        return producer.Producer(self, **kwargs)
+
+    def consumer(self, queues, handler, **kwargs):
+        """Returns a consumer processing the messages of several queues
+
+        :param queues: The queues, or their names, by decreasing
+            priority.
+        :type queues: `list`
+        :param handler: Callable taking a `Message`.
+        :param kwargs: Options of the consumer, see
+            `consumer.MultiQueueConsumer`.
+
+        :returns: A consumer, to be started and stopped.
+        :rtype: `consumer.MultiQueueConsumer`
+        """
+        queues = [self.queue(queue, auto_create=False)
+                  if isinstance(queue, six.string_types) else queue
+                  for queue in queues]
+        return consumer.MultiQueueConsumer(queues, handler, **kwargs)
+
+    def acker(self, **kwargs):
+        """Returns an acker deleting messages in bulk, in the background
+
+        :param kwargs: Options of the acker, see `acker.Acker`.
+
+        :returns: An acker instance, to be closed once done with.
+        :rtype: `acker.Acker`
+        """
+        return acker.Acker(self, **kwargs)
+
+    def _listing(self, core_function, iter_key, create_function, *args,
+                 **params):
+        """Lists resources, resuming from `checkpoint` if passed
+
+        `checkpoint` is only accepted as a keyword argument, `args`
+        and the other `params` are passed to `core_function`.
+        """
+        checkpoint = params.pop('checkpoint', None)
+
+        def first_page():
+            req, trans = self._request_and_transport()
+            return core_function(trans, req, *args, **params)
+
+        if checkpoint is not None:
+            return iterator._Iterator.resume(self, checkpoint, iter_key,
+                                             create_function, first_page)
+
+        return iterator._Iterator(self,
+                                  first_page(),
+                                  iter_key,
+                                  create_function)
+
+    def queues(self, checkpoint=None, raw=False, **params):
         """Gets a list of queues from the server
 
+        :param checkpoint: Position, as returned by the iterator's
+            `checkpoint` method, to resume a previous listing from.
+            `params` must match the ones of the previous listing.
+        :type checkpoint: `dict`
+        :param raw: (Default False) Whether to return the queues as
+            the dicts sent by the server rather than `Queue` instances.
+        :type raw: bool
+        :param params: Filters to use for getting queues
+        :type params: **kwargs dict.
+
         :returns: A list of queues
         :rtype: `list`
         """
-        req, trans = self._request_and_transport()
-
-        queue_list = core.queue_list(trans, req, **params)
+        create_function = None
+        if not raw:
+            create_function = self.queues_module.create_object(self)
+
+        return self._listing(core.queue_list, 'queues', create_function,
+                             checkpoint=checkpoint, **params)
+
+    def queues_stats(self, max_workers=concurrency.DEFAULT_MAX_WORKERS,
+                     **params):
+        """Lists queues along with their stats
+
+        All queues are listed, following the `next` links, and their
+        stats are requested concurrently while the listing goes on.
+        Pass `detailed=True` to get the queues' metadata from the
+        listing itself.
+
+        :param max_workers: (Default 10) Maximum number of concurrent
+            stats requests.
+        :type max_workers: int
+        :param params: Filters to use for listing queues
+        :type params: **kwargs dict.
 
-        return iterator._Iterator(self,
-                                  queue_list,
-                                  'queues',
-                                  self.queues_module.create_object(self))
+        :returns: An iterator of `(queue, stats)` tuples, in the listing
+            order.
+        """
+        return concurrency.imap(lambda queue: (queue, queue.stats),
+                                self.queues(**params).stream(),
+                                max_workers=max_workers)
+
+    def _queue_names(self, prefix):
+        """Lists the names of the queues starting with `prefix`"""
+        names = []
+        for queue in self.queues(raw=True).stream():
+            name = queue['name']
+            if name.startswith(prefix):
+                names.append(name)
+            elif name > prefix:
+                # NOTE: Queues are listed in the order of their names.
+                break
+        return names
+
+    def create_queues(self, names, metadata=None,
+                      max_workers=concurrency.DEFAULT_MAX_WORKERS,
+                      retries=2):
+        """Creates many queues concurrently
+
+        All the requests share a transport, and its connection pool,
+        and are authenticated once. Requests failing because the
+        server is unavailable are retried `retries` times. Creating a
+        queue is idempotent, so is calling this method again with the
+        queues that failed.
+
+        :param names: Names of the queues.
+        :type names: `list`
+        :param metadata: Metadata of the queues, if any. (>=v1.1)
+        :type metadata: `dict`
+        :param max_workers: (Default 10) Maximum number of concurrent
+            requests.
+        :type max_workers: int
+        :param retries: (Default 2) Number of times a failed request
+            is retried.
+        :type retries: int
+
+        :returns: The error each queue failed with, `None` for those
+            created, per name.
+        :rtype: `dict`
+        """
+        return bulk.create_queues(self, names, metadata=metadata,
+                                  max_workers=max_workers, retries=retries)
+
+    def delete_queues(self, names=None, prefix=None,
+                      max_workers=concurrency.DEFAULT_MAX_WORKERS,
+                      retries=2):
+        """Deletes many queues concurrently
+
+        Queues that don't exist are considered deleted. See
+        `create_queues` for how requests are sent and retried.
+
+        :param names: Names of the queues.
+        :type names: `list`
+        :param prefix: Prefix of the names of the queues, instead
+            of `names`.
+        :type prefix: `six.text_type`
+        :param max_workers: (Default 10) Maximum number of concurrent
+            requests.
+        :type max_workers: int
+        :param retries: (Default 2) Number of times a failed request
+            is retried.
+        :type retries: int
+
+        :returns: The error each queue failed with, `None` for those
+            deleted, per name.
+        :rtype: `dict`
+        """
+        if (names is None) == (prefix is None):
+            raise ValueError(_('Either names or prefix must be passed'))
+
+        if names is None:
+            names = self._queue_names(prefix)
+        return bulk.delete_queues(self, names, max_workers=max_workers,
+                                  retries=retries)
+
+    def stats_many(self, names=None, prefix=None, ttl=10,
+                   max_workers=concurrency.DEFAULT_MAX_WORKERS,
+                   history_size=0):
+        """Returns a collector of the stats of many queues
+
+        :param names: Names of the queues.
+        :type names: `list`
+        :param prefix: Prefix of the names of the queues, instead
+            of `names`.
+        :type prefix: `six.text_type`
+        :param ttl: (Default 10) Number of seconds snapshots of the
+            stats are cached for.
+        :type ttl: float
+        :param max_workers: (Default 10) Maximum number of concurrent
+            stats requests.
+        :type max_workers: int
+        :param history_size: (Default 0) Number of samples of the
+            stats of each queue to keep, see `stats.StatsHistory`.
+        :type history_size: int
+
+        :returns: A collector, whose `snapshot` method returns
+            the stats. It's to be stopped once done with if started.
+        :rtype: `stats.StatsCollector`
+        """
+        return stats.StatsCollector(self, names=names, prefix=prefix,
+                                    ttl=ttl, max_workers=max_workers,
+                                    history_size=history_size)
 
     def follow(self, ref):
         """Follows ref.
@@ -145,23 +399,21 @@ class Client(object):
         """
         return pool.Pool(self, ref, **kwargs)
 
-    def pools(self, **params):
+    def pools(self, checkpoint=None, **params):
         """Gets a list of pools from the server
 
+        :param checkpoint: Position to resume a previous listing from.
+            Refer to `queues` for more info.
+        :type checkpoint: `dict`
         :param params: Filters to use for getting pools
         :type params: **kwargs dict.
 
         :returns: A list of pools
         :rtype: `list`
         """
-        req, trans = self._request_and_transport()
-
-        pool_list = core.pool_list(trans, req, **params)
-
-        return iterator._Iterator(self,
-                                  pool_list,
-                                  'pools',
-                                  pool.create_object(self))
+        return self._listing(core.pool_list, 'pools',
+                             pool.create_object(self),
+                             checkpoint=checkpoint, **params)
 
     @decorators.version(min_version=1.1)
     def flavor(self, ref, **kwargs):
@@ -176,23 +428,21 @@ class Client(object):
         return flavor.Flavor(self, ref, **kwargs)
 
     @decorators.version(min_version=1.1)
-    def flavors(self, **params):
+    def flavors(self, checkpoint=None, **params):
         """Gets a list of flavors from the server
 
+        :param checkpoint: Position to resume a previous listing from.
+            Refer to `queues` for more info.
+        :type checkpoint: `dict`
         :param params: Filters to use for getting flavors
         :type params: **kwargs dict.
 
         :returns: A list of flavors
         :rtype: `list`
         """
-        req, trans = self._request_and_transport()
-
-        flavor_list = core.flavor_list(trans, req, **params)
-
-        return iterator._Iterator(self,
-                                  flavor_list,
-                                  'flavors',
-                                  flavor.create_object(self))
+        return self._listing(core.flavor_list, 'flavors',
+                             flavor.create_object(self),
+                             checkpoint=checkpoint, **params)
 
     def health(self):
         """Gets the health status of Zaqar server."""
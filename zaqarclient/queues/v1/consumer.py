@@ -0,0 +1,397 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Claims messages and processes them with a pool of threads."""
+
+import logging
+import threading
+
+from concurrent import futures
+
+from zaqarclient._i18n import _  # noqa
+from zaqarclient.common import concurrency
+from zaqarclient.queues.v1 import lease
+
+LOG = logging.getLogger(__name__)
+
+
+class _ClaimedBatch(object):
+    """Tracks the processing of the messages of a claim"""
+
+    def __init__(self, claim, batch):
+        self.claim = claim
+        self.batch = batch
+        self._lock = threading.Lock()
+        self._remaining = len(batch)
+        self._processed = []
+
+    def done(self, index, processed):
+        """Records the outcome of a message
+
+        :returns: Whether all the messages have been handled.
+        """
+        with self._lock:
+            if processed:
+                self._processed.append(index)
+            self._remaining -= 1
+            return self._remaining == 0
+
+    def processed(self):
+        return self.batch._take(sorted(self._processed))
+
+
+class Consumer(object):
+    """Processes the messages of a queue
+
+    Messages are claimed `limit` at a time and passed to `handler`
+    by a pool of threads. Up to `max_in_flight` messages are claimed
+    and not yet handled at any time, the next claim is made as soon
+    as there's room for it, before the messages of the current one
+    are all handled.
+
+    Once all the messages of a claim have been handled, those
+    `handler` returned for are deleted with a single request.
+    Messages `handler` raised for are left claimed, they become
+    available again once the claim expires.
+
+    When the queue is empty, the consumer waits `min_poll_interval`
+    seconds before claiming again, doubling the wait up to
+    `max_poll_interval` seconds for as long as the queue stays empty.
+
+    With `renew`, claims are renewed by a `lease.LeaseKeeper` until
+    their messages are all handled, and deleted then. Handlers can take
+    longer than `ttl` and messages `handler` raised for are available
+    again right away.
+
+    With the client's `adaptive_concurrency` option, claims and
+    deletes take a slot of its limiter, the number of them sent
+    at the same time by the client's consumers adapts to the
+    server's load.
+
+    :param queue: The queue to consume.
+    :type queue: `queues.Queue`
+    :param handler: Callable taking a `Message`.
+    :param ttl: (Default 60) TTL of the claims, in seconds.
+    :type ttl: int
+    :param grace: (Default 60) Grace of the claims, in seconds.
+    :type grace: int
+    :param limit: (Default 10) Maximum number of messages per claim.
+    :type limit: int
+    :param max_in_flight: (Default 2 * `limit`) Maximum number of
+        claimed messages not handled yet.
+    :type max_in_flight: int
+    :param max_workers: (Default 10) Number of threads calling `handler`.
+    :type max_workers: int
+    :param min_poll_interval: (Default 0.1) Initial wait, in seconds,
+        once the queue is empty.
+    :type min_poll_interval: float
+    :param max_poll_interval: (Default 5) Maximum wait, in seconds,
+        once the queue is empty.
+    :type max_poll_interval: float
+    :param renew: (Default False) Whether to renew the claims until
+        their messages are handled.
+    :type renew: bool
+    """
+
+    def __init__(self, queue, handler, ttl=60, grace=60, limit=10,
+                 max_in_flight=None,
+                 max_workers=concurrency.DEFAULT_MAX_WORKERS,
+                 min_poll_interval=0.1, max_poll_interval=5, renew=False):
+        self.queue = queue
+        self._handler = handler
+        self._ttl = ttl
+        self._grace = grace
+        self._limit = limit
+        self._max_in_flight = max(max_in_flight or 2 * limit, limit)
+        self._max_workers = max_workers
+        self._min_poll_interval = min_poll_interval
+        self._max_poll_interval = max_poll_interval
+        self._renew = renew
+        self._limiter = queue.client.concurrency_limiter
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._stopped = threading.Event()
+        self._executor = None
+        self._leases = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def in_flight(self):
+        """Number of claimed messages not handled yet"""
+        return self._in_flight
+
+    def start(self):
+        """Starts consuming the queue in the background
+
+        :returns: This consumer.
+        """
+        if self._thread is not None:
+            return self
+
+        self._stopped.clear()
+        self._executor = futures.ThreadPoolExecutor(self._max_workers)
+        if self._renew:
+            self._leases = lease.LeaseKeeper()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stops claiming messages and waits for the claimed ones
+
+        :param timeout: Maximum number of seconds to wait for the
+            claimed messages to be handled.
+        :type timeout: float
+
+        :returns: Whether all the claimed messages were handled in time.
+        :rtype: bool
+        """
+        if self._thread is None:
+            return True
+
+        deadline = (None if timeout is None
+                    else concurrency.monotonic() + timeout)
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+
+        self._thread.join(timeout)
+        with self._cond:
+            while self._in_flight:
+                remaining = (None if deadline is None
+                             else deadline - concurrency.monotonic())
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            handled = not self._in_flight
+
+        self._executor.shutdown(wait=False)
+        if self._leases is not None:
+            self._leases.close()
+            self._leases = None
+        self._thread = None
+        return handled
+
+    def _wait_for_room(self):
+        with self._cond:
+            while (not self._stopped.is_set() and
+                   self._in_flight + self._limit > self._max_in_flight):
+                self._cond.wait()
+        return not self._stopped.is_set()
+
+    def _claim(self, queue=None):
+        queue = queue or self.queue
+        try:
+            with concurrency.slot(self._limiter):
+                claim = queue.claim(ttl=self._ttl, grace=self._grace,
+                                    limit=self._limit)
+                return claim, claim.batch()
+        except Exception:
+            LOG.exception('Failed to claim messages from queue %s',
+                          queue.name)
+            return None, None
+
+    def _dispatch(self, claim, batch):
+        claimed = _ClaimedBatch(claim, batch)
+        if self._leases is not None:
+            self._leases.keep(claim)
+        with self._cond:
+            self._in_flight += len(batch)
+
+        for index, message in enumerate(batch):
+            self._executor.submit(self._handle, claimed, index, message)
+
+    def _run(self):
+        interval = self._min_poll_interval
+        while self._wait_for_room():
+            claim, batch = self._claim()
+            if not batch:
+                self._stopped.wait(interval)
+                interval = min(interval * 2, self._max_poll_interval)
+                continue
+
+            interval = self._min_poll_interval
+            self._dispatch(claim, batch)
+
+    def _handle(self, claimed, index, message):
+        processed = False
+        try:
+            self._handler(message)
+            processed = True
+        except Exception:
+            LOG.exception('Failed to handle message %s', message.href)
+
+        try:
+            if claimed.done(index, processed):
+                self._ack(claimed)
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def _ack(self, claimed):
+        processed = claimed.processed()
+        try:
+            with concurrency.slot(self._limiter):
+                processed.delete()
+        except Exception:
+            LOG.exception('Failed to delete %d messages of claim %s',
+                          len(processed), claimed.claim.id)
+
+        leases = self._leases
+        if leases is not None:
+            try:
+                leases.release(claimed.claim)
+            except Exception:
+                LOG.exception('Failed to release claim %s',
+                              claimed.claim.id)
+
+
+class _Scheduled(object):
+    """A queue consumed by a `MultiQueueConsumer`"""
+
+    __slots__ = ('queue', 'weight', 'current', 'backoff', 'idle_until')
+
+    def __init__(self, queue, weight):
+        self.queue = queue
+        self.weight = weight
+        self.current = 0
+        self.backoff = 0
+        self.idle_until = 0
+
+
+class MultiQueueConsumer(Consumer):
+    """Processes the messages of several queues with one pool of threads
+
+    Claims are scheduled across `queues` either by `weights`, a queue
+    of weight 2 being claimed from twice as often as a queue of weight
+    1 while both have messages, or, with `strict`, by priority, a
+    queue being claimed from only while the queues before it are
+    empty.
+
+    A queue found empty isn't claimed from for `min_poll_interval`
+    seconds, doubled up to `max_poll_interval` seconds for as long as
+    it stays empty. With `stats_interval`, the stats of those queues
+    are checked every `stats_interval` seconds, and the queues that
+    got messages meanwhile are claimed from again right away.
+
+    Messages are handled as by `Consumer`, whose other options are
+    accepted.
+
+    :param queues: The queues to consume, by decreasing priority.
+    :type queues: `list` of `queues.Queue`
+    :param handler: Callable taking a `Message`.
+    :param weights: (Default 1 each) Weight of each queue.
+    :type weights: `list` of int
+    :param strict: (Default False) Whether to schedule the claims by
+        strict priority rather than by weight.
+    :type strict: bool
+    :param stats_interval: Number of seconds between checks of the
+        stats of the empty queues, by default they're not checked.
+    :type stats_interval: float
+    """
+
+    def __init__(self, queues, handler, weights=None, strict=False,
+                 stats_interval=None, **kwargs):
+        queues = list(queues)
+        if not queues:
+            raise ValueError(_('At least 1 queue must be consumed'))
+        weights = list(weights or [1] * len(queues))
+        if len(weights) != len(queues) or min(weights) <= 0:
+            raise ValueError(_('A positive weight is needed per queue'))
+
+        super(MultiQueueConsumer, self).__init__(queues[0], handler,
+                                                 **kwargs)
+        self.queues = queues
+        self._strict = strict
+        self._stats_interval = stats_interval
+        self._scheduled = [_Scheduled(queue, weight)
+                           for queue, weight in zip(queues, weights)]
+
+    def _next(self, now):
+        """Returns the queue to claim from next, `None` if all are idle"""
+        ready = [scheduled for scheduled in self._scheduled
+                 if scheduled.idle_until <= now]
+        if not ready or self._strict:
+            return ready[0] if ready else None
+
+        # NOTE: Smooth weighted round robin, queues are picked in
+        # proportion to their weights without bursts of the same one.
+        total = 0
+        chosen = None
+        for scheduled in ready:
+            scheduled.current += scheduled.weight
+            total += scheduled.weight
+            if chosen is None or scheduled.current > chosen.current:
+                chosen = scheduled
+        chosen.current -= total
+        return chosen
+
+    def _claimed(self, scheduled, found, now):
+        if found:
+            scheduled.backoff = 0
+            scheduled.idle_until = 0
+            return
+
+        scheduled.backoff = min(
+            max(scheduled.backoff * 2, self._min_poll_interval),
+            self._max_poll_interval)
+        scheduled.idle_until = now + scheduled.backoff
+
+    def _queue_stats(self, scheduled):
+        try:
+            with concurrency.slot(self._limiter):
+                return scheduled, scheduled.queue.stats
+        except Exception:
+            LOG.exception('Failed to get the stats of queue %s',
+                          scheduled.queue.name)
+            return scheduled, None
+
+    def _check_stats(self, now):
+        idle = [scheduled for scheduled in self._scheduled
+                if scheduled.idle_until > now]
+        for scheduled, stats in concurrency.imap(self._queue_stats, idle):
+            if stats and stats.get('messages', {}).get('free'):
+                scheduled.backoff = 0
+                scheduled.idle_until = 0
+
+    def _run(self):
+        next_stats = None
+        if self._stats_interval is not None:
+            next_stats = concurrency.monotonic() + self._stats_interval
+
+        while self._wait_for_room():
+            now = concurrency.monotonic()
+            if next_stats is not None and next_stats <= now:
+                self._check_stats(now)
+                next_stats = now + self._stats_interval
+
+            scheduled = self._next(now)
+            if scheduled is None:
+                wake_at = min(entry.idle_until for entry in self._scheduled)
+                if next_stats is not None:
+                    wake_at = min(wake_at, next_stats)
+                self._stopped.wait(max(0, wake_at - now))
+                continue
+
+            claim, batch = self._claim(scheduled.queue)
+            self._claimed(scheduled, bool(batch), concurrency.monotonic())
+            if batch:
+                self._dispatch(claim, batch)
@@ -121,6 +121,31 @@ def queue_get(transport, request, name, callback=None):
                              request, name, callback=callback)
 
 
+def queue_get_if_modified(transport, request, name, etag=None,
+                          operation='queue_get'):
+    """Retrieves a queue unless it still matches `etag`
+
+    :param etag: ETag of the version of the queue already known.
+    :type etag: `six.text_type`
+    :param operation: (Default 'queue_get') Operation to get
+        the queue with.
+    :type operation: `six.text_type`
+
+    :returns: The queue and its ETag, if the server sent one,
+        or `None` if the queue wasn't modified.
+    :rtype: `tuple`
+    """
+    request.operation = operation
+    request.params['queue_name'] = name
+    if etag is not None:
+        request.headers['If-None-Match'] = etag
+
+    resp = transport.send(request)
+    if resp.status_code == 304:
+        return None
+    return resp.deserialized_content, resp.headers.get('ETag')
+
+
 def queue_get_metadata(transport, request, name, callback=None):
     """Gets queue metadata."""
     return _common_queue_ops('queue_get_metadata', transport,
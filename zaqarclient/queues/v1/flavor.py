@@ -18,6 +18,10 @@ from zaqarclient.queues.v1 import core
 
 class Flavor(object):
 
+    # NOTE: See `pool.Pool`.
+    __slots__ = ('client', 'name', 'pool_group', 'capabilities',
+                 '__dict__')
+
     def __init__(self, client, name,
                  pool_group=None, auto_create=True,
                  **kwargs):
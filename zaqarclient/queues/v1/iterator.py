@@ -13,6 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import threading
+
+from six.moves import queue
+
 
 class _Iterator(object):
     """Base Iterator
@@ -23,7 +28,9 @@ class _Iterator(object):
 
     Subclasses of this base class determine the key
     to iterate over, as well as the means of creating
-    the objects contained within.
+    the objects contained within. If `create_function`
+    is `None`, items are returned as they were decoded
+    from the response.
 
     If there are no objects left to return, the iterator
     will try to load more by following the `next` rel link
@@ -32,6 +39,10 @@ class _Iterator(object):
     The iterator raises a StopIteration exception if the server
     doesn't return more objects after a `next-page` call.
 
+    The position of the iterator can be saved with `checkpoint`
+    and iteration continued later on from that position with
+    `resume`, even from a different process.
+
     :param client: The client instance used by the queue
     :type client: `v1.Client`
     :param listing_response: Response returned by the listing call
@@ -44,23 +55,95 @@ class _Iterator(object):
 
         self._links = []
         self._stream = False
-        self._listing_response = listing_response
+        self._prefetcher = None
+
+        # NOTE: The href the current page was
+        # requested from, `None` for the first page.
+        self._page_href = None
 
         # NOTE(flaper87): Simple hack to
         # re-use the iterator for get_many_messages
         # and message listing.
         if isinstance(listing_response, dict):
             self._links = listing_response.get('links', [])
-            self._listing_response = listing_response[self._iter_key]
+            listing_response = listing_response[self._iter_key]
+
+        self._set_page(listing_response)
 
     def __iter__(self):
         return self
 
+    def _set_page(self, items):
+        # NOTE: Items are consumed from the left of a deque, which is O(1)
+        # and drops the iterator's reference to every item as soon as it
+        # has been returned, rather than keeping the whole page alive until
+        # it's exhausted.
+        self._listing_response = collections.deque(items or [])
+        self._offset = 0
+
     def get_iterables(self, iterables):
         self._links = iterables['links']
-        self._listing_response = iterables[self._iter_key]
+        self._set_page(iterables[self._iter_key])
+
+    @classmethod
+    def resume(cls, client, checkpoint, iter_key, create_function,
+               first_page):
+        """Creates an iterator starting from `checkpoint`
+
+        :param client: The client instance used by the queue
+        :type client: `v1.Client`
+        :param checkpoint: A checkpoint as returned by
+            `_Iterator.checkpoint`.
+        :type checkpoint: `dict`
+        :param first_page: Callable returning the first page of
+            the listing. It's only called if the checkpoint was
+            taken before the iterator moved to the second page.
+        :type first_page: Callable object.
+
+        :returns: The resumed iterator.
+        :rtype: `_Iterator`
+        """
+        href = checkpoint.get('href')
+        if href is None:
+            listing_response = first_page()
+        else:
+            listing_response = (client.follow(href) or
+                                {'links': [], iter_key: []})
+
+        resumed = cls(client, listing_response, iter_key, create_function)
+        resumed._page_href = href
+
+        offset = min(checkpoint.get('offset', 0),
+                     len(resumed._listing_response))
+        for _ in range(offset):
+            resumed._listing_response.popleft()
+        resumed._offset = offset
+        return resumed
 
-    def stream(self, enabled=True):
+    def _drain_page(self):
+        """Returns the items left in the current page, as decoded"""
+        items = list(self._listing_response)
+        self._listing_response.clear()
+        self._offset += len(items)
+        return items
+
+    def checkpoint(self):
+        """Returns the position of this iterator
+
+        The checkpoint holds the href of the page being consumed,
+        `None` while on the first page, and how many items of that
+        page have already been returned. It only contains strings
+        and integers, so it can be serialized as JSON.
+
+        :returns: The iterator's position
+        :rtype: `dict`
+        """
+        return {'href': self._page_href, 'offset': self._offset}
+
+    def __del__(self):
+        self.close()
+
+    def stream(self, enabled=True, prefetch=0):
         """Make this `_Iterator` a stream iterator.
 
         Since `_Iterator`'s default is to *not* stream,
@@ -72,11 +155,53 @@ class _Iterator(object):
         :param enabled: Whether streaming should be
                         enabled or not.
         :type enabled: bool
+        :param prefetch: (Default 0) Number of pages to fetch
+            ahead of the consumer on a background thread. This
+            is also the maximum number of pages held in memory
+            besides the one being consumed. 0 disables prefetching
+            and pages are requested only once the current one has
+            been consumed.
+        :type prefetch: int
         """
+        self.close()
         self._stream = enabled
+
+        if enabled and prefetch > 0:
+            self._prefetcher = _PagePrefetcher(self._client, self._links,
+                                               prefetch)
         return self
 
+    def close(self):
+        """Stops fetching pages in the background, if it was enabled
+
+        It's called automatically when the iterator is garbage collected.
+        """
+        prefetcher = getattr(self, '_prefetcher', None)
+        if prefetcher is not None:
+            prefetcher.stop()
+            self._prefetcher = None
+
     def _next_page(self):
+        if self._prefetcher is not None:
+            try:
+                page = self._prefetcher.get()
+            except Exception:
+                # NOTE: The prefetching thread is done. If the
+                # caller keeps iterating, the failed page will be
+                # requested again from the current page's links.
+                self.close()
+                raise
+
+            if not page:
+                self.close()
+                self._links = []
+                raise StopIteration
+
+            href, iterables = page
+            self.get_iterables(iterables)
+            self._page_href = href
+            return
+
         for link in self._links:
             if link['rel'] == 'next':
                 # NOTE(flaper87): We already have the
@@ -90,20 +215,103 @@ class _Iterator(object):
                 # return an empty dict for consistency.
                 if iterables:
                     self.get_iterables(iterables)
+                    self._page_href = link['href']
                     return
         raise StopIteration
 
     def __next__(self):
-        try:
-            args = self._listing_response.pop(0)
-        except IndexError:
+        while not self._listing_response:
             if not self._stream:
                 raise StopIteration
 
+            # NOTE: `_next_page` raises StopIteration
+            # once there are no more pages to follow.
             self._next_page()
-            return self.next()
 
-        return self._create_function(args)
+        self._offset += 1
+        item = self._listing_response.popleft()
+        if self._create_function is None:
+            return item
+        return self._create_function(item)
 
     # NOTE(flaper87): Py2K support
     next = __next__
+
+
+def _next_href(links):
+    for link in links:
+        if link['rel'] == 'next':
+            return link['href']
+    return None
+
+
+class _PagePrefetcher(object):
+    """Follows `next` links ahead of an `_Iterator`
+
+    Pages are requested on a daemon thread and handed over, along
+    with the href they were requested from, through a queue holding
+    at most `depth` pages. The thread blocks once that queue is
+    full. `None` is queued after the last page and
+    errors raised while following a link are queued so that they
+    surface in the consumer when it reaches that page.
+
+    The thread doesn't reference the iterator, an abandoned
+    iterator can be collected and its `close` stops the thread.
+
+    :param client: The client used to follow the links.
+    :param links: Links of the page being consumed.
+    :type links: `list`
+    :param depth: Maximum number of buffered pages.
+    :type depth: int
+    """
+
+    # NOTE: How often a producer blocked on a full
+    # queue checks whether it has been stopped.
+    poll_interval = 0.1
+
+    def __init__(self, client, links, depth):
+        self._pages = queue.Queue(maxsize=depth)
+        self._stopped = threading.Event()
+
+        self._thread = threading.Thread(target=self._run,
+                                        args=(client, links))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self, client, links):
+        try:
+            href = _next_href(links)
+            while href is not None and not self._stopped.is_set():
+                iterables = client.follow(href)
+                if not iterables:
+                    break
+
+                self._put((href, iterables))
+                href = _next_href(iterables.get('links', []))
+        except Exception as ex:
+            self._put(ex)
+            return
+
+        self._put(None)
+
+    def _put(self, item):
+        while not self._stopped.is_set():
+            try:
+                self._pages.put(item, timeout=self.poll_interval)
+                return
+            except queue.Full:
+                pass
+
+    def get(self):
+        """Returns the next page, waiting for it if needed
+
+        :returns: A `(href, page)` tuple for the next page or
+            `None` if there are no more pages.
+        """
+        page = self._pages.get()
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,176 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Renews claims while their messages are being processed."""
+
+import contextlib
+import logging
+import threading
+
+from zaqarclient.common import concurrency
+
+LOG = logging.getLogger(__name__)
+
+
+class _Lease(object):
+    """A claim kept alive by a `LeaseKeeper`"""
+
+    __slots__ = ('claim', 'ttl', 'grace', 'expires')
+
+    def __init__(self, claim, ttl, grace, expires):
+        self.claim = claim
+        self.ttl = ttl
+        self.grace = grace
+        self.expires = expires
+
+
+class LeaseKeeper(object):
+    """Renews claims shortly before they expire
+
+    Claims passed to `keep` are renewed, with `Claim.update`, `margin`
+    seconds before they'd expire until they're passed to `release`.
+    This allows claiming messages with a short TTL, so that they're
+    quickly available again if their consumer dies, while processing
+    them for longer than that.
+
+    All the claims due for renewal are renewed together, by up to
+    `max_workers` concurrent requests. A claim that can't be renewed,
+    most likely because it already expired, isn't renewed anymore.
+
+    :param margin: Number of seconds before the expiration of a claim
+        to renew it at. Defaults to a third of the claim's TTL.
+    :type margin: float
+    :param max_workers: (Default 10) Maximum number of claims
+        renewed at the same time.
+    :type max_workers: int
+    """
+
+    def __init__(self, margin=None,
+                 max_workers=concurrency.DEFAULT_MAX_WORKERS):
+        self._margin = margin
+        self._max_workers = max_workers
+
+        self._cond = threading.Condition()
+        self._leases = {}
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._leases)
+
+    def keep(self, claim, ttl=None, grace=None):
+        """Renews `claim` until it's released
+
+        :param claim: The claim to renew.
+        :type claim: `claim.Claim`
+        :param ttl: TTL to renew the claim with. Defaults to the claim's.
+        :type ttl: int
+        :param grace: Grace to renew the claim with, if any.
+        :type grace: int
+        """
+        ttl = ttl or claim.ttl
+        expires = concurrency.monotonic() + claim.remaining
+        with self._cond:
+            self._leases[id(claim)] = _Lease(claim, ttl, grace, expires)
+            self._cond.notify_all()
+
+    def release(self, claim, delete=True):
+        """Stops renewing `claim`
+
+        :param claim: The claim not to renew anymore.
+        :type claim: `claim.Claim`
+        :param delete: (Default True) Whether to delete the claim, making
+            its messages that weren't deleted available right away.
+        :type delete: bool
+        """
+        with self._cond:
+            self._leases.pop(id(claim), None)
+
+        if delete:
+            claim.delete()
+
+    @contextlib.contextmanager
+    def lease(self, claim, ttl=None, grace=None):
+        """Renews `claim` while the context is active
+
+        The claim is released when the context is left.
+        """
+        self.keep(claim, ttl=ttl, grace=grace)
+        try:
+            yield claim
+        finally:
+            self.release(claim)
+
+    def close(self):
+        """Stops renewing all the claims, without deleting them"""
+        with self._cond:
+            self._closed = True
+            self._leases.clear()
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _renew_at(self, lease):
+        margin = lease.ttl / 3.0 if self._margin is None else self._margin
+        return lease.expires - margin
+
+    def _renew(self, lease):
+        try:
+            lease.claim.update(ttl=lease.ttl, grace=lease.grace)
+            return lease, True
+        except Exception:
+            LOG.exception('Failed to renew claim %s', lease.claim.id)
+            return lease, False
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+
+                    now = concurrency.monotonic()
+                    due = [lease for lease in self._leases.values()
+                           if self._renew_at(lease) <= now]
+                    if due:
+                        break
+
+                    timeout = None
+                    if self._leases:
+                        timeout = min(self._renew_at(lease)
+                                      for lease in self._leases.values())
+                        timeout -= now
+                    self._cond.wait(timeout)
+
+            # NOTE: The expiration is computed from before the
+            # request, the server may have renewed it a bit later.
+            started = concurrency.monotonic()
+            renewed = concurrency.imap(self._renew, due,
+                                       max_workers=self._max_workers)
+            for lease, succeeded in renewed:
+                with self._cond:
+                    if self._leases.get(id(lease.claim)) is not lease:
+                        # NOTE: Released while being renewed.
+                        continue
+
+                    if succeeded:
+                        lease.expires = started + lease.ttl
+                    else:
+                        del self._leases[id(lease.claim)]
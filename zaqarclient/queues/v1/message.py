@@ -14,6 +14,8 @@
 # limitations under the License.
 """Implements a message controller that understands Zaqar messages."""
 
+import time
+
 from zaqarclient.queues.v1 import core
 
 
@@ -21,7 +23,15 @@ class Message(object):
     """A handler for Zaqar server Message resources.
 
     Attributes are only downloaded once - at creation time.
+
+    Messages are created in large numbers by listings and claims,
+    hence they don't have a `__dict__` and the id and claim id are
+    parsed out of the href only when they're first accessed.
     """
+
+    __slots__ = ('queue', 'href', 'ttl', 'age', 'body',
+                 '_message_id', '_claim_id')
+
     def __init__(self, queue, ttl, age, body, href=None, id=None,
                  claim_id=None):
         self.queue = queue
@@ -30,6 +40,15 @@ class Message(object):
         self.age = age
         self.body = body
 
+        self._message_id = id
+        self._claim_id = claim_id
+
+    def __repr__(self):
+        return '<Message id:{id} ttl:{ttl}>'.format(id=self._id,
+                                                    ttl=self.ttl)
+
+    @property
+    def _id(self):
         # NOTE(flaper87): Is this really
         # necessary? Should this be returned
         # by Zaqar?
@@ -37,21 +56,15 @@ class Message(object):
         # /v1/queues/worker-jobs/messages/5c6939a8?claim_id=63c9a592
         # or
         # /v1/queues/worker-jobs/messages/5c6939a8
-        if id is None:
-            self._id = href.split('/')[-1]
-            if '?' in self._id:
-                self._id = self._id.split('?')[0]
-        else:
-            self._id = id
-
-    def __repr__(self):
-        return '<Message id:{id} ttl:{ttl}>'.format(id=self._id,
-                                                    ttl=self.ttl)
+        if self._message_id is None:
+            self._message_id = self.href.split('/')[-1].split('?')[0]
+        return self._message_id
 
     @property
     def claim_id(self):
-        if '=' in self.href:
-            return self.href.split('=')[-1]
+        if self._claim_id is None and self.href and '=' in self.href:
+            self._claim_id = self.href.split('=')[-1]
+        return self._claim_id
 
     def delete(self):
         req, trans = self.queue.client._request_and_transport()
@@ -59,5 +72,136 @@ class Message(object):
                             self._id, self.claim_id)
 
 
+def _parse_id(href):
+    return href.split('/')[-1].split('?')[0]
+
+
+def _parse_claim_id(href):
+    if href and '=' in href:
+        return href.split('=')[-1]
+    return None
+
+
+class MessageBatch(object):
+    """A page of messages stored column by column.
+
+    Rather than one `Message` per message, a batch keeps the ids,
+    ttls, ages, claim ids and bodies of its messages in parallel
+    lists, in the order they were returned by the server. This is
+    cheaper to build and lets handlers work on a whole page at once.
+
+    Iterating a batch returns `Message` instances, built on demand.
+
+    :param queue: The queue the messages belong to.
+    :type queue: `queues.Queue`
+    :param messages: Messages as returned by the server.
+    :type messages: iterable of `dict`
+    :param claim_id: Claim id of messages whose href doesn't have one.
+    :type claim_id: `six.text_type`
+    :param received_at: (Default now) Time, in seconds since the epoch,
+        the messages were received at. Their `age` is relative to it.
+    :type received_at: float
+    """
+
+    message_class = Message
+
+    def __init__(self, queue, messages=(), claim_id=None,
+                 received_at=None):
+        self.queue = queue
+        self.received_at = (time.time() if received_at is None
+                            else received_at)
+
+        self.hrefs = []
+        self.ttls = []
+        self.ages = []
+        self.bodies = []
+        self.claim_ids = []
+        self._ids = []
+
+        for msg in messages:
+            href = msg.get('href')
+            self.hrefs.append(href)
+            self.ttls.append(msg.get('ttl'))
+            self.ages.append(msg.get('age'))
+            self.bodies.append(msg.get('body'))
+            self._ids.append(msg.get('id') or _parse_id(href))
+            self.claim_ids.append(msg.get('claim_id') or
+                                  _parse_claim_id(href) or claim_id)
+
+    def __repr__(self):
+        return '<MessageBatch queue:{queue} size:{size}>'.format(
+            queue=getattr(self.queue, 'name', None), size=len(self))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        for i in range(len(self._ids)):
+            yield self.message_class(self.queue, self.ttls[i], self.ages[i],
+                                     self.bodies[i], href=self.hrefs[i],
+                                     id=self._ids[i],
+                                     claim_id=self.claim_ids[i])
+
+    def _take(self, indices):
+        batch = type(self)(self.queue, received_at=self.received_at)
+        for column in ('hrefs', 'ttls', 'ages', 'bodies', 'claim_ids',
+                       '_ids'):
+            values = getattr(self, column)
+            setattr(batch, column, [values[i] for i in indices])
+        return batch
+
+    def ids(self):
+        """Returns the ids of the messages
+
+        :rtype: `list`
+        """
+        return list(self._ids)
+
+    def expired(self, now=None):
+        """Returns the messages whose ttl is over at `now`
+
+        :param now: (Default now) Time, in seconds since the epoch.
+        :type now: float
+
+        :returns: A batch with the expired messages.
+        :rtype: `MessageBatch`
+        """
+        if now is None:
+            now = time.time()
+
+        elapsed = now - self.received_at
+        return self._take([i for i, (ttl, age)
+                           in enumerate(zip(self.ttls, self.ages))
+                           if ttl is not None and
+                           (age or 0) + elapsed >= ttl])
+
+    def split(self, size):
+        """Splits this batch in batches of at most `size` messages
+
+        :param size: Maximum number of messages per batch.
+        :type size: int
+
+        :rtype: `list` of `MessageBatch`
+        """
+        if size < 1:
+            raise ValueError('size must be greater than 0')
+
+        return [self._take(range(start, min(start + size, len(self))))
+                for start in range(0, len(self), size)]
+
+    def delete(self):
+        """Deletes all the messages of this batch with a single request
+
+        The server limits how many messages can be deleted at once,
+        larger batches have to be `split` first.
+        """
+        if not self._ids:
+            return
+
+        req, trans = self.queue.client._request_and_transport()
+        core.message_delete_many(trans, req, self.queue._name,
+                                 list(self._ids))
+
+
 def create_object(parent):
     return lambda args: Message(parent, **args)
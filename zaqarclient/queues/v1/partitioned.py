@@ -0,0 +1,218 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Spreads a logical queue over several queues."""
+
+import logging
+import threading
+import zlib
+
+import six
+
+from zaqarclient._i18n import _  # noqa
+from zaqarclient.common import concurrency
+
+LOG = logging.getLogger(__name__)
+
+
+class _Partition(object):
+    """A queue of a partitioned queue and its claim backoff"""
+
+    __slots__ = ('queue', 'backoff', 'idle_until')
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.backoff = 0
+        self.idle_until = 0
+
+
+class PartitionedQueue(object):
+    """A logical queue spread over `partitions` queues
+
+    The queues are named after the logical queue, `name-0` to
+    `name-{partitions - 1}`, so that they can be on different pools.
+    Messages are posted to the partition of their key, or to each
+    partition in turn. Claims are made from several partitions at
+    once, starting from a different one every time. A partition
+    found empty isn't claimed from for `min_backoff` seconds, doubled
+    up to `max_backoff` seconds while it stays empty.
+
+    The order of the messages is only kept within a partition.
+
+    :param client: The client of the queues.
+    :param name: Name of the logical queue.
+    :type name: `six.text_type`
+    :param partitions: Number of queues.
+    :type partitions: int
+    :param auto_create: (Default True) Whether to create the queues.
+    :type auto_create: bool
+    :param force_create: (Default False) Whether to create the queues
+        regardless of the API version, see `Queue`.
+    :type force_create: bool
+    :param min_backoff: (Default 0.1) Initial number of seconds an
+        empty partition isn't claimed from.
+    :type min_backoff: float
+    :param max_backoff: (Default 5) Maximum number of seconds an
+        empty partition isn't claimed from.
+    :type max_backoff: float
+    :param max_workers: (Default 10) Maximum number of concurrent
+        requests.
+    :type max_workers: int
+    """
+
+    def __init__(self, client, name, partitions, auto_create=True,
+                 force_create=False, min_backoff=0.1, max_backoff=5,
+                 max_workers=concurrency.DEFAULT_MAX_WORKERS):
+        if partitions < 1:
+            raise ValueError(_('A queue has at least 1 partition'))
+
+        self.client = client
+        self.name = name
+        self.queues = [client.queue('%s-%d' % (name, index),
+                                    auto_create=auto_create,
+                                    force_create=force_create)
+                       for index in range(partitions)]
+        self._min_backoff = min_backoff
+        self._max_backoff = max_backoff
+        self._max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._partitions = [_Partition(queue) for queue in self.queues]
+        self._next_post = 0
+        self._next_claim = 0
+
+    def __len__(self):
+        return len(self.queues)
+
+    def _map(self, function, items):
+        return concurrency.imap(function, items,
+                                max_workers=self._max_workers)
+
+    def partition(self, key=None):
+        """Returns the queue of the partition of `key`
+
+        Keys are hashed with CRC32, so that a key has the same
+        partition in every process. Without a key, partitions are
+        returned in turn.
+
+        :param key: The key of the messages, if any.
+        :type key: `six.text_type`, bytes or int
+
+        :rtype: `queues.Queue`
+        """
+        if key is None:
+            with self._lock:
+                index = self._next_post
+                self._next_post = (index + 1) % len(self.queues)
+            return self.queues[index]
+
+        if not isinstance(key, six.binary_type):
+            key = six.text_type(key).encode('utf-8')
+        return self.queues[(zlib.crc32(key) & 0xffffffff) % len(self.queues)]
+
+    def post(self, messages, key=None, **kwargs):
+        """Posts `messages` to a single partition
+
+        :param messages: One or more messages, see `Queue.post`.
+        :param key: The key to pick the partition from. The partitions
+            are used in turn without a key.
+        :param kwargs: Other options, see `Queue.post`.
+
+        :returns: The result of `Queue.post`.
+        """
+        return self.partition(key).post(messages, **kwargs)
+
+    def _claim(self, partition, ttl, grace, limit, raw):
+        try:
+            claim = partition.queue.claim(ttl=ttl, grace=grace,
+                                          limit=limit, raw=raw)
+        except Exception:
+            LOG.exception('Failed to claim messages from queue %s',
+                          partition.queue.name)
+            return None
+
+        with self._lock:
+            if claim.id is None:
+                partition.backoff = min(
+                    max(partition.backoff * 2, self._min_backoff),
+                    self._max_backoff)
+                partition.idle_until = (concurrency.monotonic() +
+                                        partition.backoff)
+                return None
+
+            partition.backoff = 0
+            partition.idle_until = 0
+            return claim
+
+    def claim(self, ttl=None, grace=None, limit=10, raw=False):
+        """Claims up to `limit` messages from several partitions
+
+        The messages are claimed from the partitions that weren't
+        recently found empty, up to `limit` of them, starting from
+        the partition after the one started from the previous time.
+        `limit` is split between them.
+
+        :returns: The claims that got messages, maybe none.
+        :rtype: `list` of `claim.Claim`
+        """
+        now = concurrency.monotonic()
+        with self._lock:
+            start = self._next_claim
+            self._next_claim = (start + 1) % len(self._partitions)
+            rotated = self._partitions[start:] + self._partitions[:start]
+            ready = [partition for partition in rotated
+                     if partition.idle_until <= now][:limit]
+
+        if not ready:
+            return []
+
+        # NOTE: The first partitions get the remainder.
+        share, remainder = divmod(limit, len(ready))
+        limits = [share + (1 if index < remainder else 0)
+                  for index in range(len(ready))]
+        claims = self._map(
+            lambda args: self._claim(args[0], ttl, grace, args[1], raw),
+            zip(ready, limits))
+        return [claim for claim in claims if claim is not None]
+
+    @property
+    def stats(self):
+        """Stats of the logical queue
+
+        The counts are the sums of those of the partitions, `oldest`
+        and `newest` the oldest and newest messages of all of them.
+        """
+        messages = {'free': 0, 'claimed': 0, 'total': 0}
+        oldest = newest = None
+        for stats in self._map(lambda queue: queue.stats, self.queues):
+            partition = stats.get('messages', {})
+            for count in ('free', 'claimed', 'total'):
+                messages[count] += partition.get(count, 0)
+
+            if 'oldest' in partition and (
+                    oldest is None or
+                    partition['oldest']['age'] > oldest['age']):
+                oldest = partition['oldest']
+            if 'newest' in partition and (
+                    newest is None or
+                    partition['newest']['age'] < newest['age']):
+                newest = partition['newest']
+
+        if oldest is not None:
+            messages['oldest'] = oldest
+        if newest is not None:
+            messages['newest'] = newest
+        return {'messages': messages}
+
+    def delete(self):
+        """Deletes all the partitions"""
+        list(self._map(lambda queue: queue.delete(), self.queues))
@@ -18,6 +18,11 @@ from zaqarclient.queues.v1 import core
 
 class Pool(object):
 
+    # NOTE: `update` sets whatever attribute it's given, these end
+    # up in `__dict__`, the known attributes live in slots.
+    __slots__ = ('client', 'uri', 'name', 'weight', 'group', 'options',
+                 '__dict__')
+
     def __init__(self, client, name,
                  weight=None, uri=None,
                  group=None, auto_create=True,
@@ -0,0 +1,127 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Buffers messages and posts them in batches from a background thread."""
+
+from zaqarclient.common import concurrency
+from zaqarclient.queues.v1 import batching
+from zaqarclient.queues.v1 import queues
+
+
+class Producer(object):
+    """Posts messages in batches, in the background
+
+    Messages passed to `send` are buffered per queue and posted once
+    `batch_size` messages or `batch_bytes` bytes are buffered for a
+    queue, or once the oldest of them has waited for `linger` seconds.
+    Batches are posted by a pool of threads, so `send` doesn't wait for
+    the server, it returns a future to get the outcome of the post from.
+
+    Messages are kept in memory until they're posted. Once the messages
+    not yet posted take `max_buffer_bytes` bytes, `send` waits for
+    space to be freed or, if `block` is False, fails the message.
+
+    :param client: The client used to post the messages.
+    :param batch_size: Maximum number of messages per post. Defaults
+        to the `max_messages_per_post` client option, if set.
+    :type batch_size: int
+    :param batch_bytes: Maximum size of a post, in bytes. Defaults to
+        the `max_messages_post_size` client option.
+    :type batch_bytes: int
+    :param linger: (Default 0.05) Maximum number of seconds a message
+        waits for its batch to fill up.
+    :type linger: float
+    :param max_buffer_bytes: (Default 32MiB) Maximum size of the
+        messages not yet posted.
+    :type max_buffer_bytes: int
+    :param block: (Default True) Whether `send` waits for space in
+        the buffer or fails the message when it's full.
+    :type block: bool
+    :param max_workers: (Default 10) Maximum number of concurrent posts.
+        With the client's `adaptive_concurrency` option, the number of
+        concurrent posts adapts to the server's load instead.
+    :type max_workers: int
+    """
+
+    def __init__(self, client, batch_size=None, batch_bytes=None,
+                 linger=0.05, max_buffer_bytes=32 * 1024 * 1024,
+                 block=True, max_workers=concurrency.DEFAULT_MAX_WORKERS):
+        self._client = client
+        self._queues = {}
+        batch_bytes = batch_bytes or client.conf.get(
+            'max_messages_post_size', queues.MAX_MESSAGES_POST_SIZE)
+        # NOTE: Batches are sized as `Queue.post` chunks, the messages
+        # take `_message_size` bytes each, the post's document the rest.
+        self._batcher = batching.Batcher(
+            self._post,
+            batch_size or client.conf.get('max_messages_per_post'),
+            batch_bytes=batch_bytes - queues._post_overhead(
+                client.api_version),
+            linger=linger, max_buffer_bytes=max_buffer_bytes, block=block,
+            max_workers=max_workers, limiter=client.concurrency_limiter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def send(self, queue_name, message):
+        """Buffers `message` to be posted to `queue_name`
+
+        :param queue_name: Name of the queue to post the message to.
+        :type queue_name: `six.text_type`
+        :param message: The message, as passed to `Queue.post`.
+        :type message: `dict`
+
+        :returns: A future whose result is the href of the posted
+            message. It holds the error if the post failed.
+        :rtype: `concurrent.futures.Future`
+        """
+        return self._batcher.add(queue_name, message,
+                                 queues._message_size(message))
+
+    def flush(self, timeout=None):
+        """Posts the buffered messages and waits for them to be posted
+
+        :param timeout: Maximum number of seconds to wait for.
+        :type timeout: float
+
+        :returns: Whether all the messages were posted in time.
+        :rtype: bool
+        """
+        return self._batcher.flush(timeout)
+
+    def close(self, timeout=None):
+        """Flushes the producer and stops its threads
+
+        Messages can't be sent once the producer is closed.
+
+        :param timeout: Maximum number of seconds to wait for the
+            buffered messages to be posted.
+        :type timeout: float
+
+        :returns: Whether all the messages were posted in time.
+        :rtype: bool
+        """
+        return self._batcher.close(timeout)
+
+    def _queue(self, queue_name):
+        queue = self._queues.get(queue_name)
+        if queue is None:
+            queue = self._client.queue(queue_name)
+            self._queues[queue_name] = queue
+        return queue
+
+    def _post(self, queue_name, messages):
+        result = self._queue(queue_name)._post_chunk(messages)
+        return (result or {}).get('resources', [])
@@ -13,11 +13,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
+import json
 import re
 
 from zaqarclient._i18n import _  # noqa
+from zaqarclient.common import concurrency
 from zaqarclient import errors
 from zaqarclient.queues.v1 import claim as claim_api
+from zaqarclient.queues.v1 import consumer as consumer_api
 from zaqarclient.queues.v1 import core
 from zaqarclient.queues.v1 import iterator
 from zaqarclient.queues.v1 import message
@@ -26,9 +30,66 @@ from zaqarclient.queues.v1 import message
 # updated it someday, we should update it here to keep consistent.
 QUEUE_NAME_REGEX = re.compile('^[a-zA-Z0-9_\-]+$')
 
+# NOTE: Default size limit of a single message post, as enforced by the
+# server. It can be overridden with the `max_messages_post_size` client
+# option. The server doesn't limit the number of messages per post.
+MAX_MESSAGES_POST_SIZE = 256 * 1024
+
+
+def _post_overhead(api_version):
+    """Returns the size of a post's body besides that of its messages
+
+    v1.1 and later wrap the messages in a document.
+    """
+    return len(json.dumps({'messages': []})) - 2 if api_version >= 1.1 else 0
+
+
+def _message_size(msg):
+    """Returns the size `msg` adds to a post's body
+
+    Every message but the first is preceded by ', ', the brackets of
+    the JSON list take the place of the first message's separator.
+    """
+    return len(json.dumps(msg)) + 2
+
+
+def _chunk_messages(messages, max_count, max_size, overhead=0):
+    """Splits `messages` in chunks the server accepts
+
+    Chunks have at most `max_count` messages, if not `None`, and, once
+    serialized as a JSON list and with `overhead` more bytes, at most
+    `max_size` bytes.
+    A message that doesn't fit within `max_size` on its own is put in
+    a chunk of its own so that the server reports the error.
+
+    :returns: An iterator of `(offset, chunk)` tuples, `offset` being
+        the index of the chunk's first message in `messages`.
+    """
+    chunk = []
+    offset = 0
+    size = overhead
+
+    for index, msg in enumerate(messages):
+        msg_size = _message_size(msg)
+        if chunk and ((max_count is not None and len(chunk) >= max_count) or
+                      size + msg_size > max_size):
+            yield offset, chunk
+            chunk, offset, size = [], index, overhead
+
+        chunk.append(msg)
+        size += msg_size
+
+    if chunk:
+        yield offset, chunk
+
 
 class Queue(object):
 
+    # NOTE: Attributes live in slots. The `__dict__` slot stays for
+    # callers, and tests, that attach their own attributes to queues,
+    # e.g. `queue._get_transport`. It's only populated when they do.
+    __slots__ = ('client', '_name', '_metadata', '_href', '__dict__')
+
     message_module = message
 
     def __init__(self, client, name, href=None, metadata=None,
@@ -77,13 +138,73 @@ class Queue(object):
     def metadata_dict(self):
         return dict(self.metadata())
 
+    # NOTE: The metadata the queue was listed or updated with is kept
+    # on the queue. Otherwise, the metadata cached by the client, shared
+    # by all the `Queue` instances of the same name, is used.
+    def _cached_metadata(self):
+        if self._metadata is not None:
+            return self._metadata
+
+        metadata = self.client.metadata_cache.get(self._name)
+        if metadata is None:
+            return None
+        # NOTE: Every caller gets its own copy, changing it
+        # doesn't change the metadata of the other queues.
+        return copy.deepcopy(metadata)
+
+    def _set_metadata(self, metadata):
+        self._metadata = metadata
+        self.client.metadata_cache.set(self._name, copy.deepcopy(metadata))
+
+    def _load_metadata(self):
+        """Gets the metadata from the server
+
+        The cached metadata is revalidated, rather than gotten again,
+        if the server sent an ETag along with it.
+        """
+        cache = self.client.metadata_cache
+        operation = ('queue_get' if self.client.api_version >= 1.1
+                     else 'queue_get_metadata')
+
+        req, trans = self.client._request_and_transport()
+        result = core.queue_get_if_modified(trans, req, self._name,
+                                            etag=cache.etag(self._name),
+                                            operation=operation)
+        if result is None:
+            metadata = cache.revalidate(self._name)
+            if metadata is not None:
+                return copy.deepcopy(metadata)
+
+            # NOTE: Evicted meanwhile, get it again.
+            req, trans = self.client._request_and_transport()
+            result = core.queue_get_if_modified(trans, req, self._name,
+                                                operation=operation)
+
+        metadata, etag = result
+        if cache.enabled:
+            cache.set(self._name, copy.deepcopy(metadata), etag=etag)
+        else:
+            # NOTE: Without the client's cache, the queue keeps
+            # the metadata as it did before there was one.
+            self._metadata = metadata
+        return metadata
+
     def exists(self):
-        """Checks if the queue exists."""
+        """Checks if the queue exists.
+
+        Queues found are remembered as `ensure_exists` does
+        for the queues it creates.
+        """
         req, trans = self.client._request_and_transport()
         if self.client.api_version >= 1.1:
             raise errors.InvalidOperation("Unavailable on versions >= 1.1")
+
+        exists = core.queue_exists(trans, req, self._name)
+        if exists:
+            self.client.known_queues.add(self._name)
         else:
-            return core.queue_exists(trans, req, self._name)
+            self.client.known_queues.discard(self._name)
+        return exists
 
     def ensure_exists(self, force_create=False):
         """Ensures a queue exists
@@ -91,14 +212,34 @@ class Queue(object):
         This method is not race safe,
         the queue could've been deleted
         right after it was called.
+
+        Queues the client created, or found with `exists`, in
+        the last `known_queues_ttl` seconds aren't created again,
+        even with `force_create`: a queue deleted meanwhile by
+        another client isn't created again until it's forgotten.
+        Set `known_queues_ttl` to 0 to always create the queue.
+        See `registry.KnownQueues`.
         """
+        if not (force_create or self.client.api_version < 1.1):
+            return
+
+        known_queues = self.client.known_queues
+        if self._name in known_queues:
+            return
+
         req, trans = self.client._request_and_transport()
-        if force_create or self.client.api_version < 1.1:
-            core.queue_create(trans, req, self._name)
+        core.queue_create(trans, req, self._name)
+        known_queues.add(self._name)
 
     def metadata(self, new_meta=None, force_reload=False):
         """Get metadata and return it
 
+        The metadata the queue was listed or updated with is
+        kept on the queue, otherwise it's cached by the client
+        for the `metadata_cache_ttl` option's number of seconds.
+        With `metadata_cache_ttl` set to 0, the metadata gotten
+        from the server is kept on the queue instead.
+
         :param new_meta: A dictionary containing
             an updated metadata object. If present
             the queue metadata will be updated in
@@ -112,26 +253,25 @@ class Queue(object):
 
         :returns: The queue metadata.
         """
-        req, trans = self.client._request_and_transport()
-
         # NOTE(jeffrey4l): Ensure that metadata is cleared when the new_meta
         # is an empty dict.
         if new_meta is not None:
             if self.client.api_version == 1.1:
                 raise RuntimeError("V1.1 doesn't support to set the queue's "
                                    "metadata. Please use V1.0 or V2.")
+            req, trans = self.client._request_and_transport()
             core.queue_set_metadata(trans, req, self._name, new_meta)
-            self._metadata = new_meta
+            self._set_metadata(new_meta)
 
-        # TODO(flaper87): Cache with timeout
-        if self._metadata and not force_reload:
-            return self._metadata
+        # NOTE: Empty metadata is still valid metadata, only `None`
+        # means it isn't known or expired.
+        if not force_reload:
+            metadata = self._cached_metadata()
+            if metadata is not None:
+                return metadata
 
-        if self.client.api_version >= 1.1:
-            self._metadata = core.queue_get(trans, req, self._name)
-        else:
-            self._metadata = core.queue_get_metadata(trans, req, self._name)
-        return self._metadata
+        self._metadata = None
+        return self._load_metadata()
 
     @property
     def stats(self):
@@ -141,29 +281,102 @@ class Queue(object):
     def delete(self):
         req, trans = self.client._request_and_transport()
         core.queue_delete(trans, req, self._name)
+        self._metadata = None
+        self.client.metadata_cache.invalidate(self._name)
+        self.client.known_queues.discard(self._name)
 
     # Messages API
 
-    def post(self, messages):
+    def _post_chunk(self, messages):
+        if self.client.api_version >= 1.1:
+            messages = {'messages': messages}
+
+        req, trans = self.client._request_and_transport()
+
+        # TODO(flaper87): Return a list of messages
+        return core.message_post(trans, req,
+                                 self._name, messages)
+
+    def post(self, messages, max_workers=1):
         """Posts one or more messages to this queue
 
-        :param messages: One or more messages to post
-        :type messages: `list` or `dict`
+        Messages are split in chunks within the size the server accepts
+        per request, which can be set with the `max_messages_post_size`
+        client option, and at most `max_messages_per_post` messages if
+        that option is set. Chunks are posted one after the other, in
+        the order of `messages`, unless `max_workers` is more than 1.
 
-        :returns: A dict with the result of this operation.
+        :param messages: One or more messages to post
+        :type messages: `dict` or any iterable of `dict`
+        :param max_workers: (Default 1) Maximum number of chunks
+            posted at the same time. Messages of chunks posted at the
+            same time can be stored in any order. With the client's
+            `adaptive_concurrency` option, fewer chunks are posted at
+            the same time when the server is overloaded.
+        :type max_workers: int
+
+        :returns: A dict with the result of this operation. If the
+            messages were posted in several chunks, the `resources`
+            of all of them, in the order of `messages`.
         :rtype: `dict`
+        :raises: `errors.PartialPostError` if some of the chunks
+            couldn't be posted.
         """
-        if not isinstance(messages, list):
+        if isinstance(messages, dict):
             messages = [messages]
 
-        if self.client.api_version >= 1.1:
-            messages = {'messages': messages}
+        conf = self.client.conf
+        chunks = _chunk_messages(messages,
+                                 conf.get('max_messages_per_post'),
+                                 conf.get('max_messages_post_size',
+                                          MAX_MESSAGES_POST_SIZE),
+                                 _post_overhead(self.client.api_version))
+
+        first = next(chunks, None)
+        second = next(chunks, None)
+        if second is None:
+            # NOTE: A single request, errors are raised as they are.
+            return self._post_chunk(first[1] if first else [])
+
+        limiter = self.client.concurrency_limiter
+
+        def post_chunk(offset_chunk):
+            offset, chunk = offset_chunk
+            try:
+                with concurrency.slot(limiter):
+                    posted = self._post_chunk(chunk)
+                return offset, len(chunk), posted, None
+            except Exception as ex:
+                return offset, len(chunk), None, ex
+
+        def all_chunks():
+            yield first
+            yield second
+            for chunk in chunks:
+                yield chunk
+
+        result = {'resources': []}
+        failures = []
+        if max_workers > 1:
+            results = concurrency.imap(post_chunk, all_chunks(),
+                                       max_workers=max_workers)
+        else:
+            results = (post_chunk(chunk) for chunk in all_chunks())
 
-        req, trans = self.client._request_and_transport()
+        for offset, count, posted, error in results:
+            if error is not None:
+                failures.append((offset, count, error))
+                continue
 
-        # TODO(flaper87): Return a list of messages
-        return core.message_post(trans, req,
-                                 self._name, messages)
+            posted = posted or {}
+            result['resources'].extend(posted.get('resources', []))
+            if 'partial' in posted:
+                result['partial'] = (result.get('partial', False) or
+                                     posted['partial'])
+
+        if failures:
+            raise errors.PartialPostError(result, failures)
+        return result
 
     def message(self, message_id):
         """Gets a message by id
@@ -190,6 +403,16 @@ class Queue(object):
         The `messages` and `params` params are mutually exclusive
         and the former has the priority.
 
+        A listing can be resumed by passing the `checkpoint` returned
+        by the iterator of a previous listing, along with the same
+        `params`.
+
+        Passing `raw=True` returns the messages as the dicts sent
+        by the server instead of `Message` instances, which is
+        significantly cheaper when only some fields are needed.
+        Passing `batch=True` returns a single page of messages as a
+        `MessageBatch` instead of an iterator.
+
         :param messages: List of messages' ids to retrieve.
         :type messages: *args of `six.string_type`
 
@@ -199,27 +422,37 @@ class Queue(object):
         :returns: List of messages
         :rtype: `list`
         """
-        req, trans = self.client._request_and_transport()
-
         # TODO(flaper87): Return a MessageIterator.
         # This iterator should handle limits, pagination
         # and messages deserialization.
+        checkpoint = params.pop('checkpoint', None)
+        batch = params.pop('batch', False)
+        create_function = None
+        if not (params.pop('raw', False) or batch):
+            create_function = self.message_module.create_object(self)
 
         if messages:
+            req, trans = self.client._request_and_transport()
             msgs = core.message_get_many(trans, req,
                                          self._name, messages)
-        else:
-            # NOTE(flaper87): It's safe to access messages
-            # directly. If something wrong happens, the core
-            # API will raise the right exceptions.
-            msgs = core.message_list(trans, req,
-                                     self._name,
-                                     **params)
-
-        return iterator._Iterator(self.client,
-                                  msgs,
-                                  'messages',
-                                  self.message_module.create_object(self))
+            msgs_iter = iterator._Iterator(self.client,
+                                           msgs,
+                                           'messages',
+                                           create_function)
+            return self._batch(msgs_iter) if batch else msgs_iter
+
+        # NOTE(flaper87): It's safe to access messages
+        # directly. If something wrong happens, the core
+        # API will raise the right exceptions.
+        msgs_iter = self.client._listing(core.message_list, 'messages',
+                                         create_function, self._name,
+                                         checkpoint=checkpoint, **params)
+        return self._batch(msgs_iter) if batch else msgs_iter
+
+    def _batch(self, msgs_iter, claim_id=None):
+        return self.message_module.MessageBatch(self,
+                                                msgs_iter._drain_page(),
+                                                claim_id=claim_id)
 
     def delete_messages(self, *messages):
         """Deletes a set of messages from the server
@@ -232,11 +465,17 @@ class Queue(object):
         return core.message_delete_many(trans, req, self._name,
                                         set(messages))
 
-    def pop(self, count=1):
+    def pop(self, count=1, raw=False, batch=False):
         """Pop `count` messages from the server
 
         :param count: Number of messages to pop.
         :type count: int
+        :param raw: (Default False) Whether to return the messages
+            as dicts rather than `Message` instances.
+        :type raw: bool
+        :param batch: (Default False) Whether to return the messages
+            as a `MessageBatch` rather than an iterator.
+        :type batch: bool
 
         :returns: List of messages
         :rtype: `list`
@@ -244,15 +483,35 @@ class Queue(object):
 
         req, trans = self.client._request_and_transport()
         msgs = core.message_pop(trans, req, self._name, count=count)
-        return iterator._Iterator(self.client,
-                                  msgs,
-                                  'messages',
-                                  self.message_module.create_object(self))
+
+        create_function = None
+        if not (raw or batch):
+            create_function = self.message_module.create_object(self)
+
+        msgs_iter = iterator._Iterator(self.client,
+                                       msgs,
+                                       'messages',
+                                       create_function)
+        return self._batch(msgs_iter) if batch else msgs_iter
 
     def claim(self, id=None, ttl=None, grace=None,
-              limit=None):
-        return claim_api.Claim(self, id=id, ttl=ttl, grace=grace, limit=limit)
+              limit=None, raw=False, staleness=None):
+        return claim_api.Claim(self, id=id, ttl=ttl, grace=grace, limit=limit,
+                               raw=raw, staleness=staleness)
+
+    def consumer(self, handler, **kwargs):
+        """Returns a consumer passing this queue's messages to `handler`
+
+        :param handler: Callable taking a `Message`.
+        :param kwargs: Options of the consumer, see
+            `consumer.Consumer`.
+
+        :returns: A consumer, to be started and stopped.
+        :rtype: `consumer.Consumer`
+        """
+        return consumer_api.Consumer(self, handler, **kwargs)
 
 
 def create_object(parent):
-    return lambda args: Queue(parent, args["name"], auto_create=False)
+    return lambda args: Queue(parent, args["name"], href=args.get("href"),
+                              metadata=args.get("metadata"), auto_create=False)
@@ -0,0 +1,76 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Remembers the queues known to exist."""
+
+from zaqarclient.common import cache
+from zaqarclient.transport import base
+from zaqarclient.transport import errors
+
+
+class KnownQueues(object):
+    """Names of the queues recently created or found to exist
+
+    Queues are known to exist once they're created or `Queue.exists`
+    found them. `Queue.ensure_exists` doesn't create the queues known
+    to exist again, even with `force_create`. Queues are forgotten
+    after `ttl` seconds, when they're deleted and when a request about
+    them fails with `errors.ResourceNotFound`.
+
+    :param maxsize: (Default 1024) Maximum number of queues remembered.
+    :type maxsize: int
+    :param ttl: (Default 60) Number of seconds queues are remembered
+        for, 0 not to remember them.
+    :type ttl: float
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self._names = cache.TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @classmethod
+    def from_conf(cls, conf):
+        """Creates a registry from a client's options"""
+        return cls(maxsize=conf.get('known_queues_size', 1024),
+                   ttl=conf.get('known_queues_ttl', 60))
+
+    @property
+    def enabled(self):
+        """Whether queues are remembered at all"""
+        return self._names.enabled
+
+    def __contains__(self, name):
+        return self._names.get(name) is not None
+
+    def add(self, name):
+        self._names.set(name, True)
+
+    def discard(self, name):
+        self._names.invalidate(name)
+
+
+class KnownQueuesTransport(base.Transport):
+    """Forgets the queues `transport` can't find"""
+
+    def __init__(self, transport, known_queues):
+        super(KnownQueuesTransport, self).__init__(transport.options)
+        self.transport = transport
+        self.known_queues = known_queues
+
+    def send(self, request):
+        # NOTE: Transports may pop the parameters they send in the URL.
+        name = request.params.get('queue_name')
+        try:
+            return self.transport.send(request)
+        except errors.ResourceNotFound:
+            if name is not None:
+                self.known_queues.discard(name)
+            raise
@@ -0,0 +1,386 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Collects the stats of many queues at once."""
+
+import array
+import logging
+import threading
+import time
+
+from zaqarclient._i18n import _  # noqa
+from zaqarclient.common import concurrency
+
+LOG = logging.getLogger(__name__)
+
+
+class StatsSnapshot(object):
+    """Stats of several queues, gotten in a single pass
+
+    :ivar stats: Stats per queue name.
+    :ivar errors: Error raised getting the stats, per queue name.
+    :ivar timestamps: Time the stats were gotten at, per queue name.
+    :ivar started_at: Time the collection started at.
+    :ivar finished_at: Time the collection finished at.
+    """
+
+    __slots__ = ('stats', 'errors', 'timestamps', 'started_at',
+                 'finished_at', '_collected')
+
+    def __init__(self, stats, errors, timestamps, started_at, finished_at,
+                 collected):
+        self.stats = stats
+        self.errors = errors
+        self.timestamps = timestamps
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self._collected = collected
+
+    def __len__(self):
+        return len(self.stats)
+
+    def __getitem__(self, name):
+        return self.stats[name]
+
+    def __contains__(self, name):
+        return name in self.stats
+
+    @property
+    def age(self):
+        """Number of seconds since the collection finished"""
+        return concurrency.monotonic() - self._collected
+
+
+class StatsHistory(object):
+    """Last `size` stats samples of a queue, in a ring buffer
+
+    Each field of the samples is kept in an `array.array` of floats,
+    so a sample takes a fixed amount of memory and no objects are
+    created per sample. The rates are computed over the samples of
+    the last `window` seconds, or all of them.
+
+    :param size: Maximum number of samples.
+    :type size: int
+    """
+
+    FIELDS = ('timestamp', 'free', 'claimed', 'total', 'oldest_age',
+              'newest_age')
+
+    def __init__(self, size):
+        if size < 2:
+            raise ValueError(_('At least 2 samples must be kept'))
+
+        self.size = size
+        self._lock = threading.RLock()
+        self._arrays = dict((field, array.array('d', [0.0]) * size)
+                            for field in self.FIELDS)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def record(self, stats, timestamp=None):
+        """Records a sample of `stats`, as returned by `Queue.stats`
+
+        :param timestamp: Time the stats were gotten at. Defaults to now.
+        :type timestamp: float
+        """
+        messages = stats.get('messages', {})
+        values = {
+            'timestamp': time.time() if timestamp is None else timestamp,
+            'free': messages.get('free', 0),
+            'claimed': messages.get('claimed', 0),
+            'total': messages.get('total', 0),
+            'oldest_age': messages.get('oldest', {}).get('age', 0),
+            'newest_age': messages.get('newest', {}).get('age', 0),
+        }
+
+        with self._lock:
+            for field, value in values.items():
+                self._arrays[field][self._next] = value
+            self._next = (self._next + 1) % self.size
+            self._count = min(self._count + 1, self.size)
+
+    def samples(self, field, window=None):
+        """Returns the values of `field`, oldest first
+
+        :param window: Number of seconds before the last sample to
+            return the values of, all of them by default.
+        :type window: float
+        :rtype: `list`
+        """
+        with self._lock:
+            start = (self._next - self._count) % self.size
+            indices = [(start + offset) % self.size
+                       for offset in range(self._count)]
+            timestamps = self._arrays['timestamp']
+            if window is not None and indices:
+                since = timestamps[indices[-1]] - window
+                indices = [index for index in indices
+                           if timestamps[index] >= since]
+            values = self._arrays[field]
+            return [values[index] for index in indices]
+
+    def _series(self, field, window):
+        with self._lock:
+            # NOTE: Both series are read at once, so that
+            # they don't miss a sample recorded meanwhile.
+            timestamps = self.samples('timestamp', window)
+            values = self.samples(field, window)
+        return timestamps, values
+
+    def trend(self, field='total', window=None):
+        """Returns the change of `field` per second
+
+        It's the slope of the least squares line through the samples.
+
+        :returns: The change per second, `None` with less than
+            2 samples.
+        :rtype: float
+        """
+        timestamps, values = self._series(field, window)
+        count = len(values)
+        if count < 2:
+            return None
+
+        mean_t = sum(timestamps) / count
+        mean_v = sum(values) / count
+        variance = sum((t - mean_t) ** 2 for t in timestamps)
+        if not variance:
+            return None
+        covariance = sum((t - mean_t) * (v - mean_v)
+                         for t, v in zip(timestamps, values))
+        return covariance / variance
+
+    def _rates(self, window):
+        timestamps, totals = self._series('total', window)
+        if len(totals) < 2 or timestamps[-1] <= timestamps[0]:
+            return None, None
+
+        ingress = egress = 0.0
+        for previous, current in zip(totals, totals[1:]):
+            if current > previous:
+                ingress += current - previous
+            else:
+                egress += previous - current
+        duration = timestamps[-1] - timestamps[0]
+        return ingress / duration, egress / duration
+
+    def ingress_rate(self, window=None):
+        """Returns the number of messages posted per second
+
+        Only the net change between samples is seen, it's a lower
+        bound when messages are also deleted between samples.
+        """
+        return self._rates(window)[0]
+
+    def egress_rate(self, window=None):
+        """Returns the number of messages deleted per second
+
+        Only the net change between samples is seen, it's a lower
+        bound when messages are also posted between samples.
+        """
+        return self._rates(window)[1]
+
+    def time_to_drain(self, window=None):
+        """Returns the number of seconds until the queue is empty
+
+        It's estimated from the current backlog and its trend.
+
+        :returns: The number of seconds, 0 if the queue is empty
+            and `None` if the backlog isn't decreasing.
+        :rtype: float
+        """
+        totals = self.samples('total')
+        if not totals:
+            return None
+        if not totals[-1]:
+            return 0.0
+
+        trend = self.trend('total', window)
+        if trend is None or trend >= 0:
+            return None
+        return totals[-1] / -trend
+
+
+class StatsCollector(object):
+    """Gets the stats of many queues concurrently
+
+    The queues are either those named in `names` or all those whose
+    name starts with `prefix`, listed again for every collection. Stats
+    are requested by up to `max_workers` concurrent requests, through
+    the client's `adaptive_concurrency` limiter, if any.
+
+    Snapshots are cached for `ttl` seconds. With `start`, a thread
+    collects a new snapshot every `interval` seconds so `snapshot`
+    returns right away.
+
+    With `history_size`, the last samples of the stats of each queue
+    are kept in a `StatsHistory`, available from `history`, to compute
+    their rates from.
+
+    :param client: The client to get the stats with.
+    :param names: Names of the queues.
+    :type names: `list`
+    :param prefix: Prefix of the names of the queues.
+    :type prefix: `six.text_type`
+    :param ttl: (Default 10) Number of seconds snapshots are cached for.
+    :type ttl: float
+    :param max_workers: (Default 10) Maximum number of concurrent
+        requests.
+    :type max_workers: int
+    :param history_size: (Default 0) Number of samples of the stats
+        of each queue to keep, 0 not to keep any.
+    :type history_size: int
+    """
+
+    def __init__(self, client, names=None, prefix=None, ttl=10,
+                 max_workers=concurrency.DEFAULT_MAX_WORKERS,
+                 history_size=0):
+        if (names is None) == (prefix is None):
+            raise ValueError(_('Either names or prefix must be passed'))
+
+        self._client = client
+        self._names = list(names) if names is not None else None
+        self._prefix = prefix
+        self._ttl = ttl
+        self._max_workers = max_workers
+        self._history_size = history_size
+        self._history = {}
+
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def history(self):
+        """`StatsHistory` per queue name, if `history_size` is set"""
+        with self._lock:
+            return dict(self._history)
+
+    def _record(self, snapshot):
+        for name, queue_stats in snapshot.stats.items():
+            history = self._history.get(name)
+            if history is None:
+                history = StatsHistory(self._history_size)
+                self._history[name] = history
+            history.record(queue_stats, snapshot.timestamps[name])
+
+        # NOTE: Queues that aren't collected anymore are forgotten.
+        for name in set(self._history) - set(snapshot.timestamps):
+            del self._history[name]
+
+    def _queue_names(self):
+        if self._names is not None:
+            return self._names
+        return self._client._queue_names(self._prefix)
+
+    def _stats(self, name):
+        limiter = self._client.concurrency_limiter
+        try:
+            with concurrency.slot(limiter):
+                stats = self._client.queue(name, auto_create=False).stats
+            return name, stats, None, time.time()
+        except Exception as ex:
+            return name, None, ex, time.time()
+
+    def collect(self):
+        """Gets a new snapshot, regardless of the cached one
+
+        :rtype: `StatsSnapshot`
+        """
+        started_at = time.time()
+        stats, errors, timestamps = {}, {}, {}
+        max_workers = self._max_workers
+        if self._client.concurrency_limiter is not None:
+            max_workers = self._client.concurrency_limiter.max_limit
+
+        for name, queue_stats, error, timestamp in concurrency.imap(
+                self._stats, self._queue_names(), max_workers=max_workers):
+            timestamps[name] = timestamp
+            if error is not None:
+                errors[name] = error
+            else:
+                stats[name] = queue_stats
+
+        snapshot = StatsSnapshot(stats, errors, timestamps, started_at,
+                                 time.time(), concurrency.monotonic())
+        with self._lock:
+            self._snapshot = snapshot
+            if self._history_size:
+                self._record(snapshot)
+        return snapshot
+
+    def snapshot(self, force_reload=False):
+        """Returns the cached snapshot, collecting one if it expired
+
+        While the collector runs in the background, the latest
+        snapshot is returned even if it expired.
+
+        :param force_reload: (Default False) Whether to collect a
+            new snapshot even if the cached one is fresh.
+        :type force_reload: bool
+
+        :rtype: `StatsSnapshot`
+        """
+        with self._lock:
+            snapshot = self._snapshot
+        if (force_reload or snapshot is None or
+                (self._thread is None and snapshot.age >= self._ttl)):
+            snapshot = self.collect()
+        return snapshot
+
+    def start(self, interval=None):
+        """Collects snapshots in the background
+
+        :param interval: Number of seconds between the start of two
+            collections. Defaults to `ttl`.
+        :type interval: float
+
+        :returns: This collector.
+        """
+        if self._thread is not None:
+            return self
+
+        interval = self._ttl if interval is None else interval
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,))
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops collecting snapshots in the background"""
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self, interval):
+        while not self._stopped.is_set():
+            started = concurrency.monotonic()
+            try:
+                self.collect()
+            except Exception:
+                LOG.exception('Failed to collect the stats of the queues')
+            elapsed = concurrency.monotonic() - started
+            self._stopped.wait(max(0, interval - elapsed))
@@ -22,6 +22,16 @@ class V2(api.V1_1):
 
 
 V2.schema.update({
+    'message_delete_many': {
+        'ref': 'queues/{queue_name}/messages',
+        'method': 'DELETE',
+        'required': ['queue_name', 'ids'],
+        'properties': {
+            'queue_name': {'type': 'string'},
+            'ids': {'type': 'string'},
+            'claim_ids': {'type': 'string'},
+        }
+    },
     'queue_purge': {
         'ref': 'queues/{queue_name}/purge',
         'method': 'POST',
@@ -17,4 +17,5 @@ from zaqarclient.queues.v1 import claim
 
 
 class Claim(claim.Claim):
-    pass
+
+    __slots__ = ()
@@ -410,7 +410,7 @@ class ShowSubscription(command.ShowOne):
         pool_data = client.subscription(parsed_args.queue_name,
                                         **kwargs)
         columns = ('ID', 'Subscriber', 'TTL', 'Age', 'Confirmed', 'Options')
-        return columns, utils.get_dict_properties(pool_data.__dict__, columns)
+        return columns, utils.get_item_properties(pool_data, columns)
 
 
 class ListSubscriptions(command.Lister):
@@ -15,12 +15,16 @@
 
 import uuid
 
+from zaqarclient.common import cache
+from zaqarclient.common import concurrency
 from zaqarclient.common import decorators
 from zaqarclient.queues.v1 import client
-from zaqarclient.queues.v1 import iterator
+from zaqarclient.queues.v1 import registry
 from zaqarclient.queues.v2 import core
 from zaqarclient.queues.v2 import queues
 from zaqarclient.queues.v2 import subscription
+from zaqarclient.transport import coalesce
+from zaqarclient.transport import ratelimit
 
 
 class Client(client.Client):
@@ -33,6 +37,23 @@ class Client(client.Client):
     :param options: Extra options:
         - client_uuid: Custom client uuid. A new one
         will be generated, if not passed.
+        - rate_limit: Limits of the rate requests are sent at,
+        see `zaqarclient.transport.ratelimit`.
+        - coalesce_requests: Whether to share the response of
+        identical concurrent GET and HEAD requests, see
+        `zaqarclient.transport.coalesce`.
+        - metadata_cache_ttl: Number of seconds the metadata of the
+        queues is cached for, 60 by default.
+        - metadata_cache_size: Maximum number of queues whose
+        metadata is cached, 1024 by default.
+        - known_queues_ttl: Number of seconds queues created, or
+        found with `Queue.exists`, aren't created again for, even
+        with `force_create`, 60 by default. 0 always creates them.
+        - known_queues_size: Maximum number of queues known to
+        exist, 1024 by default.
+        - adaptive_concurrency: Options of the limiter adapting the
+        number of concurrent posts, claims and deletes to the
+        server's load, see `concurrency.AdaptiveLimiter`.
         - auth_opts: Authentication options:
             - backend
             - options
@@ -50,6 +71,14 @@ class Client(client.Client):
         self.client_uuid = self.conf.get('client_uuid',
                                          uuid.uuid4().hex)
         self.session = session
+        self.rate_limiter = ratelimit.RateLimiter.from_conf(self.conf)
+        self.coalescer = coalesce.Coalescer.from_conf(self.conf)
+        self.metadata_cache = cache.TTLCache(
+            maxsize=self.conf.get('metadata_cache_size', 1024),
+            ttl=self.conf.get('metadata_cache_ttl', 60))
+        self.known_queues = registry.KnownQueues.from_conf(self.conf)
+        self.concurrency_limiter = concurrency.AdaptiveLimiter.from_conf(
+            self.conf)
 
     def queue(self, ref, **kwargs):
         """Returns a queue instance
@@ -75,24 +104,21 @@ class Client(client.Client):
         return subscription.Subscription(self, queue_name, **kwargs)
 
     @decorators.version(min_version=2)
-    def subscriptions(self, queue_name, **params):
+    def subscriptions(self, queue_name, checkpoint=None, **params):
         """Gets a list of subscriptions from the server
 
+        :param checkpoint: Position to resume a previous listing from.
+            Refer to `queues` for more info.
+        :type checkpoint: `dict`
         :param params: Filters to use for getting subscriptions
         :type params: **kwargs dict.
 
         :returns: A list of subscriptions
         :rtype: `list`
         """
-        req, trans = self._request_and_transport()
-
-        subscription_list = core.subscription_list(trans, req, queue_name,
-                                                   **params)
-
-        return iterator._Iterator(self,
-                                  subscription_list,
-                                  'subscriptions',
-                                  subscription.create_object(self))
+        return self._listing(core.subscription_list, 'subscriptions',
+                             subscription.create_object(self),
+                             queue_name, checkpoint=checkpoint, **params)
 
     def ping(self):
         """Gets the health status of Zaqar server."""
@@ -30,13 +30,12 @@ Functions present in this module assume that:
 import datetime
 import json
 
-from oslo_utils import timeutils
-
 from zaqarclient.queues.v1 import core
 
 queue_create = core.queue_create
 queue_exists = core.queue_exists
 queue_get = core.queue_get
+queue_get_if_modified = core.queue_get_if_modified
 queue_get_metadata = core.queue_get_metadata
 queue_set_metadata = core.queue_set_metadata
 queue_get_stats = core.queue_get_stats
@@ -46,7 +45,6 @@ message_get = core.message_get
 message_list = core.message_list
 message_post = core.message_post
 message_delete = core.message_delete
-message_delete_many = core.message_delete_many
 pool_get = core.pool_get
 pool_create = core.pool_create
 pool_delete = core.pool_delete
@@ -63,6 +61,35 @@ claim_update = core.claim_update
 claim_delete = core.claim_delete
 
 
+def message_delete_many(transport, request, queue_name,
+                        ids, claim_ids=None, callback=None):
+    """Deletes `ids` messages from `queue_name`
+
+    :param transport: Transport instance to use
+    :type transport: `transport.base.Transport`
+    :param request: Request instance ready to be sent.
+    :type request: `transport.request.Request`
+    :param queue_name: Queue reference name.
+    :type queue_name: `six.text_type`
+    :param ids: Ids of the messages to delete
+    :type ids: List of `six.text_type`
+    :param claim_ids: Ids of the claims the messages belong to,
+        required by the server to delete claimed messages.
+    :type claim_ids: List of `six.text_type`
+    :param callback: Optional callable to use as callback.
+        If specified, this request will be sent asynchronously.
+        (IGNORED UNTIL ASYNC SUPPORT IS COMPLETE)
+    :type callback: Callable object.
+    """
+
+    request.operation = 'message_delete_many'
+    request.params['queue_name'] = queue_name
+    request.params['ids'] = ids
+    if claim_ids:
+        request.params['claim_ids'] = claim_ids
+    transport.send(request)
+
+
 def queue_update(transport, request, name, metadata, callback=None):
     """Updates a queue's metadata using PATCH for API v2
 
@@ -134,6 +161,10 @@ def signed_url_create(transport, request, queue_name, paths=None,
 
     body = {}
     if ttl_seconds is not None:
+        # NOTE: Only signed URLs need timeutils, don't pay for its
+        # import in every other client.
+        from oslo_utils import timeutils
+
         expiry = (timeutils.utcnow() + datetime.timedelta(seconds=ttl_seconds))
         body['expires'] = expiry.isoformat()
 
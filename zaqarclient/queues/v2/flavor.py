@@ -17,4 +17,5 @@ from zaqarclient.queues.v1 import flavor
 
 
 class Flavor(flavor.Flavor):
-    pass
+
+    __slots__ = ()
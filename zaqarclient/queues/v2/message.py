@@ -18,36 +18,17 @@ from zaqarclient.queues.v2 import core
 
 
 class Message(message.Message):
-    def __init__(self, queue, ttl, age, body, href=None, id=None,
-                 claim_id=None):
-        self.queue = queue
-        self.href = href
-        self.ttl = ttl
-        self.age = age
-        self.body = body
-
-        # NOTE(flaper87): Is this really
-        # necessary? Should this be returned
-        # by Zaqar?
-        # The url has two forms depending on if it has been claimed.
-        # /v1/queues/worker-jobs/messages/5c6939a8?claim_id=63c9a592
-        # or
-        # /v1/queues/worker-jobs/messages/5c6939a8
-        if id is None:
-            self.id = href.split('/')[-1]
-            if '?' in self.id:
-                self.id = self.id.split('?')[0]
-        else:
-            self.id = id
+
+    __slots__ = ()
 
     def __repr__(self):
         return '<Message id:{id} ttl:{ttl}>'.format(id=self.id,
                                                     ttl=self.ttl)
 
-    @property
-    def claim_id(self):
-        if '=' in self.href:
-            return self.href.split('=')[-1]
+    def _set_id(self, value):
+        self._message_id = value
+
+    id = property(message.Message._id.fget, _set_id)
 
     def delete(self):
         req, trans = self.queue.client._request_and_transport()
@@ -55,5 +36,23 @@ class Message(message.Message):
                             self.id, self.claim_id)
 
 
+class MessageBatch(message.MessageBatch):
+
+    message_class = Message
+
+    def delete(self):
+        """Deletes all the messages of this batch with a single request
+
+        The claim ids of claimed messages are sent along with their ids.
+        """
+        if not self._ids:
+            return
+
+        claim_ids = set(claim_id for claim_id in self.claim_ids if claim_id)
+        req, trans = self.queue.client._request_and_transport()
+        core.message_delete_many(trans, req, self.queue._name,
+                                 list(self._ids), list(claim_ids))
+
+
 def create_object(parent):
     return lambda args: Message(parent, **args)
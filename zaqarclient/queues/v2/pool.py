@@ -17,4 +17,5 @@ from zaqarclient.queues.v1 import pool
 
 
 class Pool(pool.Pool):
-    pass
+
+    __slots__ = ()
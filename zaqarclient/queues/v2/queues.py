@@ -16,10 +16,38 @@
 from zaqarclient.queues.v1 import queues
 from zaqarclient.queues.v2 import core
 from zaqarclient.queues.v2 import message
+from zaqarclient.transport import errors
+
+
+def _metadata_changes(current, new):
+    """Returns the JSON patch turning `current` metadata into `new`
+
+    Only the keys added, removed or whose value changed are patched.
+    """
+    changes = []
+    for key, value in new.items():
+        if key not in current:
+            changes.append({'op': 'add',
+                            'path': '/metadata/%s' % key,
+                            'value': value})
+        elif current[key] != value:
+            changes.append({'op': 'replace',
+                            'path': '/metadata/%s' % key,
+                            'value': value})
+
+    # NOTE: The keys which are not included in the new
+    # metadata are removed.
+    for key in current:
+        if key not in new:
+            changes.append({'op': 'remove',
+                            'path': '/metadata/%s' % key})
+    return changes
 
 
 class Queue(queues.Queue):
 
+    __slots__ = ()
+
     message_module = message
 
     def signed_url(self, paths=None, ttl_seconds=None, methods=None):
@@ -36,6 +64,14 @@ class Queue(queues.Queue):
     def metadata(self, new_meta=None, force_reload=False):
         """Get metadata and return it
 
+        The metadata the queue was listed or updated with is
+        kept on the queue, otherwise it's cached by the client
+        for the `metadata_cache_ttl` option's number of seconds.
+        With `metadata_cache_ttl` set to 0, the metadata gotten
+        from the server is kept on the queue instead. Updates
+        only send the keys that changed, computed against the
+        known metadata, and aren't sent if nothing changed.
+
         :param new_meta: A dictionary containing
             an updated metadata object. If present
             the queue metadata will be updated in
@@ -49,39 +85,37 @@ class Queue(queues.Queue):
 
         :returns: The queue metadata.
         """
-        req, trans = self.client._request_and_transport()
-
-        # TODO(flaper87): Cache with timeout
-        if new_meta is None and self._metadata and not force_reload:
-            return self._metadata
+        # NOTE: The known metadata, if still fresh, is used to
+        # compute the changes to send.
+        if force_reload:
+            self._metadata = metadata = None
         else:
-            self._metadata = core.queue_get(trans, req, self._name)
-
-        if new_meta is not None:
-            temp_metadata = self._metadata.copy()
-            changes = []
-            for key, value in new_meta.items():
-                # If key exists, replace it's value.
-                if self._metadata.get(key, None):
-                    changes.append({'op': 'replace',
-                                    'path': '/metadata/%s' % key,
-                                    'value': value})
-                    temp_metadata.pop(key)
-                # If not, add the new key.
-                else:
-                    changes.append({'op': 'add',
-                                    'path': '/metadata/%s' % key,
-                                    'value': value})
-            # For the keys which are not included in the new metadata, remove
-            # them.
-            for key, value in temp_metadata.items():
-                changes.append({'op': 'remove',
-                                'path': '/metadata/%s' % key})
-
-            self._metadata = core.queue_update(trans, req, self._name,
-                                               metadata=changes)
-
-        return self._metadata
+            metadata = self._cached_metadata()
+        cached = metadata is not None
+        if not cached:
+            metadata = self._load_metadata()
+
+        if new_meta is None:
+            return metadata
+
+        changes = _metadata_changes(metadata, new_meta)
+        if not changes:
+            return metadata
+
+        req, trans = self.client._request_and_transport()
+        try:
+            metadata = core.queue_update(trans, req, self._name,
+                                         metadata=changes)
+        except (errors.ConflictError, errors.MalformedRequest):
+            if not cached:
+                raise
+
+            # NOTE: The cached metadata may be out of date, the
+            # changes are computed again from the server's.
+            return self.metadata(new_meta=new_meta, force_reload=True)
+
+        self._set_metadata(metadata)
+        return metadata
 
     def purge(self, resource_types=None):
         req, trans = self.client._request_and_transport()
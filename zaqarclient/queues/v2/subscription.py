@@ -18,6 +18,11 @@ from zaqarclient.queues.v2 import core
 
 class Subscription(object):
 
+    # NOTE: `update` sets whatever attribute it's given, these end
+    # up in `__dict__`, the known attributes live in slots.
+    __slots__ = ('client', 'id', 'queue_name', 'subscriber', 'ttl',
+                 'options', 'age', 'confirmed', '__dict__')
+
     def __init__(self, client, queue_name, subscriber=None, ttl=60, id=None,
                  auto_create=True, **kwargs):
         self.client = client
@@ -92,6 +92,111 @@ class QueueV1ClaimUnitTest(base.QueuesTestBase):
                 self.assertEqual(result['messages'][num]['href'], msg.href)
             self.assertEqual(len(result['messages']), num_tested)
 
+    def test_claim_raw(self):
+        result = {
+            'age': 790,
+            'ttl': 800,
+            'messages': [{
+                'href': '/v1/queues/fizbit/messages/50b68a50d6f5b8c8a7c62b01',
+                'ttl': 800,
+                'age': 790,
+                'body': {'event': 'ActivateAccount', 'mode': 'active'}
+            }]}
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+
+            resp = response.Response(None, json.dumps(result))
+            send_method.return_value = resp
+
+            cl = self.queue.claim(id='5245432', raw=True)
+            self.assertEqual(result['messages'], list(cl))
+
+    def test_claim_batch(self):
+        result = {
+            'age': 790,
+            'ttl': 800,
+            'messages': [{
+                'href': '/v1/queues/fizbit/messages/%d' % i,
+                'ttl': 800,
+                'age': 790,
+                'body': i
+            } for i in range(3)]}
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+
+            resp = response.Response(None, json.dumps(result))
+            send_method.return_value = resp
+
+            cl = self.queue.claim(id='5245432')
+            self.assertEqual(0, next(iter(cl)).body)
+
+            batch = cl.batch()
+            self.assertEqual(['1', '2'], batch.ids())
+            self.assertEqual(['5245432', '5245432'], batch.claim_ids)
+            self.assertEqual([], list(cl))
+
+    def test_claim_age_tracked_locally(self):
+        result = {'age': 10, 'ttl': 60, 'messages': []}
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+
+            resp = response.Response(None, json.dumps(result))
+            send_method.return_value = resp
+
+            cl = self.queue.claim(id='5245432')
+            with mock.patch('time.time', return_value=1000):
+                self.assertEqual(10, cl.age)
+                self.assertEqual(1050, cl.expires_at)
+            with mock.patch('time.time', return_value=1005):
+                self.assertEqual(15, cl.age)
+                self.assertEqual(60, cl.ttl)
+                self.assertEqual(45, cl.remaining)
+            with mock.patch('time.time', return_value=1100):
+                self.assertEqual(0, cl.remaining)
+            self.assertEqual(1, send_method.call_count)
+
+            cl.refresh()
+            self.assertEqual(2, send_method.call_count)
+
+    def test_claim_staleness(self):
+        result = {'age': 10, 'ttl': 60, 'messages': []}
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+
+            resp = response.Response(None, json.dumps(result))
+            send_method.return_value = resp
+
+            cl = self.queue.claim(id='5245432', staleness=30)
+            with mock.patch('time.time', return_value=1000):
+                cl.age
+            with mock.patch('time.time', return_value=1030):
+                self.assertEqual(40, cl.age)
+                self.assertEqual(1, send_method.call_count)
+            with mock.patch('time.time', return_value=1031):
+                self.assertEqual(10, cl.age)
+                self.assertEqual(2, send_method.call_count)
+
+    def test_claim_update_renews(self):
+        result = {'age': 10, 'ttl': 60, 'messages': []}
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+
+            resp = response.Response(None, json.dumps(result))
+            send_method.return_value = resp
+
+            cl = self.queue.claim(id='5245432')
+            with mock.patch('time.time', return_value=1000):
+                cl.age
+                cl.update(ttl=120)
+                self.assertEqual(0, cl.age)
+                self.assertEqual(1120, cl.expires_at)
+            self.assertEqual(2, send_method.call_count)
+
     def test_claim_update(self):
         with mock.patch.object(self.transport, 'send',
                                autospec=True) as send_method:
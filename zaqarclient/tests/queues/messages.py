@@ -60,9 +60,106 @@ class QueuesV1MessageUnitTest(base.QueuesTestBase):
             send_method.return_value = None
             self.assertIsNone(msg.delete())
 
+    def test_message_ids_from_href(self):
+        msg = self.queue.message_module.Message(
+            self.queue, 800, 790, {'event': 'ActivateAccount'},
+            href='/v1/queues/fizbit/messages/50b68a50d6?claim_id=5388b5dd0')
+
+        self.assertEqual('50b68a50d6', msg._id)
+        self.assertEqual('5388b5dd0', msg.claim_id)
+        self.assertFalse(hasattr(msg, '__dict__'))
+
+    def test_message_ids_unclaimed(self):
+        msg = self.queue.message_module.Message(
+            self.queue, 800, 790, {'event': 'ActivateAccount'},
+            href='/v1/queues/fizbit/messages/50b68a50d6')
+
+        self.assertEqual('50b68a50d6', msg._id)
+        self.assertIsNone(msg.claim_id)
+
+    def test_message_explicit_ids(self):
+        msg = self.queue.message_module.Message(
+            self.queue, 800, 790, {'event': 'ActivateAccount'},
+            href='/v1/queues/fizbit/messages/50b68a50d6?claim_id=5388b5dd0',
+            id='50b68a50d7', claim_id='5388b5dd1')
+
+        self.assertEqual('50b68a50d7', msg._id)
+        self.assertEqual('5388b5dd1', msg.claim_id)
+
+    def _batch(self, count, **kwargs):
+        messages = [{
+            'href': '/v1/queues/fizbit/messages/%d?claim_id=c' % i,
+            'ttl': 60,
+            'age': i * 10,
+            'body': {'index': i}
+        } for i in range(count)]
+        return self.queue.message_module.MessageBatch(self.queue, messages,
+                                                      **kwargs)
+
+    def test_message_batch_columns(self):
+        batch = self._batch(3, received_at=1000)
+
+        self.assertEqual(3, len(batch))
+        self.assertEqual(['0', '1', '2'], batch.ids())
+        self.assertEqual([0, 10, 20], batch.ages)
+        self.assertEqual(['c', 'c', 'c'], batch.claim_ids)
+        self.assertEqual([{'index': i} for i in range(3)], batch.bodies)
+
+        msgs = list(batch)
+        self.assertIsInstance(msgs[0], self.queue.message_module.Message)
+        self.assertEqual('2', msgs[2]._id)
+        self.assertEqual('c', msgs[2].claim_id)
+
+    def test_message_batch_claim_id(self):
+        messages = [{'id': '1', 'ttl': 60, 'age': 0, 'body': None}]
+        batch = self.queue.message_module.MessageBatch(self.queue, messages,
+                                                       claim_id='c')
+        self.assertEqual(['1'], batch.ids())
+        self.assertEqual(['c'], batch.claim_ids)
+
+    def test_message_batch_expired(self):
+        batch = self._batch(7, received_at=1000)
+
+        self.assertEqual(['6'], batch.expired(now=1000).ids())
+        self.assertEqual(['4', '5', '6'], batch.expired(now=1020).ids())
+        self.assertEqual(1000, batch.expired(now=1020).received_at)
+
+    def test_message_batch_split(self):
+        batch = self._batch(5)
+
+        self.assertEqual([['0', '1'], ['2', '3'], ['4']],
+                         [part.ids() for part in batch.split(2)])
+        self.assertEqual([], self._batch(0).split(2))
+        self.assertRaises(ValueError, batch.split, 0)
+
+    def test_message_batch_delete(self):
+        batch = self._batch(3)
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+            send_method.return_value = response.Response(None, None)
+
+            batch.delete()
+            self.assertEqual(1, send_method.call_count)
+            request = send_method.call_args[0][0]
+            self.assertEqual('message_delete_many', request.operation)
+            self.assertEqual(['0', '1', '2'], request.params['ids'])
+
+            self._batch(0).delete()
+            self.assertEqual(1, send_method.call_count)
+
 
 class QueuesV2MessageUnitTest(QueuesV1MessageUnitTest):
 
+    def test_message_id(self):
+        msg = self.queue.message_module.Message(
+            self.queue, 800, 790, {'event': 'ActivateAccount'},
+            href='/v2/queues/fizbit/messages/50b68a50d6?claim_id=5388b5dd0')
+
+        self.assertEqual('50b68a50d6', msg.id)
+        msg.id = '50b68a50d7'
+        self.assertEqual('50b68a50d7', msg.id)
+
     def test_message_delete_with_claim(self):
         pass
 
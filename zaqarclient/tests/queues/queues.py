@@ -131,6 +131,77 @@ class QueuesV1QueueUnitTest(base.QueuesTestBase):
             stats = self.queue.stats
             self.assertEqual(result, stats)
 
+    def test_queue_list_detailed_metadata(self):
+        returned = {
+            'links': [],
+            'queues': [{
+                'name': 'fizbit',
+                'href': '/v1/queues/fizbit',
+                'metadata': {'type': 'Bank Accounts'}
+            }, {
+                'name': 'buzz',
+                'href': '/v1/queues/buzz',
+                'metadata': {}
+            }]
+        }
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+
+            resp = response.Response(None, json.dumps(returned))
+            send_method.return_value = resp
+
+            queues = list(self.client.queues(detailed=True))
+            self.assertEqual('/v1/queues/fizbit', queues[0].href)
+            self.assertEqual([{'type': 'Bank Accounts'}, {}],
+                             [queue.metadata_dict for queue in queues])
+
+            # NOTE: The metadata comes from the listing,
+            # there's no need to get every single queue.
+            self.assertEqual(1, send_method.call_count)
+
+    def test_queue_list_raw(self):
+        returned = {
+            'links': [],
+            'queues': [{
+                'name': 'fizbit',
+                'href': '/v1/queues/fizbit',
+            }]
+        }
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+
+            resp = response.Response(None, json.dumps(returned))
+            send_method.return_value = resp
+
+            queues = list(self.client.queues(raw=True))
+            self.assertEqual(returned['queues'], queues)
+
+    def test_queues_stats(self):
+        listing = {
+            'links': [],
+            'queues': [{'name': 'queue-%d' % i} for i in range(25)]
+        }
+
+        def send(request):
+            if request.operation == 'queue_list':
+                return response.Response(None, json.dumps(listing))
+            name = request.params['queue_name']
+            stats = {'messages': {'total': int(name.split('-')[1])}}
+            return response.Response(None, json.dumps(stats))
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+            send_method.side_effect = send
+
+            result = [(queue.name, stats['messages']['total'])
+                      for queue, stats in
+                      self.client.queues_stats(max_workers=4)]
+            self.assertEqual([('queue-%d' % i, i) for i in range(25)],
+                             result)
+            self.assertEqual(26, send_method.call_count)
+
     def test_message_post(self):
         messages = [{'ttl': 30, 'body': 'Post It!'}]
 
@@ -150,6 +221,103 @@ class QueuesV1QueueUnitTest(base.QueuesTestBase):
             posted = self.queue.post(messages)
             self.assertEqual(result, posted)
 
+    def _posted(self, request):
+        messages = json.loads(request.content)
+        if isinstance(messages, dict):
+            messages = messages['messages']
+        return messages
+
+    def _post_send(self, fail=()):
+        def send(request):
+            bodies = [msg['body'] for msg in self._posted(request)]
+            if set(bodies) & set(fail):
+                raise errors.ZaqarError('Failed')
+
+            resources = ['/v1/queues/fizbit/messages/%d' % body
+                         for body in bodies]
+            return response.Response(None, json.dumps({
+                'resources': resources}))
+        return send
+
+    def test_message_post_chunked(self):
+        self.client.conf['max_messages_per_post'] = 2
+        messages = ({'ttl': 30, 'body': i} for i in range(5))
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+            send_method.side_effect = self._post_send()
+
+            posted = self.queue.post(messages, max_workers=2)
+            self.assertEqual(['/v1/queues/fizbit/messages/%d' % i
+                              for i in range(5)],
+                             posted['resources'])
+            self.assertEqual(3, send_method.call_count)
+
+    def test_message_post_chunks_in_order(self):
+        self.client.conf['max_messages_per_post'] = 2
+        messages = [{'ttl': 30, 'body': i} for i in range(5)]
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+            send_method.side_effect = self._post_send()
+
+            self.queue.post(messages)
+            self.assertEqual(
+                [[0, 1], [2, 3], [4]],
+                [[msg['body'] for msg in self._posted(call[0][0])]
+                 for call in send_method.call_args_list])
+
+    def test_message_post_not_chunked_by_count(self):
+        messages = [{'ttl': 30, 'body': i} for i in range(50)]
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+            send_method.side_effect = self._post_send()
+
+            posted = self.queue.post(messages)
+            self.assertEqual(50, len(posted['resources']))
+            self.assertEqual(1, send_method.call_count)
+
+    def test_message_post_chunked_by_size(self):
+        # NOTE: Two messages and the envelope of the
+        # request fit, a third one doesn't.
+        self.client.conf['max_messages_post_size'] = 70
+        messages = [{'ttl': 30, 'body': i} for i in range(10, 15)]
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+            send_method.side_effect = self._post_send()
+
+            posted = self.queue.post(messages)
+            self.assertEqual(5, len(posted['resources']))
+            for call in send_method.call_args_list:
+                self.assertLessEqual(len(call[0][0].content), 70)
+            self.assertEqual(3, send_method.call_count)
+
+    def test_message_post_partial_failure(self):
+        self.client.conf['max_messages_per_post'] = 2
+        messages = [{'ttl': 30, 'body': i} for i in range(5)]
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+            send_method.side_effect = self._post_send(fail=[3])
+
+            ex = self.assertRaises(errors.PartialPostError,
+                                   self.queue.post, messages)
+            self.assertEqual(['/v1/queues/fizbit/messages/%d' % i
+                              for i in (0, 1, 4)],
+                             ex.result['resources'])
+            self.assertEqual([(2, 2)],
+                             [failure[:2] for failure in ex.failures])
+
+    def test_message_post_single_chunk_error(self):
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+            send_method.side_effect = self._post_send(fail=[0])
+
+            self.assertRaises(errors.ZaqarError, self.queue.post,
+                              {'ttl': 30, 'body': 0})
+
     def test_message_list(self):
         returned = {
             'links': [{
@@ -178,6 +346,76 @@ class QueuesV1QueueUnitTest(base.QueuesTestBase):
             # just checking our way down to the transport
             # doesn't crash.
 
+    def test_message_list_resume(self):
+        pages = {
+            '/v1/queues/fizbit/messages?marker=2': {
+                'links': [],
+                'messages': [{
+                    'href': '/v1/queues/fizbit/messages/%d' % i,
+                    'ttl': 800,
+                    'age': 790,
+                    'body': i
+                } for i in (3, 4)]
+            }
+        }
+
+        with mock.patch.object(self.client, 'follow',
+                               side_effect=pages.get) as follow:
+            checkpoint = {'href': '/v1/queues/fizbit/messages?marker=2',
+                          'offset': 1}
+            msgs = self.queue.messages(checkpoint=checkpoint)
+            self.assertEqual([4], [msg.body for msg in msgs])
+            follow.assert_called_once_with(
+                '/v1/queues/fizbit/messages?marker=2')
+
+    def test_message_list_raw(self):
+        returned = {
+            'links': [],
+            'messages': [{
+                'href': '/v1/queues/fizbit/messages/50b68a50d6f5b8c8a7c62b01',
+                'ttl': 800,
+                'age': 790,
+                'body': {'event': 'ActivateAccount',
+                         'mode': 'active'}
+            }]
+        }
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+
+            resp = response.Response(None, json.dumps(returned))
+            send_method.return_value = resp
+
+            msgs = list(self.queue.messages(raw=True))
+            self.assertEqual(returned['messages'], msgs)
+            self.assertNotIn('raw', send_method.call_args[0][0].params)
+
+    def test_message_list_batch(self):
+        returned = {
+            'links': [{
+                'rel': 'next',
+                'href': '/v1/queues/fizbit/messages?marker=2'
+            }],
+            'messages': [{
+                'href': '/v1/queues/fizbit/messages/%d' % i,
+                'ttl': 800,
+                'age': 790,
+                'body': i
+            } for i in (1, 2)]
+        }
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+
+            resp = response.Response(None, json.dumps(returned))
+            send_method.return_value = resp
+
+            batch = self.queue.messages(batch=True)
+            self.assertIsInstance(batch, message.MessageBatch)
+            self.assertEqual(['1', '2'], batch.ids())
+            self.assertEqual([1, 2], batch.bodies)
+            self.assertEqual(1, send_method.call_count)
+
     def test_message_get(self):
         returned = {
             'href': '/v1/queues/fizbit/messages/50b68a50d6f5b8c8a7c62b01',
@@ -428,6 +666,40 @@ class QueuesV1_1QueueUnitTest(QueuesV1QueueUnitTest):
             # just checking our way down to the transport
             # doesn't crash.
 
+    def test_message_pop_raw(self):
+        returned = {'messages': [{
+            'id': '50b68a50d6f5b8c8a7c62b01',
+            'ttl': 800,
+            'age': 790,
+            'body': {'event': 'ActivateAccount', 'mode': 'active'}
+        }]}
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+
+            resp = response.Response(None, json.dumps(returned))
+            send_method.return_value = resp
+
+            msgs = list(self.queue.pop(count=1, raw=True))
+            self.assertEqual(returned['messages'], msgs)
+
+    def test_message_pop_batch(self):
+        returned = {'messages': [{
+            'id': '50b68a50d6f5b8c8a7c62b01',
+            'ttl': 800,
+            'age': 790,
+            'body': {'event': 'ActivateAccount', 'mode': 'active'}
+        }]}
+
+        with mock.patch.object(self.transport, 'send',
+                               autospec=True) as send_method:
+
+            resp = response.Response(None, json.dumps(returned))
+            send_method.return_value = resp
+
+            batch = self.queue.pop(count=1, batch=True)
+            self.assertEqual(['50b68a50d6f5b8c8a7c62b01'], batch.ids())
+
     def test_queue_metadata(self):
         test_metadata = {'type': 'Bank Accounts'}
 
@@ -15,7 +15,6 @@
 
 import six
 from six.moves.urllib import parse
-from stevedore import driver
 
 from zaqarclient import errors as _errors
 
@@ -34,6 +33,10 @@ def get_transport(transport='http', version=1, options=None):
     :rtype: `zaqarclient.transport.Transport`
     """
 
+    # NOTE: stevedore is imported on first use, it is only needed once a
+    # request is actually sent.
+    from stevedore import driver
+
     entry_point = '{0}.v{1}'.format(transport, version)
 
     try:
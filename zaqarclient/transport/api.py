@@ -13,9 +13,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import jsonschema
-from jsonschema import validators
-
 from zaqarclient import errors
 
 
@@ -74,6 +71,11 @@ class Api(object):
             does not exist
         """
 
+        # NOTE: jsonschema is imported here rather than at module level
+        # since validation is optional and every API module imports this one.
+        import jsonschema
+        from jsonschema import validators
+
         if operation not in self.validators:
             schema = self.get_schema(operation)
             self.validators[operation] = validators.Draft4Validator(schema)
@@ -0,0 +1,145 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Coalesces identical read requests sent at the same time.
+
+A client coalesces its requests once it's given the
+`coalesce_requests` option::
+
+    conf = {'coalesce_requests': True}
+
+When a GET or HEAD request is sent while an identical one, with the same
+endpoint, operation, parameters and headers, is waiting for its
+response, it isn't sent again: both callers get the same response,
+or the same error. Requests changing resources are always sent.
+"""
+
+import json
+import threading
+
+from zaqarclient import errors
+from zaqarclient.transport import base
+from zaqarclient.transport import response
+
+# NOTE: Methods of the requests that don't change resources.
+_IDEMPOTENT_METHODS = ('GET', 'HEAD')
+
+
+class _Call(object):
+    """A request waiting for its response"""
+
+    __slots__ = ('done', 'response', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+def _key(request):
+    """Identifies `request`, `None` if it can't be coalesced"""
+    if request.api is None:
+        return None
+
+    try:
+        schema = request.api.get_schema(request.operation)
+    except errors.ZaqarError:
+        return None
+
+    if schema.get('method') not in _IDEMPOTENT_METHODS:
+        return None
+
+    return (request.endpoint,
+            request._api_mod,
+            request.operation,
+            request.ref,
+            json.dumps(request.params, sort_keys=True, default=str),
+            json.dumps(request.headers, sort_keys=True, default=str),
+            id(request.session) if request.session is not None else None)
+
+
+class Coalescer(object):
+    """Shares the responses of identical concurrent read requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {'requests': 0, 'coalesced': 0}
+
+    @classmethod
+    def from_conf(cls, conf):
+        """Creates a coalescer from a client's options
+
+        :returns: The coalescer or `None` if the option isn't set.
+        """
+        if not conf.get('coalesce_requests'):
+            return None
+        return cls()
+
+    @property
+    def stats(self):
+        """Number of requests and of those that weren't sent"""
+        with self._lock:
+            return dict(self._stats)
+
+    def send(self, transport, request):
+        """Sends `request` with `transport` unless it's already sent
+
+        :returns: The response of `request` or of an identical request.
+        """
+        key = _key(request)
+        if key is None:
+            return transport.send(request)
+
+        with self._lock:
+            self._stats['requests'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+
+            # NOTE: Each caller gets its own response, so the
+            # content it deserializes isn't shared.
+            resp = call.response
+            return response.Response(request, resp.content,
+                                     headers=dict(resp.headers),
+                                     status_code=resp.status_code)
+
+        try:
+            call.response = transport.send(request)
+            return call.response
+        except Exception as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class CoalescingTransport(base.Transport):
+    """Sends requests through `transport`, coalescing identical reads"""
+
+    def __init__(self, transport, coalescer):
+        super(CoalescingTransport, self).__init__(transport.options)
+        self.transport = transport
+        self.coalescer = coalescer
+
+    def send(self, request):
+        return self.coalescer.send(self.transport, request)
@@ -0,0 +1,236 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Limits the rate requests are sent at.
+
+A client limits its requests once it's given a `rate_limit` option::
+
+    conf = {
+        'rate_limit': {
+            'requests_per_second': 50,
+            'bytes_per_second': 1024 * 1024,
+            'queues': {
+                'batch-jobs': {'requests_per_second': 10},
+            },
+            'operations': {
+                'message_post': {'bytes_per_second': 256 * 1024},
+            },
+        }
+    }
+
+The limits of a queue or an operation override the client-wide limit
+of the same kind, so they can be higher or lower than it: above, the
+requests about `batch-jobs` are limited to 10 per second but don't
+count against the client-wide 50 requests per second. When both the
+queue and the operation of a request have a limit of the same kind,
+the request is sent once it's within both. Bytes are those of the body
+of the requests.
+"""
+
+import threading
+import time
+
+import six
+
+from zaqarclient._i18n import _  # noqa
+from zaqarclient.common import concurrency
+from zaqarclient import errors
+from zaqarclient.transport import base
+
+
+class TokenBucket(object):
+    """Refills `rate` tokens per second, up to `capacity` tokens
+
+    Tokens can be reserved ahead of time, in which case the bucket
+    goes negative and `reserve` returns how long to wait for.
+    The bucket isn't thread safe.
+
+    :param rate: Number of tokens added per second.
+    :type rate: float
+    :param capacity: (Default `rate`) Maximum number of tokens, which
+        is the size of the bursts allowed.
+    :type capacity: float
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = concurrency.monotonic()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity,
+                           self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self, amount, now):
+        """Whether `amount` tokens can be taken right away
+
+        More tokens than `capacity` are never available.
+        """
+        self._refill(now)
+        return self._tokens >= amount
+
+    def reserve(self, amount, now):
+        """Takes `amount` tokens, even if they're not there yet
+
+        :returns: The number of seconds to wait for the tokens.
+        """
+        self._refill(now)
+        self._tokens -= amount
+        return max(0.0, -self._tokens / self.rate)
+
+
+def _size(content):
+    """Returns the number of bytes `content` is sent as"""
+    if content is None:
+        return 0
+    if isinstance(content, six.text_type):
+        content = content.encode('utf-8')
+    return len(content)
+
+
+def _buckets(limits):
+    buckets = {}
+    if limits.get('requests_per_second'):
+        buckets['requests'] = TokenBucket(limits['requests_per_second'],
+                                          limits.get('burst'))
+    if limits.get('bytes_per_second'):
+        buckets['bytes'] = TokenBucket(limits['bytes_per_second'],
+                                       limits.get('burst_bytes'))
+    return buckets
+
+
+class RateLimiter(object):
+    """Limits the rate of requests and bytes sent by a client
+
+    :param requests_per_second: Maximum number of requests per second.
+    :type requests_per_second: float
+    :param bytes_per_second: Maximum number of bytes per second.
+    :type bytes_per_second: float
+    :param burst: (Default `requests_per_second`) Number of requests
+        that can be sent at once after being idle.
+    :type burst: int
+    :param burst_bytes: (Default `bytes_per_second`) Number of bytes
+        that can be sent at once after being idle.
+    :type burst_bytes: int
+    :param block: (Default True) Whether to wait when a limit is
+        reached or to raise `errors.RateLimitExceeded`.
+    :type block: bool
+    :param queues: Limits per queue name, with the same keys,
+        overriding the client-wide ones.
+    :type queues: `dict`
+    :param operations: Limits per operation name, with the same keys,
+        overriding the client-wide ones.
+    :type operations: `dict`
+    """
+
+    def __init__(self, requests_per_second=None, bytes_per_second=None,
+                 burst=None, burst_bytes=None, block=True, queues=None,
+                 operations=None):
+        self.block = block
+        self._lock = threading.Lock()
+        self._buckets = {None: _buckets({
+            'requests_per_second': requests_per_second,
+            'bytes_per_second': bytes_per_second,
+            'burst': burst,
+            'burst_bytes': burst_bytes})}
+
+        for name, limits in (queues or {}).items():
+            self._buckets[('queue', name)] = _buckets(limits)
+        for name, limits in (operations or {}).items():
+            self._buckets[('operation', name)] = _buckets(limits)
+
+        self._stats = {'requests': 0, 'delayed': 0, 'rejected': 0,
+                       'wait_time': 0.0, 'max_wait_time': 0.0}
+
+    @classmethod
+    def from_conf(cls, conf):
+        """Creates a rate limiter from a client's options
+
+        :returns: The rate limiter or `None` if no limits are set.
+        """
+        limits = conf.get('rate_limit')
+        if not limits:
+            return None
+        return cls(**limits)
+
+    @property
+    def stats(self):
+        """Number of requests, delayed and rejected, and time waited
+
+        `wait_time` is the total number of seconds requests waited for,
+        `max_wait_time` the longest a single request waited for.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _request_buckets(self, request, amounts):
+        """Returns the `(bucket, amount)` pairs charged for `request`"""
+        keys = (('queue', request.params.get('queue_name')),
+                ('operation', request.operation))
+        overrides = [self._buckets[key] for key in keys
+                     if key in self._buckets]
+
+        buckets = []
+        for kind, amount in amounts.items():
+            matching = [group[kind] for group in overrides if kind in group]
+            if not matching and kind in self._buckets[None]:
+                matching = [self._buckets[None][kind]]
+            buckets.extend((bucket, amount) for bucket in matching)
+        return buckets
+
+    def acquire(self, request):
+        """Waits until `request` can be sent
+
+        :raises: `errors.RateLimitExceeded` if the limiter doesn't block
+            and the request can't be sent right away, which is never
+            the case of a request larger than a bucket's capacity.
+        :returns: The number of seconds waited for.
+        """
+        amounts = {'requests': 1, 'bytes': _size(request.content)}
+
+        with self._lock:
+            now = concurrency.monotonic()
+            self._stats['requests'] += 1
+            buckets = self._request_buckets(request, amounts)
+
+            if not self.block and not all(bucket.available(amount, now)
+                                          for bucket, amount in buckets):
+                self._stats['rejected'] += 1
+                raise errors.RateLimitExceeded(
+                    _('Rate limit exceeded for %s') % request.operation)
+
+            wait = max([bucket.reserve(amount, now)
+                        for bucket, amount in buckets] or [0.0])
+            if wait:
+                self._stats['delayed'] += 1
+                self._stats['wait_time'] += wait
+                self._stats['max_wait_time'] = max(
+                    self._stats['max_wait_time'], wait)
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimitedTransport(base.Transport):
+    """Sends requests through `transport` within `limiter`'s limits"""
+
+    def __init__(self, transport, limiter):
+        super(RateLimitedTransport, self).__init__(transport.options)
+        self.transport = transport
+        self.limiter = limiter
+
+    def send(self, request):
+        self.limiter.acquire(request)
+        return self.transport.send(request)
@@ -15,7 +15,6 @@
 # limitations under the License.
 
 import json
-from stevedore import driver
 
 from zaqarclient import auth
 from zaqarclient import errors
@@ -120,6 +119,9 @@ class Request(object):
     @property
     def api(self):
         if not self._api and self._api_mod:
+            # NOTE: See `transport.get_transport`.
+            from stevedore import driver
+
             try:
                 namespace = 'zaqarclient.api'
                 mgr = driver.DriverManager(namespace,